@@ -1,79 +1,142 @@
-"""Systme d'authentification JWT pour Agde Moto"""
-import jwt
+"""
+Authentification JWT sans requête sur la table des utilisateurs à chaque appel.
+
+Les jetons émis portent, signée, une version (`tv`) dérivée du mot de
+passe, du statut actif et des rôles. L'utilisateur
+est servi par un cache LRU borné, propre au processus et à durée de vie
+courte : seul un défaut de cache interroge la base. Un changement de mot de
+passe, de rôle ou une désactivation change la version et invalide les
+jetons déjà émis ; les enregistrements et suppressions d'utilisateurs vident
+l'entrée du cache (dans le processus courant ; ailleurs après TTL). Un jeton
+sans version, donc non révocable, est refusé (JWT_REQUIRE_TOKEN_VERSION).
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
 from django.conf import settings
-from django.contrib.auth.models import User
-from rest_framework.authentication import BaseAuthentication
-from rest_framework.exceptions import AuthenticationFailed
-from datetime import datetime, timedelta
-import logging
-
-logger = logging.getLogger('agde_moto')
-
-class JWTAuthentication(BaseAuthentication):
-    """Authentification JWT personnalise"""
-    
-    def authenticate(self, request):
-        """Authentifie l'utilisateur via JWT token"""
-        auth_header = request.META.get('HTTP_AUTHORIZATION')
-        
-        if not auth_header:
-            return None
-        
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.crypto import salted_hmac
+from rest_framework_simplejwt import authentication, serializers, tokens
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+USER_CACHE_SIZE = getattr(settings, 'JWT_USER_CACHE_SIZE', 1024)
+# Secondes pendant lesquelles un utilisateur en cache est servi sans relecture
+USER_CACHE_TTL = getattr(settings, 'JWT_USER_CACHE_TTL', 60)
+TOKEN_VERSION_CLAIM = 'tv'
+# False le temps que les jetons émis sans version expirent (REFRESH_TOKEN_LIFETIME)
+REQUIRE_TOKEN_VERSION = getattr(settings, 'JWT_REQUIRE_TOKEN_VERSION', True)
+
+
+def token_version(user):
+    """Empreinte courte de ce qui doit invalider les jetons : mot de passe, statut, rôles"""
+    value = f'{user.password}:{user.is_active}:{user.is_staff}:{user.is_superuser}'
+    return salted_hmac('agde_moto.authentication.token_version', value).hexdigest()[:16]
+
+
+class UserCache:
+    """Cache LRU borné, avec durée de vie, des utilisateurs authentifiés"""
+
+    def __init__(self, size=USER_CACHE_SIZE, ttl=USER_CACHE_TTL):
+        self.size = size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # Incrémenté à chaque invalidation : une lecture en base commencée
+        # avant ne doit pas réinsérer une version périmée
+        self.generation = 0
+
+    def get(self, user_id):
+        """`(utilisateur, version)` encore valide, sinon None"""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires_at, user, version = entry
+            if expires_at < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return user, version
+
+    def put(self, user_id, user, generation):
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[user_id] = (time.monotonic() + self.ttl, user, token_version(user))
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def discard(self, user_id):
+        with self._lock:
+            self.generation += 1
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+
+user_cache = UserCache()
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """Enregistrement (dont set_password + save, changement de rôle) ou suppression"""
+    user_cache.discard(instance.pk)
+
+
+class RefreshToken(tokens.RefreshToken):
+    """Jeton de rafraîchissement portant la version ; le jeton d'accès en hérite"""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token[TOKEN_VERSION_CLAIM] = token_version(user)
+        return token
+
+
+class TokenObtainPairSerializer(serializers.TokenObtainPairSerializer):
+    token_class = RefreshToken
+
+
+class JWTAuthentication(authentication.JWTAuthentication):
+    """
+    JWTAuthentication de simplejwt servie par `user_cache`. Un jeton dont la
+    version ne correspond plus à l'utilisateur, ou qui n'en porte pas, est
+    refusé.
+    """
+
+    def get_user(self, validated_token):
         try:
-            token = auth_header.split(' ')[1]
-            payload = jwt.decode(
-                token, 
-                settings.JWT_SECRET_KEY, 
-                algorithms=[settings.JWT_ALGORITHM]
-            )
-            
-            user_id = payload.get('user_id')
-            if not user_id:
-                raise AuthenticationFailed('Token invalide')
-            
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken('Le jeton ne contient pas d\'identifiant utilisateur')
+
+        cached = user_cache.get(user_id)
+        if cached is None:
+            generation = user_cache.generation
             try:
-                user = User.objects.get(id=user_id)
-            except User.DoesNotExist:
-                raise AuthenticationFailed('Utilisateur non trouv')
-            
-            return (user, None)
-            
-        except jwt.ExpiredSignatureError:
-            raise AuthenticationFailed('Token expir')
-        except jwt.InvalidTokenError:
-            raise AuthenticationFailed('Token invalide')
-        except IndexError:
-            raise AuthenticationFailed('Format de token invalide')
-
-def generate_jwt_token(user):
-    """Gnre un token JWT pour un utilisateur"""
-    payload = {
-        'user_id': user.id,
-        'email': user.email,
-        'username': user.username,
-        'exp': datetime.utcnow() + timedelta(seconds=settings.JWT_EXPIRATION_DELTA),
-        'iat': datetime.utcnow()
-    }
-    
-    token = jwt.encode(
-        payload, 
-        settings.JWT_SECRET_KEY, 
-        algorithm=settings.JWT_ALGORITHM
-    )
-    
-    logger.info(f"Token JWT gnr pour l'utilisateur: {user.email}")
-    return token
-
-def verify_jwt_token(token):
-    """Vrifie et dcode un token JWT"""
-    try:
-        payload = jwt.decode(
-            token, 
-            settings.JWT_SECRET_KEY, 
-            algorithms=[settings.JWT_ALGORITHM]
-        )
-        return payload
-    except jwt.ExpiredSignatureError:
-        raise AuthenticationFailed('Token expir')
-    except jwt.InvalidTokenError:
-        raise AuthenticationFailed('Token invalide')
+                user = self.user_model.objects.get(**{api_settings.USER_ID_FIELD: user_id})
+            except self.user_model.DoesNotExist:
+                raise AuthenticationFailed('Utilisateur introuvable', code='user_not_found')
+            user_cache.put(user_id, user, generation)
+            version = token_version(user)
+        else:
+            user, version = cached
+
+        if not user.is_active:
+            raise AuthenticationFailed('Utilisateur inactif', code='user_inactive')
+        claimed = validated_token.get(TOKEN_VERSION_CLAIM)
+        if claimed is None and not REQUIRE_TOKEN_VERSION:
+            return copy.copy(user)
+        if claimed != version:
+            raise AuthenticationFailed('Session expirée, reconnectez-vous', code='token_version')
+        # Copie : une vue qui modifie request.user ne touche pas l'instance partagée
+        return copy.copy(user)
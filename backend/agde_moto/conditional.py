@@ -0,0 +1,116 @@
+"""GET conditionnels (ETag / Last-Modified) pour l'API REST"""
+import hashlib
+from functools import wraps
+
+from django.db.models import Count, Max
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def normalized_params(query_params):
+    """Paramètres triés, valeurs vides ignorées"""
+    items = []
+    for key in sorted(query_params.keys()):
+        values = sorted(v for v in query_params.getlist(key) if v != '')
+        items.extend(f'{key}={value}' for value in values)
+    return '&'.join(items)
+
+
+def make_etag(*parts):
+    """ETag fort construit à partir des valeurs qui déterminent la réponse"""
+    raw = '|'.join('' if part is None else str(part) for part in parts)
+    return '"%s"' % hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def is_not_modified(request, etag, last_modified):
+    """
+    Vrai si le client possède déjà cette représentation.
+
+    If-None-Match est prioritaire ; If-Modified-Since n'est consulté qu'en
+    son absence (RFC 9110).
+    """
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match:
+        # Comparaison faible, comme l'exige If-None-Match
+        etags = [e[2:] if e.startswith('W/') else e for e in parse_etags(if_none_match)]
+        return '*' in etags or etag in etags
+    if_modified_since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+    if if_modified_since is not None and last_modified is not None:
+        return int(last_modified.timestamp()) <= if_modified_since
+    return False
+
+
+def apply_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    return response
+
+
+def conditional_response(request, etag, last_modified, build_response):
+    """Répond 304 si le client est à jour, sinon construit la réponse et ses en-têtes"""
+    if request.method in ('GET', 'HEAD') and is_not_modified(request, etag, last_modified):
+        return apply_validators(Response(status=status.HTTP_304_NOT_MODIFIED), etag, last_modified)
+    response = build_response()
+    if response.status_code == status.HTTP_200_OK:
+        apply_validators(response, etag, last_modified)
+    return response
+
+
+def list_validators(view, request):
+    """
+    ETag d'une liste : max(updated_at) et nombre de lignes de l'ensemble
+    filtré, en une requête. Pas de Last-Modified : max(updated_at) ne bouge
+    pas quand une ligne est supprimée, un If-Modified-Since seul recevrait
+    un 304 périmé ; seul le nombre de lignes de l'ETag le voit.
+    """
+    field = getattr(view, 'last_modified_field', 'updated_at')
+    queryset = view.filter_queryset(view.get_queryset()).order_by()
+    stats = queryset.aggregate(last_modified=Max(field), total=Count('pk'))
+    etag = make_etag(
+        queryset.model._meta.label_lower, request.path, stats['last_modified'],
+        stats['total'], normalized_params(request.query_params),
+    )
+    return etag, None
+
+
+def detail_validators(view, request):
+    """updated_at de l'objet demandé, sans charger ni sérialiser l'objet"""
+    field = getattr(view, 'last_modified_field', 'updated_at')
+    queryset = view.filter_queryset(view.get_queryset()).order_by()
+    if hasattr(view, 'filter_lookup'):
+        queryset = view.filter_lookup(queryset)
+    else:
+        lookup_url_kwarg = view.lookup_url_kwarg or view.lookup_field
+        queryset = queryset.filter(**{view.lookup_field: view.kwargs[lookup_url_kwarg]})
+    row = queryset.values_list('pk', field).first()
+    if row is None:
+        return None, None
+    pk, last_modified = row
+    return make_etag(queryset.model._meta.label_lower, pk, last_modified), last_modified
+
+
+def conditional_list(view_method):
+    """ETag d'une action de liste, 304 avant toute sérialisation"""
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        etag, last_modified = list_validators(self, request)
+        return conditional_response(
+            request, etag, last_modified, lambda: view_method(self, request, *args, **kwargs)
+        )
+    return wrapper
+
+
+def conditional_detail(view_method):
+    """ETag / Last-Modified d'une action de détail, 304 avant toute sérialisation"""
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        etag, last_modified = detail_validators(self, request)
+        if etag is None:
+            # Laisser la vue produire son 404 habituel
+            return view_method(self, request, *args, **kwargs)
+        return conditional_response(
+            request, etag, last_modified, lambda: view_method(self, request, *args, **kwargs)
+        )
+    return wrapper
@@ -7,17 +7,16 @@ from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
-from django_ratelimit.decorators import ratelimit
+from agde_moto.authentication import RefreshToken
+from agde_moto.ratelimit import rate_limit
 import logging
 import hashlib
 
 logger = logging.getLogger('agde_moto')
 
-@ratelimit(key='ip', rate='5/m', method='POST', block=True)
-@ratelimit(key='post:username', rate='3/m', method='POST', block=True)
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@rate_limit('login')
 def custom_login(request):
     """
     Authentifie un utilisateur (email OU nom d'utilisateur) et renvoie des tokens JWT.
@@ -0,0 +1,135 @@
+"""Comptages par facette pour la barre de filtres du catalogue"""
+import hashlib
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, CharField, Count, Q, Value, When
+
+from .response_cache import get_generations, response_cache_enabled
+
+FACETS_CACHE_TIMEOUT = getattr(settings, 'FACETS_CACHE_TIMEOUT', 300)
+
+# Paramètres qui ne changent pas l'ensemble filtré
+IGNORED_PARAMS = {'page', 'page_size', 'cursor', 'count', 'ordering', 'format'}
+
+
+class Facet:
+    """
+    Facette groupée sur un champ.
+
+    `value` reprend la valeur attendue par le filtre correspondant (par
+    exemple l'id de catégorie) ; `label` vient de `labels` ou d'un champ
+    lié (`label_field`) regroupé dans la même requête.
+    """
+
+    def __init__(self, name, field, labels=None, label_field=None):
+        self.name = name
+        self.field = field
+        self.labels = labels or {}
+        self.label_field = label_field
+
+    def annotate(self, queryset):
+        return queryset, self.field
+
+    def label(self, row, key):
+        if self.label_field:
+            return row[self.label_field]
+        return self.labels.get(row[key], row[key])
+
+    def count(self, queryset):
+        queryset, key = self.annotate(queryset)
+        group_by = [key, self.label_field] if self.label_field else [key]
+        rows = (
+            queryset.order_by()
+            .values(*group_by)
+            .annotate(total=Count('pk'))
+            .order_by('-total', key)
+        )
+        return [
+            {'value': row[key], 'label': self.label(row, key), 'count': row['total']}
+            for row in rows
+            if row[key] is not None
+        ]
+
+
+class RangeFacet(Facet):
+    """Facette par tranches (prix) : une annotation CASE puis un GROUP BY"""
+
+    def __init__(self, name, field, bands):
+        super().__init__(name, field)
+        self.bands = bands
+
+    def annotate(self, queryset):
+        alias = f'{self.name}_band'
+        whens = []
+        for lower, upper in self.bands:
+            condition = Q(**{f'{self.field}__gte': lower}) if lower is not None else Q()
+            if upper is not None:
+                condition &= Q(**{f'{self.field}__lt': upper})
+            whens.append(When(condition, then=Value(self.band_key(lower, upper))))
+        return queryset.annotate(**{alias: Case(*whens, output_field=CharField())}), alias
+
+    @staticmethod
+    def band_key(lower, upper):
+        return f"{'' if lower is None else lower}-{'' if upper is None else upper}"
+
+    def count(self, queryset):
+        counts = {row['value']: row['count'] for row in super().count(queryset)}
+        # Toutes les tranches, dans l'ordre, même vides
+        return [
+            {
+                'value': self.band_key(lower, upper),
+                'min': lower,
+                'max': upper,
+                'count': counts.get(self.band_key(lower, upper), 0),
+            }
+            for lower, upper in self.bands
+        ]
+
+
+def normalized_query_string(query_params):
+    """Chaîne de requête triée et sans paramètres de pagination/tri"""
+    items = []
+    for key in sorted(query_params.keys()):
+        if key in IGNORED_PARAMS:
+            continue
+        values = sorted(v.strip() for v in query_params.getlist(key) if v.strip())
+        items.extend(f'{key}={value}' for value in values)
+    return '&'.join(items)
+
+
+def facet_cache_key(model, query_params, dependencies=None):
+    generations = '.'.join(str(g) for g in get_generations(dependencies or [model]))
+    raw = f'{normalized_query_string(query_params)}#{generations}'
+    digest = hashlib.md5(raw.encode('utf-8')).hexdigest()
+    return f'facets:{model._meta.label_lower}:{digest}'
+
+
+def compute_facets(queryset, facets):
+    """Un GROUP BY par facette sur le queryset déjà filtré"""
+    payload = OrderedDict()
+    payload['count'] = queryset.order_by().count()
+    payload['facets'] = OrderedDict((facet.name, facet.count(queryset)) for facet in facets)
+    return payload
+
+
+def cached_facets(view, request):
+    """
+    Facettes de l'état courant de filtre/recherche de la vue.
+
+    Le queryset passe par `view.filter_queryset`, donc par les mêmes
+    DjangoFilterBackend / recherche que la liste : les comptages restent
+    cohérents avec les résultats. Le résultat est mis en cache par chaîne de
+    requête normalisée et par génération des modèles de `cache_dependencies`,
+    si le cache est partagé entre processus.
+    """
+    queryset = view.filter_queryset(view.get_queryset())
+    if not response_cache_enabled():
+        return compute_facets(queryset, view.facet_definitions)
+    key = facet_cache_key(queryset.model, request.query_params, getattr(view, 'cache_dependencies', None))
+    payload = cache.get(key)
+    if payload is None:
+        payload = compute_facets(queryset, view.facet_definitions)
+        cache.set(key, payload, FACETS_CACHE_TIMEOUT)
+    return payload
@@ -0,0 +1,164 @@
+"""Listes en lecture seule construites depuis .values(), sans instancier de modèles"""
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from .fieldsets import requested_fields
+from .renderers import FastJSONRenderer
+
+FAST_LIST_RENDERING = getattr(settings, 'FAST_LIST_RENDERING', True)
+
+# Champs dont to_representation rend la valeur de la base telle quelle
+IDENTITY_FIELDS = (
+    serializers.CharField, serializers.SlugField, serializers.URLField, serializers.EmailField,
+    serializers.IntegerField, serializers.BooleanField, serializers.PrimaryKeyRelatedField,
+)
+
+
+class UnsupportedField(Exception):
+    """Champ de serializer sans équivalent colonne : la liste reste sur le serializer"""
+
+
+class ValuesRowBuilder:
+    """
+    Reproduit la représentation de lecture d'un ModelSerializer à partir de
+    lignes `.values()`.
+
+    Les convertisseurs sont liés une fois pour toutes : aucun pour les types
+    rendus tels quels, sinon le `to_representation` du champ du serializer
+    (Decimal, dates, choix...), ce qui garantit un rendu identique. Les
+    serializers imbriqués sur une clé étrangère passent par la jointure
+    (`category__name`) ; ceux d'une relation inverse (`images`) par une
+    requête `.values()` groupée sur les clés de la page.
+    """
+    VALUE, RELATED, CHILDREN = 'value', 'related', 'children'
+
+    def __init__(self, serializer, model=None):
+        self.model = model or serializer.Meta.model
+        self.pk = self.model._meta.pk.attname
+        self.columns = [self.pk]
+        # Dans l'ordre de serializer.fields : (type, nom, colonne ou préfixe, convertisseur ou builder)
+        self.entries = []
+
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            source = field.source
+            if source == '*' or '.' in source:
+                raise UnsupportedField(name)
+            model_field = self.get_model_field(source, name)
+            if isinstance(field, serializers.ListSerializer) and model_field.one_to_many:
+                child = ValuesRowBuilder(field.child, model_field.related_model)
+                self.entries.append((self.CHILDREN, name, model_field.field, child))
+            elif isinstance(field, serializers.ModelSerializer) and model_field.many_to_one:
+                related = ValuesRowBuilder(field, model_field.related_model)
+                self.columns.extend(f'{source}__{column}' for column in related.columns)
+                self.entries.append((self.RELATED, name, f'{source}__', related))
+            elif model_field.concrete and not isinstance(field, serializers.BaseSerializer):
+                converter = None if type(field) in IDENTITY_FIELDS else field.to_representation
+                column = model_field.attname if model_field.is_relation else source
+                self.columns.append(column)
+                self.entries.append((self.VALUE, name, column, converter))
+            else:
+                raise UnsupportedField(name)
+        self.columns = list(dict.fromkeys(self.columns))
+
+    def get_model_field(self, source, name):
+        try:
+            return self.model._meta.get_field(source)
+        except FieldDoesNotExist:
+            raise UnsupportedField(name)
+
+    def values(self, queryset, extra=()):
+        """Queryset `.values()` des colonnes nécessaires (plus `extra`, pour le tri)"""
+        columns = list(dict.fromkeys([*self.columns, *extra]))
+        return queryset.select_related(None).prefetch_related(None).values(*columns)
+
+    def build(self, rows):
+        rows = list(rows)
+        nested = {
+            name: child.group_by_parent(foreign_key, [row[self.pk] for row in rows])
+            for kind, name, foreign_key, child in self.entries
+            if kind == self.CHILDREN
+        }
+        return [self.build_row(row, '', nested) for row in rows]
+
+    def build_row(self, row, prefix, nested):
+        data = {}
+        for kind, name, column, target in self.entries:
+            if kind == self.VALUE:
+                value = row[prefix + column]
+                data[name] = value if value is None or target is None else target(value)
+            elif kind == self.RELATED:
+                # Jointure externe : clé primaire liée vide <=> clé étrangère nulle
+                if row[prefix + column + target.pk] is None:
+                    data[name] = None
+                else:
+                    data[name] = target.build_row(row, prefix + column, {})
+            else:
+                data[name] = nested[name].get(row[prefix + self.pk], [])
+        return data
+
+    def group_by_parent(self, foreign_key, parent_pks):
+        if not parent_pks:
+            return {}
+        queryset = self.model._default_manager.filter(**{f'{foreign_key.name}__in': parent_pks})
+        rows = list(self.values(queryset, extra=[foreign_key.attname]))
+        grouped = {}
+        for row, data in zip(rows, self.build(rows)):
+            grouped.setdefault(row[foreign_key.attname], []).append(data)
+        return grouped
+
+
+def fast_rows_supported(view, request):
+    return (
+        FAST_LIST_RENDERING
+        and request.method == 'GET'
+        and requested_fields(request, view.get_serializer_class()) is None
+        and view.get_row_builder() is not None
+    )
+
+
+class FastListMixin:
+    """
+    ViewSet dont les listes publiques en lecture sont construites par
+    ValuesRowBuilder et rendues par FastJSONRenderer : même JSON, sans
+    instance de modèle ni passage champ par champ dans le serializer. Les
+    champs à la demande (?fields=, ?view=card) restent servis par le
+    serializer.
+    """
+    renderer_classes = [FastJSONRenderer, *[
+        renderer for renderer in api_settings.DEFAULT_RENDERER_CLASSES
+        if renderer.format != 'json'
+    ]]
+
+    _row_builders = {}
+
+    def list(self, request, *args, **kwargs):
+        if fast_rows_supported(self, request):
+            return self.fast_list_response(self.filter_queryset(self.get_queryset()))
+        return super().list(request, *args, **kwargs)
+
+    def get_row_builder(self):
+        cls = type(self)
+        if cls not in self._row_builders:
+            serializer = self.get_serializer_class()(context={'request': None})
+            try:
+                builder = ValuesRowBuilder(serializer)
+            except UnsupportedField:
+                builder = None
+            self._row_builders[cls] = builder
+        return self._row_builders[cls]
+
+    def fast_list_response(self, queryset):
+        """Liste paginée (ou non) depuis `.values()`, même pagination que `list`"""
+        builder = self.get_row_builder()
+        ordering = [term.lstrip('-') for term in queryset.query.order_by if isinstance(term, str)]
+        ordering = [term for term in ordering if '__' not in term and term != 'search_rank']
+        rows = builder.values(queryset, extra=ordering)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(builder.build(page))
+        return Response(builder.build(rows))
@@ -0,0 +1,99 @@
+"""Champs à la demande (?fields= / ?exclude=) et représentation compacte (?view=card)"""
+
+FIELDS_PARAM = 'fields'
+EXCLUDE_PARAM = 'exclude'
+VIEW_PARAM = 'view'
+CARD_VIEW = 'card'
+
+
+def _split(value):
+    return [name.strip() for name in (value or '').split(',') if name.strip()]
+
+
+def requested_fields(request, serializer_class):
+    """
+    Noms de champs demandés par le client, ou None pour la représentation
+    complète. `?view=card` part de `Meta.card_fields` ; `?fields=` remplace
+    la sélection et `?exclude=` en retire. Les noms inconnus sont ignorés et
+    `id` est toujours conservé.
+    """
+    if request is None or request.method not in ('GET', 'HEAD'):
+        return None
+    params = request.query_params
+    fields = _split(params.get(FIELDS_PARAM))
+    exclude = _split(params.get(EXCLUDE_PARAM))
+    card = params.get(VIEW_PARAM) == CARD_VIEW
+    if not (fields or exclude or card):
+        return None
+
+    meta = serializer_class.Meta
+    optional = getattr(serializer_class, 'optional_fields', ())
+    if fields:
+        selected = [name for name in meta.fields if name in fields]
+    elif card:
+        selected = list(meta.card_fields)
+    else:
+        selected = [name for name in meta.fields if name not in optional]
+    selected = [name for name in selected if name not in exclude]
+    if 'id' not in selected:
+        selected.insert(0, 'id')
+    return selected
+
+
+class SparseFieldsetMixin:
+    """
+    Serializer dont les champs suivent `?fields=`, `?exclude=` et
+    `?view=card` (lecture uniquement). Les champs de `optional_fields` ne
+    sont rendus que s'ils sont demandés explicitement ou par la vue carte.
+    """
+    optional_fields = ()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        selected = requested_fields(self.context.get('request'), type(self))
+        if selected is None:
+            selected = [name for name in self.fields if name not in self.optional_fields]
+        for name in list(self.fields):
+            if name not in selected:
+                self.fields.pop(name)
+
+
+class SparseQuerysetMixin:
+    """
+    ViewSet qui ne charge que les colonnes et relations nécessaires aux
+    champs demandés : `.only()` sur les colonnes, plus de JOIN ni de
+    prefetch pour les relations absentes ; `primary_image` (clé étrangère
+    dénormalisée) passe par une jointure sans précharger `images`. Les
+    colonnes de tri restent chargées pour la pagination par curseur.
+    """
+
+    def filter_queryset(self, queryset):
+        return self.apply_fieldset(super().filter_queryset(queryset))
+
+    def apply_fieldset(self, queryset):
+        selected = requested_fields(self.request, self.get_serializer_class())
+        if selected is None:
+            return queryset
+        model = queryset.model
+        serializer_fields = self.get_serializer().fields
+        concrete = {field.name for field in model._meta.concrete_fields}
+
+        columns = {model._meta.pk.name}
+        for name in selected:
+            field = serializer_fields.get(name)
+            source = getattr(field, 'source', name)
+            if source in concrete:
+                columns.add(source)
+        ordering = list(queryset.query.order_by) or list(model._meta.ordering)
+        columns.update(term.lstrip('-') for term in ordering if term.lstrip('-') in concrete)
+
+        related = {name for name in selected if name in concrete and model._meta.get_field(name).is_relation}
+        columns.update(related)
+        queryset = queryset.select_related(None)
+        if related:
+            queryset = queryset.select_related(*related)
+
+        queryset = queryset.prefetch_related(None)
+        if 'images' in selected:
+            queryset = queryset.prefetch_related('images')
+        return queryset.only(*columns)
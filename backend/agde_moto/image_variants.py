@@ -0,0 +1,243 @@
+"""Variantes redimensionnées (WebP, AVIF si disponible) des images téléversées"""
+import base64
+import io
+import logging
+import mimetypes
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from PIL import Image, ImageOps, UnidentifiedImageError
+from rest_framework import serializers
+
+from media_library.keys import is_external
+
+logger = logging.getLogger('agde_moto')
+
+VARIANT_WIDTHS = tuple(getattr(settings, 'IMAGE_VARIANT_WIDTHS', (320, 640, 1280)))
+VARIANT_QUALITY = getattr(settings, 'IMAGE_VARIANT_QUALITY', 80)
+VARIANT_WORKERS = getattr(settings, 'IMAGE_VARIANT_WORKERS', 2)
+# Faux en développement/tests : génération dans le thread courant, après commit
+VARIANTS_ASYNC = getattr(settings, 'IMAGE_VARIANTS_ASYNC', True)
+# Plus grand côté de l'aperçu flou inclus dans les réponses (data URI)
+PLACEHOLDER_SIZE = getattr(settings, 'IMAGE_PLACEHOLDER_SIZE', 16)
+PLACEHOLDER_QUALITY = 40
+# Champs remplis par describe_image sur les modèles d'images
+METADATA_FIELDS = ('width', 'height', 'file_size', 'mime_type', 'placeholder')
+# Valeurs EXIF d'orientation qui échangent largeur et hauteur
+_ROTATED_ORIENTATIONS = {5, 6, 7, 8}
+
+
+def available_formats():
+    """WebP toujours ; AVIF si Pillow (ou son greffon) sait l'encoder"""
+    Image.init()
+    formats = [('webp', 'WEBP')]
+    if 'AVIF' in Image.SAVE:
+        formats.append(('avif', 'AVIF'))
+    return formats
+
+
+def target_widths(width):
+    """Largeurs à produire : celles de VARIANT_WIDTHS plus petites que l'original (au moins une)"""
+    widths = [w for w in VARIANT_WIDTHS if w < width]
+    return widths or [width]
+
+
+def generate_variants(relative_path):
+    """
+    Produit les variantes d'un fichier de `default_storage` à côté de lui
+    (`<nom>_<largeur>w.<format>`). L'orientation EXIF est appliquée puis les
+    métadonnées sont abandonnées : seuls les pixels sont réencodés.
+    """
+    with default_storage.open(relative_path, 'rb') as source:
+        with Image.open(source) as original:
+            image = ImageOps.exif_transpose(original)
+            image.load()
+    for key in ('exif', 'xmp', 'XML:com.adobe.xmp'):
+        image.info.pop(key, None)
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'transparency' in image.info or image.mode in ('LA', 'PA') else 'RGB')
+
+    stem = os.path.splitext(relative_path)[0]
+    variants = {}
+    for extension, pil_format in available_formats():
+        entries = []
+        for width in target_widths(image.width):
+            height = max(1, round(image.height * width / image.width))
+            resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+            buffer = io.BytesIO()
+            resized.save(buffer, pil_format, quality=VARIANT_QUALITY)
+            name = default_storage.save(f'{stem}_{width}w.{extension}', ContentFile(buffer.getvalue()))
+            entries.append({'width': width, 'height': height, 'key': name})
+        variants[extension] = entries
+    return {'width': image.width, 'height': image.height, 'formats': variants}
+
+
+def describe_image(relative_path):
+    """
+    Dimensions affichées (orientation EXIF appliquée), poids, type MIME et
+    aperçu flou d'un fichier de `default_storage`, calculés une fois à
+    l'upload. L'aperçu est une miniature WebP de quelques centaines
+    d'octets en data URI ; pour un JPEG, le décodage réduit (draft) évite de
+    décompresser l'image entière. Un fichier illisible ne renvoie que son
+    poids et le type deviné d'après l'extension.
+    """
+    metadata = {'file_size': default_storage.size(relative_path)}
+    try:
+        with default_storage.open(relative_path, 'rb') as source:
+            with Image.open(source) as image:
+                metadata['mime_type'] = Image.MIME.get(image.format, '')
+                width, height = image.size
+                if image.getexif().get(0x0112) in _ROTATED_ORIENTATIONS:
+                    width, height = height, width
+                metadata['width'], metadata['height'] = width, height
+                image.draft('RGB', (PLACEHOLDER_SIZE * 4, PLACEHOLDER_SIZE * 4))
+                thumbnail = ImageOps.exif_transpose(image)
+                thumbnail.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE))
+                if thumbnail.mode not in ('RGB', 'RGBA'):
+                    thumbnail = thumbnail.convert('RGB')
+    except (OSError, UnidentifiedImageError, Image.DecompressionBombError) as exc:
+        logger.warning(f"Métadonnées impossibles pour {relative_path}: {exc}")
+        metadata['mime_type'] = mimetypes.guess_type(relative_path)[0] or ''
+        return metadata
+    buffer = io.BytesIO()
+    thumbnail.save(buffer, 'WEBP', quality=PLACEHOLDER_QUALITY)
+    metadata['placeholder'] = 'data:image/webp;base64,' + base64.b64encode(buffer.getvalue()).decode('ascii')
+    return metadata
+
+
+def has_metadata(model):
+    return all(any(field.name == name for field in model._meta.concrete_fields) for name in METADATA_FIELDS)
+
+
+def variant_keys(variants):
+    """Clés de stockage de toutes les variantes enregistrées (pour la suppression)"""
+    return [
+        entry['key']
+        for entries in (variants or {}).get('formats', {}).values()
+        for entry in entries
+    ]
+
+
+def needs_variants(key, variants):
+    """Vrai si l'image est un fichier stocké dont les variantes manquent ou sont périmées"""
+    if not key or is_external(key):
+        return False
+    return (variants or {}).get('source') != key
+
+
+# --- Exécution hors du thread de requête ---
+# Le pool vit dans le processus : les tâches en attente sont perdues si le
+# worker redémarre. La commande `regenerate_image_variants` reprend les
+# images dont les variantes manquent ou sont périmées.
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=VARIANT_WORKERS, thread_name_prefix='image-variants')
+    return _executor
+
+
+def _discard_variants(variants):
+    for key in variant_keys(variants):
+        try:
+            default_storage.delete(key)
+        except OSError as exc:
+            logger.warning(f"Suppression de la variante {key} impossible: {exc}")
+
+
+def process_variants(model_label, pk, image_field, variants_field):
+    """
+    Génère et enregistre les variantes d'une ligne ; exécuté par le pool.
+
+    La génération se fait sans verrou ; la ligne est ensuite relue sous
+    verrou et n'est mise à jour que si elle pointe toujours sur l'image
+    traitée. Une image remplacée entre-temps garde ses propres variantes
+    (programmées par son enregistrement) et celles produites ici sont
+    supprimées. L'instance enregistrée est toujours la ligne relue : les
+    receivers (cache, ETag, manifeste, ancien fichier de couverture) ne
+    voient jamais un chemin périmé.
+    """
+    model = apps.get_model(model_label)
+    try:
+        instance = model._default_manager.filter(pk=pk).first()
+        if instance is None:
+            return
+        key = getattr(instance, image_field)
+        if not needs_variants(key, getattr(instance, variants_field)):
+            return
+        try:
+            variants = generate_variants(key)
+        except (OSError, UnidentifiedImageError, Image.DecompressionBombError) as exc:
+            logger.warning(f"Variantes impossibles pour {model_label} #{pk} ({key}): {exc}")
+            variants = {'error': str(exc)}
+        variants['source'] = key
+        # Images créées hors des chemins d'upload (admin...) : métadonnées complétées ici
+        metadata = {}
+        if has_metadata(model) and instance.width is None and 'error' not in variants:
+            metadata = describe_image(key)
+
+        with transaction.atomic():
+            current = model._default_manager.select_for_update().filter(pk=pk).first()
+            if current is not None and getattr(current, image_field) != key:
+                current = None
+            if current is not None:
+                setattr(current, variants_field, variants)
+                update_fields = [variants_field]
+                if metadata and current.width is None:
+                    for name, value in metadata.items():
+                        setattr(current, name, value)
+                        update_fields.append(name)
+                if any(field.name == 'updated_at' for field in model._meta.concrete_fields):
+                    update_fields.append('updated_at')
+                # save() et non update() : les receivers invalident cache et ETag
+                current.save(update_fields=update_fields)
+        if current is None:
+            logger.info(f"{model_label} #{pk} : image remplacée ou supprimée pendant la génération, variantes abandonnées")
+            _discard_variants(variants)
+    except Exception:
+        logger.exception(f"Échec de la génération des variantes pour {model_label} #{pk}")
+    finally:
+        if VARIANTS_ASYNC:
+            close_old_connections()
+
+
+def schedule_variants(instance, image_field='image', variants_field='variants'):
+    """Programme la génération des variantes après le commit de la transaction courante"""
+    if not needs_variants(getattr(instance, image_field), getattr(instance, variants_field)):
+        return
+    args = (instance._meta.label, instance.pk, image_field, variants_field)
+    if VARIANTS_ASYNC:
+        transaction.on_commit(lambda: get_executor().submit(process_variants, *args))
+    else:
+        transaction.on_commit(lambda: process_variants(*args))
+
+
+class SrcsetField(serializers.Field):
+    """
+    Variantes prêtes pour `<source srcset>` :
+    `{"webp": "/media/..._320w.webp 320w, ...", "avif": "..."}`.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('source', 'variants')
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+        self.prefix = settings.MEDIA_URL
+
+    def to_representation(self, value):
+        prefix = self.prefix
+        return {
+            extension: ', '.join(f"{prefix}{entry['key']} {entry['width']}w" for entry in entries)
+            for extension, entries in (value or {}).get('formats', {}).items()
+        }
@@ -0,0 +1,137 @@
+"""
+Inspection des requêtes suspectes pour RequestLoggingMiddleware.
+
+Chaque jeu de règles (`user_agent`, `query`) est compilé une fois. Une
+règle est un couple `(déclencheurs, motif)` : les déclencheurs de toutes
+les règles forment une seule alternative de littéraux, que le moteur `re`
+recherche en un passage ; le motif complet d'une règle n'est évalué que si
+l'un de ses déclencheurs est présent (motif None : le déclencheur suffit).
+Le texte est mis en minuscules une fois par requête, pas par paramètre.
+
+Les règles visent des motifs d'attaque (`union select`, `; drop`,
+`' or 1=1`...) plutôt que des mots isolés, pour ne pas signaler `;` ou
+`update` dans une valeur anodine. Les détections sont comptées par règle ;
+seule une sur REQUEST_INSPECTION_LOG_SAMPLE est journalisée.
+"""
+import logging
+import re
+import threading
+from collections import Counter
+from urllib.parse import unquote_plus
+
+from django.conf import settings
+
+logger = logging.getLogger('agde_moto')
+
+QUOTES = ("'", '"')
+
+DEFAULT_RULES = {
+    'user_agent': {
+        'scanner': (('sqlmap', 'nikto', 'nmap', 'masscan', 'nessus'), None),
+    },
+    'query': {
+        'union_select': (('union',), r'\bunion[\s/*+(]+(?:all[\s/*+(]+)?select\b'),
+        'drop': (('drop',), r'\bdrop\s+(?:table|database|schema)\b'),
+        'insert_into': (('insert',), r'\binsert\s+into\b'),
+        'delete_from': (('delete',), r'\bdelete\s+from\b'),
+        'update_set': (('update',), r'\bupdate\s+[\w.`"\[\]]+\s+set\b'),
+        'stacked_query': ((';',), r';\s*(?:select|insert|update|delete|drop|alter|exec|shutdown)\b'),
+        'quote_comment': (QUOTES, r'[\'"]\s*(?:--|#|/\*)'),
+        'tautology': (QUOTES, r'[\'"]\s*or\s+[\'"]?\d+[\'"]?\s*=\s*[\'"]?\d+'),
+        'sleep': (('sleep', 'benchmark'), r'\b(?:pg_)?(?:sleep|benchmark)\s*\('),
+    },
+}
+# Jeux de règles du projet, fusionnés règle par règle avec ceux par défaut ;
+# une règle à None est désactivée. Déclencheurs et motifs en minuscules.
+RULES = getattr(settings, 'REQUEST_INSPECTION_RULES', {})
+# Une détection journalisée sur N, par règle (la première toujours)
+LOG_SAMPLE = getattr(settings, 'REQUEST_INSPECTION_LOG_SAMPLE', 100)
+
+
+class RuleSet:
+    """Règles nommées : alternative unique de déclencheurs, motifs compilés"""
+
+    def __init__(self, rules):
+        # déclencheur -> [(nom, motif compilé ou None)], dans l'ordre des règles
+        self.gated = {}
+        for name, (triggers, pattern) in rules.items():
+            compiled = re.compile(pattern) if pattern else None
+            for trigger in triggers:
+                self.gated.setdefault(trigger, []).append((name, compiled))
+        # Plus longs d'abord : un déclencheur préfixe d'un autre ne le masque pas
+        literals = sorted(self.gated, key=len, reverse=True)
+        self.triggers = re.compile('|'.join(map(re.escape, literals))) if literals else None
+
+    def match(self, text):
+        """Nom de la première règle reconnue dans `text` (en minuscules), sinon None"""
+        if self.triggers is None:
+            return None
+        seen = set()
+        for found in self.triggers.finditer(text):
+            trigger = found.group()
+            if trigger in seen:
+                continue
+            seen.add(trigger)
+            for name, pattern in self.gated[trigger]:
+                if pattern is None or pattern.search(text):
+                    return name
+        return None
+
+
+def merge_rules(overrides):
+    rules = {}
+    for name in DEFAULT_RULES.keys() | overrides.keys():
+        merged = {**DEFAULT_RULES.get(name, {}), **overrides.get(name, {})}
+        rules[name] = {rule: pattern for rule, pattern in merged.items() if pattern}
+    return rules
+
+
+class RequestInspector:
+    """Règles compilées et compteurs de détections, par processus"""
+
+    def __init__(self, rules=None, log_sample=LOG_SAMPLE):
+        rules = merge_rules(RULES if rules is None else rules)
+        self.user_agent = RuleSet(rules.get('user_agent', {}))
+        self.query = RuleSet(rules.get('query', {}))
+        self.log_sample = max(1, log_sample)
+        self.hits = Counter()
+        self._lock = threading.Lock()
+
+    def inspect(self, request):
+        """Journalise (échantillonné) les en-têtes et paramètres GET suspects"""
+        meta = request.META
+        user_agent = meta.get('HTTP_USER_AGENT')
+        if user_agent:
+            rule = self.user_agent.match(user_agent.lower())
+            if rule is not None and self._record(rule):
+                logger.warning(
+                    f"Requête suspecte détectée ({rule}) - User-Agent: {user_agent} - "
+                    f"IP: {meta.get('REMOTE_ADDR')} - URL: {request.path}"
+                )
+        query_string = meta.get('QUERY_STRING')
+        # Un seul passage sur la query string décodée ; les paramètres ne sont
+        # analysés (request.GET) que pour nommer celui qui a déclenché une règle
+        if not query_string or self.query.match(unquote_plus(query_string).lower()) is None:
+            return
+        for name, values in request.GET.lists():
+            for value in values:
+                rule = self.query.match(value.lower())
+                if rule is not None and self._record(rule):
+                    logger.warning(
+                        f"Tentative d'injection SQL détectée ({rule}) - Paramètre: {name} - "
+                        f"Valeur: {value} - IP: {meta.get('REMOTE_ADDR')}"
+                    )
+
+    def _record(self, rule):
+        """Compte une détection ; True si elle doit être journalisée"""
+        with self._lock:
+            self.hits[rule] += 1
+            count = self.hits[rule]
+        return count % self.log_sample == 1 or self.log_sample == 1
+
+    def hit_counts(self):
+        with self._lock:
+            return dict(self.hits)
+
+
+inspector = RequestInspector()
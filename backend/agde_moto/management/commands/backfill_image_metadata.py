@@ -0,0 +1,67 @@
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from agde_moto.image_variants import METADATA_FIELDS, describe_image
+from agde_moto.response_cache import bump_generation
+from media_library.keys import is_external
+from motorcycles.models import MotorcycleImage
+from parts.models import PartImage
+
+# modèle d'image -> champ du propriétaire
+IMAGE_MODELS = [(MotorcycleImage, 'motorcycle'), (PartImage, 'part')]
+
+
+class Command(BaseCommand):
+    help = 'Calcule dimensions, poids, type MIME et aperçu flou des images enregistrées avant leur relevé à l\'upload.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=200, help='Images traitées par lot')
+        parser.add_argument('--force', action='store_true', help='Recalcule aussi les images déjà renseignées')
+
+    def handle(self, *args, **options):
+        for model, owner_field in IMAGE_MODELS:
+            updated, failed, skipped = self.backfill(model, owner_field, options['batch_size'], options['force'])
+            self.stdout.write(
+                f'- {model._meta.label}: {updated} mise(s) à jour, {failed} illisible(s), {skipped} ignorée(s)'
+            )
+        self.stdout.write(self.style.SUCCESS('Métadonnées des images renseignées'))
+
+    def backfill(self, model, owner_field, batch_size, force):
+        """
+        Parcours par clé croissante : une interruption reprend où elle s'est
+        arrêtée. Un fichier illisible garde `width` vide mais reçoit son poids
+        et son type : il n'est pas relu au passage suivant (sauf `--force`).
+        """
+        queryset = model.objects.order_by('pk')
+        if not force:
+            queryset = queryset.filter(width__isnull=True, file_size__isnull=True)
+        updated = failed = skipped = 0
+        last_pk = 0
+        while True:
+            batch = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            changed = []
+            for image in batch:
+                if not image.image or is_external(image.image) or not default_storage.exists(image.image):
+                    skipped += 1
+                    continue
+                metadata = describe_image(image.image)
+                for name, value in metadata.items():
+                    setattr(image, name, value)
+                if 'width' in metadata:
+                    updated += 1
+                else:
+                    failed += 1
+                changed.append(image)
+            if changed:
+                model.objects.bulk_update(changed, METADATA_FIELDS)
+                # bulk_update n'émet pas de signal : ETag des propriétaires et cache invalidés ici
+                owner_model = model._meta.get_field(owner_field).related_model
+                owner_ids = {getattr(image, f'{owner_field}_id') for image in changed}
+                owner_model.objects.filter(pk__in=owner_ids).update(updated_at=timezone.now())
+                bump_generation(model)
+                bump_generation(owner_model)
+        return updated, failed, skipped
@@ -0,0 +1,81 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from agde_moto.fastlist import ValuesRowBuilder
+from agde_moto.renderers import FastJSONRenderer, orjson
+from motorcycles.models import Motorcycle, MotorcycleImage
+from motorcycles.serializers import MotorcycleSerializer
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Compare le rendu des listes (serializer + JSONRenderer) avec la liste rapide (.values() + orjson).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='20,100,1000', help='Nombres de lignes, séparés par des virgules')
+        parser.add_argument('--repeat', type=int, default=7, help='Mesures par taille (médiane retenue)')
+        parser.add_argument('--images', type=int, default=3, help='Images par moto')
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',')]
+        self.stdout.write(f"orjson : {'oui' if orjson is not None else 'non (repli JSONRenderer)'}")
+        try:
+            # Données de test créées puis annulées
+            with transaction.atomic():
+                self.create_rows(max(sizes), options['images'])
+                for size in sizes:
+                    self.compare(size, options['repeat'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def create_rows(self, count, images):
+        motorcycles = Motorcycle.objects.bulk_create([
+            Motorcycle(
+                brand='Yamaha', model=f'Bench {i}', year=2020, price='7490.00', mileage=i,
+                engine='689cc', power=73, license='A2', color='Noir', description='Moto de test ' * 20,
+            )
+            for i in range(count)
+        ])
+        MotorcycleImage.objects.bulk_create([
+            MotorcycleImage(motorcycle=moto, image=f'motorcycles/{moto.id}/{j}.jpg', is_primary=(j == 0))
+            for moto in motorcycles
+            for j in range(images)
+        ])
+
+    def compare(self, size, repeat):
+        queryset = Motorcycle.objects.filter(model__startswith='Bench ').order_by('-created_at', '-id')
+        serializer_class = MotorcycleSerializer
+        builder = ValuesRowBuilder(serializer_class(context={'request': None}))
+
+        def current():
+            data = serializer_class(queryset.prefetch_related('images')[:size], many=True).data
+            return JSONRenderer().render(data)
+
+        def fast():
+            return FastJSONRenderer().render(builder.build(builder.values(queryset)[:size]))
+
+        if current() != fast():
+            self.stdout.write(self.style.ERROR(f'{size} lignes : sorties différentes'))
+            return
+        current_ms = self.measure(current, repeat)
+        fast_ms = self.measure(fast, repeat)
+        self.stdout.write(
+            f'{size:>5} lignes : serializer {current_ms:8.2f} ms | rapide {fast_ms:8.2f} ms | x{current_ms / fast_ms:.1f}'
+        )
+
+    @staticmethod
+    def measure(func, repeat):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) * 1000)
+        return statistics.median(timings)
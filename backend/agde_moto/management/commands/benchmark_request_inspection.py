@@ -0,0 +1,63 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+
+from agde_moto.inspection import RequestInspector
+
+LEGACY_AGENTS = ['sqlmap', 'nikto', 'nmap', 'masscan', 'nessus']
+LEGACY_SQL_PATTERNS = ['union', 'select', 'drop', 'insert', 'delete', 'update', '--', ';']
+
+SCENARIOS = {
+    'sans paramètres': ('/api/motorcycles/', {}),
+    'liste filtrée': ('/api/motorcycles/', {
+        'brand': 'Yamaha', 'license': 'A2', 'min_price': '3000', 'max_price': '9000',
+        'ordering': '-price', 'page': '2', 'search': 'mt-07 noir',
+    }),
+    'injection': ('/api/parts/', {'search': "x' UNION SELECT password FROM auth_user--", 'page': '1'}),
+}
+
+
+def legacy_inspect(request):
+    """Ancienne inspection (mots-clés en minuscules, any()), sans journalisation"""
+    user_agent = request.META.get('HTTP_USER_AGENT', '')
+    suspicious = any(agent in user_agent.lower() for agent in LEGACY_AGENTS)
+    for param_value in request.GET.values():
+        if isinstance(param_value, str) and any(pattern in param_value.lower() for pattern in LEGACY_SQL_PATTERNS):
+            suspicious = True
+    return suspicious
+
+
+class Command(BaseCommand):
+    help = "Mesure le coût par requête de l'inspection des requêtes (ancienne boucle vs règles compilées), en µs."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20000, help='Requêtes inspectées par mesure')
+        parser.add_argument('--repeat', type=int, default=5, help='Mesures par scénario (médiane retenue)')
+
+    def handle(self, *args, **options):
+        # Journalisation coupée : seul le coût de l'inspection est mesuré
+        inspector = RequestInspector(log_sample=10 ** 9)
+        inspector._record = lambda rule: False
+        factory = RequestFactory(HTTP_USER_AGENT='Mozilla/5.0 (X11; Linux x86_64) Firefox/128.0')
+
+        for label, (path, params) in SCENARIOS.items():
+            legacy_us = self.measure(factory, path, params, legacy_inspect, options)
+            compiled_us = self.measure(factory, path, params, inspector.inspect, options)
+            self.stdout.write(
+                f'{label:<16} : ancienne {legacy_us:6.2f} µs | compilée {compiled_us:6.2f} µs'
+            )
+
+    @staticmethod
+    def measure(factory, path, params, inspect, options):
+        iterations = options['iterations']
+        timings = []
+        for _ in range(options['repeat']):
+            # Requêtes neuves : l'analyse de la query string (request.GET) est comptée
+            requests = [factory.get(path, params) for _ in range(iterations)]
+            start = time.perf_counter()
+            for request in requests:
+                inspect(request)
+            timings.append((time.perf_counter() - start) * 1e6 / iterations)
+        return statistics.median(timings)
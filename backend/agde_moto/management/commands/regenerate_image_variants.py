@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+
+from agde_moto.image_variants import needs_variants, process_variants
+from blog.models import Post
+from motorcycles.models import MotorcycleImage
+from parts.models import PartImage
+
+# modèle -> (champ de l'image, champ des variantes)
+IMAGE_MODELS = [
+    (MotorcycleImage, 'image', 'variants'),
+    (PartImage, 'image', 'variants'),
+    (Post, 'image', 'image_variants'),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Génère les variantes manquantes ou périmées (tâches du pool perdues au redémarrage '
+        'd\'un worker, images créées hors des chemins d\'upload).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=200, help='Lignes lues par lot')
+        parser.add_argument('--dry-run', action='store_true', help='Compte les images concernées sans rien générer')
+
+    def handle(self, *args, **options):
+        for model, image_field, variants_field in IMAGE_MODELS:
+            count = self.regenerate(model, image_field, variants_field, options['batch_size'], options['dry_run'])
+            verb = 'à traiter' if options['dry_run'] else 'traitée(s)'
+            self.stdout.write(f'- {model._meta.label}: {count} image(s) {verb}')
+        self.stdout.write(self.style.SUCCESS('Variantes des images à jour'))
+
+    def regenerate(self, model, image_field, variants_field, batch_size, dry_run):
+        """Parcours par clé croissante : une interruption reprend où elle s'est arrêtée"""
+        queryset = model.objects.order_by('pk').values_list('pk', image_field, variants_field)
+        count = 0
+        last_pk = 0
+        while True:
+            batch = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+            last_pk = batch[-1][0]
+            for pk, key, variants in batch:
+                if not needs_variants(key, variants):
+                    continue
+                count += 1
+                if not dry_run:
+                    # Dans le thread courant ; save() déclenche les receivers (cache, ETag, manifeste)
+                    process_variants(model._meta.label, pk, image_field, variants_field)
+        return count
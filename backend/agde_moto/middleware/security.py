@@ -1,9 +1,9 @@
 """Middleware de sécurité personnalisé pour ajouter des en-têtes de sécurité"""
 import logging
 from django.utils.deprecation import MiddlewareMixin
-from django.http import HttpResponseForbidden
-from django.core.cache import cache
-import time
+from django.http import HttpResponse
+
+from agde_moto import inspection, ratelimit
 
 logger = logging.getLogger('agde_moto')
 
@@ -36,48 +36,31 @@ class SecurityHeadersMiddleware(MiddlewareMixin):
 
 class RequestLoggingMiddleware(MiddlewareMixin):
     """
-    Middleware pour enregistrer les requêtes suspectes
+    Middleware pour enregistrer les requêtes suspectes (règles compilées de
+    agde_moto.inspection, journalisation échantillonnée)
     """
     
     def process_request(self, request):
-        # Enregistrer les requêtes avec des User-Agents suspects
-        user_agent = request.META.get('HTTP_USER_AGENT', '')
-        suspicious_agents = ['sqlmap', 'nikto', 'nmap', 'masscan', 'nessus']
-        
-        if any(agent in user_agent.lower() for agent in suspicious_agents):
-            logger.warning(f"Requête suspecte détectée - User-Agent: {user_agent} - IP: {request.META.get('REMOTE_ADDR')} - URL: {request.path}")
-        
-        # Détecter les tentatives d'injection SQL dans les paramètres
-        sql_patterns = ['union', 'select', 'drop', 'insert', 'delete', 'update', '--', ';']
-        
-        for param_name, param_value in request.GET.items():
-            if isinstance(param_value, str) and any(pattern in param_value.lower() for pattern in sql_patterns):
-                logger.warning(f"Tentative d'injection SQL détectée - Paramètre: {param_name} - Valeur: {param_value} - IP: {request.META.get('REMOTE_ADDR')}")
-        
+        inspection.inspector.inspect(request)
         return None
 
 class DDoSProtectionMiddleware(MiddlewareMixin):
     """
-    Middleware simple de protection contre les attaques DDoS
+    Protection contre les rafales de requêtes, par IP et par préfixe de
+    chemin (RATE_LIMIT_ROUTES), avec les compteurs partagés de agde_moto.ratelimit
     """
     
     def process_request(self, request):
-        ip = request.META.get('REMOTE_ADDR')
-        if not ip:
+        policy = ratelimit.route_policy(request.path)
+        if policy is None or not ratelimit.client_ip(request):
             return None
         
-        # Clé pour le cache basée sur l'IP
-        cache_key = f"ddos_protection_{ip}"
+        try:
+            ratelimit.check(request, policy)
+        except ratelimit.RateLimited as exc:
+            logger.warning(f"Limite de requêtes dépassée pour l'IP: {ratelimit.client_ip(request)} (politique {policy})")
+            response = HttpResponse("Trop de requêtes. Veuillez réessayer plus tard.", status=429)
+            response['Retry-After'] = str(exc.retry_after)
+            return response
         
-        # Récupérer le nombre de requêtes pour cette IP
-        requests_count = cache.get(cache_key, 0)
-        
-        # Limite: 100 requêtes par minute
-        if requests_count >= 100:
-            logger.warning(f"Limite de requêtes dépassée pour l'IP: {ip} ({requests_count} requêtes)")
-            return HttpResponseForbidden("Trop de requêtes. Veuillez réessayer plus tard.")
-        
-        # Incrémenter le compteur
-        cache.set(cache_key, requests_count + 1, 60)  # 60 secondes
-        
-        return None
\ No newline at end of file
+        return None
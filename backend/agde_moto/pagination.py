@@ -0,0 +1,228 @@
+"""Pagination du catalogue : pages numérotées ou curseur (keyset)"""
+import base64
+import binascii
+import json
+from collections import OrderedDict
+from types import SimpleNamespace
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import connections
+from django.db.models import Q
+from rest_framework import exceptions
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+from .search import RANK_ANNOTATION
+
+
+class KeysetPagination(PageNumberPagination):
+    """
+    Pagination par numéro de page par défaut, par curseur sur demande.
+
+    Le mode curseur s'active avec `?cursor=` (vide pour la première page) et
+    pagine sur le couple (champ de tri, id) : pas de OFFSET, et l'ordre reste
+    stable même si des lignes sont insérées entre deux pages. Le champ de tri
+    est celui appliqué par OrderingFilter, donc limité aux `ordering_fields`
+    de la vue.
+
+    `?count=` contrôle le total renvoyé en mode curseur :
+    - `exact` (défaut) : COUNT(*) classique
+    - `none` : pas de total, aucune requête supplémentaire
+    - `estimate` : estimation du planificateur PostgreSQL (statistiques de
+      table), avec repli sur un COUNT exact pour les autres bases
+
+    Une recherche triée par pertinence (`search_rank`) n'a pas de clé de
+    tri stable à mettre dans un curseur : elle est paginée par numéro de
+    page même si `?cursor=` est présent.
+    """
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    default_cursor_page_size = 20
+    tiebreaker = 'id'
+    invalid_cursor_message = 'Curseur invalide'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        cursor_requested = self.cursor_query_param in request.query_params
+        self.cursor_mode = cursor_requested and not self.is_ranked(queryset)
+        if not self.cursor_mode:
+            if cursor_requested:
+                # Recherche classée : pages numérotées, à la taille du mode curseur
+                self.page_size = self.get_cursor_page_size(request)
+            return super().paginate_queryset(queryset, request, view)
+        return self.paginate_keyset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if not self.cursor_mode:
+            return super().get_paginated_response(data)
+        payload = OrderedDict()
+        if self.total is not None:
+            payload['count'] = self.total
+        payload['next'] = self.get_next_link()
+        payload['previous'] = self.get_previous_link()
+        payload['results'] = data
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        response = super().get_paginated_response_schema(schema)
+        response['required'] = ['results']
+        return response
+
+    # --- Mode curseur ---
+
+    def paginate_keyset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_cursor_page_size(request)
+        self.model = queryset.model
+        self.field_name, self.descending = self.get_keyset_ordering(queryset, view)
+        self.total = self.get_total(queryset, request)
+
+        position = self.decode_cursor(request)
+        backwards = bool(position and position['r'])
+        descending = self.descending != backwards
+
+        if position is not None:
+            queryset = queryset.filter(self.keyset_filter(position['v'], position['id'], descending))
+        queryset = queryset.order_by(*self.keyset_order_by(descending))
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if backwards:
+            rows.reverse()
+
+        self.first = rows[0] if rows else None
+        self.last = rows[-1] if rows else None
+        if backwards:
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+        return rows
+
+    @staticmethod
+    def is_ranked(queryset):
+        ordering = queryset.query.order_by
+        return bool(ordering) and ordering[0] == f'-{RANK_ANNOTATION}'
+
+    def get_cursor_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return api_settings.PAGE_SIZE or self.default_cursor_page_size
+        if size <= 0:
+            return api_settings.PAGE_SIZE or self.default_cursor_page_size
+        return min(size, self.max_page_size)
+
+    def get_keyset_ordering(self, queryset, view):
+        """Premier terme de tri du queryset, restreint aux champs autorisés de la vue"""
+        allowed = set(getattr(view, 'ordering_fields', None) or []) | {'created_at'}
+        ordering = list(queryset.query.order_by) or list(self.model._meta.ordering)
+        for term in ordering:
+            if not isinstance(term, str):
+                continue
+            name = term.lstrip('-')
+            if name in allowed and self.is_concrete_field(name):
+                return name, term.startswith('-')
+        return 'created_at', True
+
+    def is_concrete_field(self, name):
+        try:
+            field = self.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return False
+        return field.concrete and not field.is_relation and not field.null
+
+    def keyset_order_by(self, descending):
+        prefix = '-' if descending else ''
+        return [f'{prefix}{self.field_name}', f'{prefix}{self.tiebreaker}']
+
+    def keyset_filter(self, value, pk, descending):
+        lookup = 'lt' if descending else 'gt'
+        return (
+            Q(**{f'{self.field_name}__{lookup}': value})
+            | Q(**{self.field_name: value, f'{self.tiebreaker}__{lookup}': pk})
+        )
+
+    def get_total(self, queryset, request):
+        mode = request.query_params.get(self.count_query_param, 'exact')
+        if mode == 'none':
+            return None
+        if mode == 'estimate':
+            estimate = estimate_count(queryset)
+            if estimate is not None:
+                return estimate
+        return queryset.order_by().count()
+
+    # --- Encodage du curseur ---
+
+    def encode_cursor(self, obj, reverse):
+        if isinstance(obj, dict):
+            # Ligne .values() (listes rapides)
+            obj = SimpleNamespace(**obj)
+        field = self.model._meta.get_field(self.field_name)
+        position = {
+            'o': self.field_name,
+            'v': field.value_to_string(obj),
+            'id': getattr(obj, self.tiebreaker),
+            'r': int(reverse),
+        }
+        raw = json.dumps(position, separators=(',', ':')).encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param, '')
+        if not encoded:
+            return None
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            position = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+            if position['o'] != self.field_name:
+                raise ValueError('ordre différent')
+            field = self.model._meta.get_field(self.field_name)
+            position['v'] = field.to_python(position['v'])
+            position['id'] = int(position['id'])
+            position['r'] = bool(position.get('r'))
+        except (TypeError, ValueError, KeyError, binascii.Error, UnicodeError, ValidationError):
+            raise exceptions.ValidationError({self.cursor_query_param: self.invalid_cursor_message})
+        return position
+
+    def get_next_link(self):
+        if not self.cursor_mode:
+            return super().get_next_link()
+        if not self.has_next or self.last is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.last, reverse=False))
+
+    def get_previous_link(self):
+        if not self.cursor_mode:
+            return super().get_previous_link()
+        if not self.has_previous:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.first is None:
+            return replace_query_param(url, self.cursor_query_param, '')
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.first, reverse=True))
+
+
+def estimate_count(queryset):
+    """
+    Estimation du nombre de lignes par le planificateur PostgreSQL.
+
+    EXPLAIN s'appuie sur les statistiques de table (pg_class.reltuples et
+    histogrammes), sans parcourir les lignes. Retourne None si la base ne
+    fournit pas de plan JSON.
+    """
+    if connections[queryset.db].vendor != 'postgresql':
+        return None
+    try:
+        plan = json.loads(queryset.order_by().explain(format='json'))
+        return int(plan[0]['Plan']['Plan Rows'])
+    except (ValueError, KeyError, IndexError, TypeError):
+        return None
+
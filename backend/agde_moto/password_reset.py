@@ -11,8 +11,8 @@ from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAdminUser
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
-from django_ratelimit.decorators import ratelimit
+from agde_moto.authentication import RefreshToken
+from agde_moto.ratelimit import rate_limit
 import logging
 import traceback
 from django.core.mail import get_connection
@@ -45,10 +45,9 @@ def _metrics_inc(key: str, step: int = 1):
         pass
 
 # --- Rate limited endpoints ---
-@ratelimit(key='ip', rate='5/h', method='POST', block=True)
-@ratelimit(key='post:email', rate='3/h', method='POST', block=True)
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@rate_limit('password_reset')
 def request_password_reset(request):
     """
     Demande de réinitialisation de mot de passe pour les superusers uniquement
@@ -233,9 +232,9 @@ Token de sécurité : {token[:8]}...'''
         }, status=status.HTTP_200_OK)
 
 
-@ratelimit(key='ip', rate='10/h', method='POST', block=True)
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@rate_limit('password_reset_confirm')
 def confirm_password_reset(request, uidb64, token):
     """
     Confirmation de la réinitialisation de mot de passe
@@ -319,10 +318,9 @@ def confirm_password_reset(request, uidb64, token):
 
 
 # --- OTP Admin endpoints (voie alternative) ---
-@ratelimit(key='ip', rate='10/h', method='POST', block=True)
-@ratelimit(key='post:email', rate='5/h', method='POST', block=True)
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@rate_limit('admin_otp_request')
 def request_admin_otp(request):
     """Demande un OTP à usage unique envoyé par email pour un superuser actif."""
     email = (request.data.get('email') or '').strip().lower()
@@ -375,9 +373,9 @@ def request_admin_otp(request):
     return resp
 
 
-@ratelimit(key='ip', rate='20/h', method='POST', block=True)
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@rate_limit('admin_otp_check')
 def confirm_admin_otp(request):
     """Vérifie un OTP et réinitialise le mot de passe."""
     email = (request.data.get('email') or '').strip().lower()
@@ -424,9 +422,9 @@ def confirm_admin_otp(request):
     }, status=status.HTTP_200_OK)
 
 
-@ratelimit(key='ip', rate='20/h', method='POST', block=True)
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@rate_limit('admin_otp_check')
 def verify_admin_otp(request):
     """Vérifie simplement un OTP sans changer le mot de passe."""
     email = (request.data.get('email') or '').strip().lower()
@@ -0,0 +1,44 @@
+"""Image des cartes dénormalisée (`primary_image`) des motos et des pièces"""
+from django.db import transaction
+from django.db.models import Subquery
+
+
+def _owner(image, owner_field):
+    return image._meta.get_field(owner_field).related_model, getattr(image, f'{owner_field}_id')
+
+
+def demote_other_primaries(image, owner_field):
+    """Avant d'enregistrer une image principale : les autres images de l'objet ne le sont plus"""
+    if not image.is_primary:
+        return
+    (
+        type(image).objects.filter(**{f'{owner_field}_id': getattr(image, f'{owner_field}_id'), 'is_primary': True})
+        .exclude(pk=image.pk).update(is_primary=False)
+    )
+
+
+def refresh_primary_image(image, owner_field):
+    """Recalcule en une requête l'image des cartes de l'objet : la principale, sinon la plus ancienne"""
+    owner_model, owner_id = _owner(image, owner_field)
+    first = (
+        type(image).objects.filter(**{f'{owner_field}_id': owner_id})
+        .order_by('-is_primary', 'id').values('pk')[:1]
+    )
+    owner_model.objects.filter(pk=owner_id).update(primary_image=Subquery(first))
+
+
+def set_primary_image(owner, image_id, image_model, owner_field):
+    """
+    Désigne l'image principale d'un objet dans une transaction. La ligne de
+    l'objet est verrouillée pour sérialiser les appels concurrents ; les
+    receivers retirent l'ancienne principale et mettent `primary_image` à
+    jour. Lève `image_model.DoesNotExist` si l'image n'appartient pas à
+    l'objet.
+    """
+    with transaction.atomic():
+        type(owner).objects.select_for_update().filter(pk=owner.pk).values_list('pk').first()
+        image = image_model.objects.get(pk=image_id, **{owner_field: owner})
+        if not image.is_primary:
+            image.is_primary = True
+            image.save(update_fields=['is_primary'])
+    return image
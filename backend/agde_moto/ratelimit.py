@@ -0,0 +1,220 @@
+"""
+Limitation de débit partagée entre les workers.
+
+Fenêtre glissante approchée : le compteur de la fenêtre courante plus celui
+de la fenêtre précédente, pondéré par la part de celle-ci encore couverte
+par la fenêtre glissante. Deux clés par identifiant, incrémentées
+atomiquement : un script Lua sur Redis (vérification et incrément en un seul
+aller-retour), `cache.add` + `cache.incr` sur les autres backends. Une
+requête refusée n'est pas comptée.
+
+Chaque politique est une liste de règles `(clé, débit)` ; la clé est `ip`,
+`data:<champ>` (corps de la requête) ou `user`, le débit `<n>/<s|m|h|d>`.
+"""
+import hashlib
+import math
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import status
+from rest_framework.response import Response
+
+try:
+    from django_redis import get_redis_connection
+    from django_redis.cache import RedisCache
+except ImportError:  # pragma: no cover - django-redis absent
+    get_redis_connection = None
+    RedisCache = None
+
+DEFAULT_POLICIES = {
+    'global': [('ip', '100/m')],
+    'login': [('ip', '5/m'), ('data:username', '3/m')],
+    'password_reset': [('ip', '5/h'), ('data:email', '3/h')],
+    'password_reset_confirm': [('ip', '10/h')],
+    'admin_otp_request': [('ip', '10/h'), ('data:email', '5/h')],
+    'admin_otp_check': [('ip', '20/h')],
+}
+POLICIES = {**DEFAULT_POLICIES, **getattr(settings, 'RATE_LIMIT_POLICIES', {})}
+# Préfixe de chemin -> politique appliquée par DDoSProtectionMiddleware ;
+# None exempte le préfixe, les autres chemins suivent `global`
+ROUTES = getattr(settings, 'RATE_LIMIT_ROUTES', (('/static/', None), ('/media/', None)))
+RATE_LIMIT_CACHE = getattr(settings, 'RATE_LIMIT_CACHE', 'default')
+# Derrière nginx, X-Real-IP porte l'adresse du client ; REMOTE_ADDR sinon
+IP_META_KEY = getattr(settings, 'RATE_LIMIT_IP_META_KEY', 'REMOTE_ADDR')
+ENABLED = getattr(settings, 'RATE_LIMIT_ENABLED', True)
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+# KEYS : fenêtre courante, fenêtre précédente ; ARGV : limite, durée,
+# secondes écoulées dans la fenêtre courante
+SLIDING_WINDOW_LUA = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local elapsed = tonumber(ARGV[3])
+local estimate = previous * (window - elapsed) / window + current
+if estimate + 1 > limit then
+    return {0, current, previous}
+end
+current = redis.call('INCR', KEYS[1])
+if current == 1 then
+    redis.call('EXPIRE', KEYS[1], window * 2)
+end
+return {1, current, previous}
+"""
+
+
+class RateLimited(Exception):
+    def __init__(self, retry_after):
+        super().__init__(retry_after)
+        self.retry_after = retry_after
+
+
+def parse_rate(rate):
+    """'5/m' -> (5, 60) ; '10/2h' -> (10, 7200)"""
+    count, _, period = rate.partition('/')
+    multiplier = period[:-1] or '1'
+    return int(count), int(multiplier) * PERIODS[period[-1]]
+
+
+def retry_after(limit, window, elapsed, current, previous):
+    """Secondes avant qu'une nouvelle requête passe sous la limite"""
+    if current + 1 > limit or not previous:
+        return max(1, math.ceil(window - elapsed))
+    # La part de la fenêtre précédente décroît linéairement
+    wait = window - elapsed - (limit - current - 1) * window / previous
+    return max(1, math.ceil(wait))
+
+
+class SlidingWindowLimiter:
+    """Compteurs de fenêtre glissante sur un alias de cache"""
+
+    def __init__(self, alias=RATE_LIMIT_CACHE):
+        self.alias = alias
+        self._script = None
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def _redis_script(self):
+        if RedisCache is None or not isinstance(self.cache, RedisCache):
+            return None
+        if self._script is None:
+            self._script = get_redis_connection(self.alias).register_script(SLIDING_WINDOW_LUA)
+        return self._script
+
+    def hit(self, key, limit, window, now=None):
+        """
+        Compte une requête pour `key`. Retourne None si elle passe, sinon le
+        nombre de secondes à attendre.
+        """
+        now = time.time() if now is None else now
+        index, elapsed = divmod(now, window)
+        keys = [f'ratelimit:{key}:{int(index)}', f'ratelimit:{key}:{int(index) - 1}']
+
+        script = self._redis_script()
+        if script is not None:
+            keys = [self.cache.make_key(name) for name in keys]
+            allowed, current, previous = script(keys=keys, args=[limit, window, elapsed])
+        else:
+            allowed, current, previous = self._hit_cache(*keys, limit, window, elapsed)
+        if allowed:
+            return None
+        return retry_after(limit, window, elapsed, int(current), int(previous))
+
+    def _hit_cache(self, current_key, previous_key, limit, window, elapsed):
+        cache = self.cache
+        previous = cache.get(previous_key, 0)
+        cache.add(current_key, 0, window * 2)
+        try:
+            current = cache.incr(current_key)
+        except ValueError:
+            # Clé expirée entre add() et incr()
+            cache.add(current_key, 1, window * 2)
+            current = 1
+        if previous * (window - elapsed) / window + current > limit:
+            cache.decr(current_key)
+            return 0, current - 1, previous
+        return 1, current, previous
+
+
+limiter = SlidingWindowLimiter()
+
+
+def client_ip(request):
+    return request.META.get(IP_META_KEY) or request.META.get('REMOTE_ADDR', '')
+
+
+def _identity(request, key):
+    if key == 'ip':
+        return client_ip(request)
+    if key == 'user':
+        user = getattr(request, 'user', None)
+        return str(user.pk) if user is not None and user.is_authenticated else client_ip(request)
+    if key.startswith('data:'):
+        data = getattr(request, 'data', None)
+        if data is None:
+            data = request.POST
+        value = data.get(key[len('data:'):]) if hasattr(data, 'get') else None
+        return str(value).strip().lower() if value else None
+    raise ValueError(f'Clé de limitation inconnue : {key}')
+
+
+def check(request, policy):
+    """
+    Applique les règles de `policy` à la requête ; lève RateLimited avec le
+    délai d'attente le plus long si l'une d'elles est dépassée.
+    """
+    if not ENABLED:
+        return
+    waits = []
+    for key, rate in POLICIES[policy]:
+        identity = _identity(request, key)
+        if not identity:
+            continue
+        limit, window = parse_rate(rate)
+        digest = hashlib.sha256(identity.encode('utf-8')).hexdigest()[:32]
+        wait = limiter.hit(f'{policy}:{key}:{digest}', limit, window)
+        if wait is not None:
+            waits.append(wait)
+    if waits:
+        raise RateLimited(max(waits))
+
+
+def too_many_requests(retry_after):
+    response = Response(
+        {'error': 'Trop de requêtes. Veuillez réessayer plus tard.'},
+        status=status.HTTP_429_TOO_MANY_REQUESTS,
+    )
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
+def rate_limit(policy, methods=('POST',)):
+    """Décorateur de vue DRF (sous @api_view) : 429 avec Retry-After au-delà de la politique"""
+    if policy not in POLICIES:
+        raise ValueError(f'Politique de limitation inconnue : {policy}')
+
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if request.method in methods:
+                try:
+                    check(request, policy)
+                except RateLimited as exc:
+                    return too_many_requests(exc.retry_after)
+            return view(request, *args, **kwargs)
+        return wrapped
+    return decorator
+
+
+def route_policy(path):
+    """Politique de DDoSProtectionMiddleware pour un chemin"""
+    for prefix, policy in ROUTES:
+        if path.startswith(prefix):
+            return policy
+    return 'global'
@@ -0,0 +1,42 @@
+"""Rendu JSON rapide (orjson), octet pour octet identique au JSONRenderer de DRF"""
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # dépendance optionnelle : repli sur le JSONRenderer de DRF
+    orjson = None
+
+# Les dates passent par l'encodeur DRF ("Z" pour UTC, pas le format orjson) ;
+# les clés non textuelles sont converties comme le fait json.dumps
+ORJSON_OPTIONS = (
+    orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+    if orjson is not None else 0
+)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer servi par orjson quand il est installé.
+
+    Seule la sortie compacte UTF-8 (réglages par défaut de DRF) est prise en
+    charge ; l'indentation demandée par le client, les réglages
+    COMPACT_JSON/UNICODE_JSON désactivés ou un type refusé par orjson
+    renvoient au rendu DRF habituel. Les séparateurs U+2028/U+2029 sont
+    échappés comme dans JSONRenderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or not (api_settings.COMPACT_JSON and api_settings.UNICODE_JSON)
+            or self.get_indent(accepted_media_type, renderer_context or {})
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=JSONEncoder().default, option=ORJSON_OPTIONS)
+        except TypeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
@@ -0,0 +1,144 @@
+"""Cache des réponses publiques du catalogue, invalidé par numéro de génération"""
+import hashlib
+import time
+from datetime import datetime, timezone
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.utils.http import parse_http_date_safe
+from rest_framework import status
+from rest_framework.response import Response
+
+from .conditional import apply_validators, is_not_modified, normalized_params
+
+RESPONSE_CACHE_TIMEOUT = getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 300)
+# None : actif seulement si le cache par défaut est partagé entre processus.
+# Avec LocMem, une génération incrémentée par un worker gunicorn ne
+# l'est pas chez les autres, qui serviraient des réponses périmées.
+RESPONSE_CACHE_ENABLED = getattr(settings, 'RESPONSE_CACHE_ENABLED', None)
+
+METRICS_KEYS = {
+    'hits': 'metrics:response_cache:hits',
+    'misses': 'metrics:response_cache:misses',
+    'bypass': 'metrics:response_cache:bypass',
+}
+
+
+def response_cache_enabled():
+    if RESPONSE_CACHE_ENABLED is not None:
+        return RESPONSE_CACHE_ENABLED
+    return not isinstance(caches['default'], LocMemCache)
+
+
+def _generation_key(model):
+    return f'cache_generation:{model._meta.label_lower}'
+
+
+def _metrics_inc(name):
+    key = METRICS_KEYS[name]
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, None)
+
+
+def _initial_generation():
+    # Une génération perdue (éviction) repart d'une valeur jamais vue, ce qui
+    # invalide les réponses en cache au lieu de ressusciter une ancienne clé
+    return int(time.time() * 1000)
+
+
+def get_generations(models):
+    """Générations courantes d'une liste de modèles, en un aller-retour cache"""
+    keys = [_generation_key(model) for model in models]
+    current = cache.get_many(keys)
+    generations = []
+    for key in keys:
+        if key not in current:
+            cache.add(key, _initial_generation(), None)
+            current[key] = cache.get(key)
+        generations.append(current[key])
+    return generations
+
+
+def _incr_generation(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _initial_generation(), None)
+
+
+def bump_generation(model):
+    """
+    Invalide toutes les réponses en cache qui dépendent de `model`, après
+    le commit de la transaction courante (immédiatement hors transaction).
+    Incrémentée avant, la génération laisserait une requête concurrente
+    mettre en cache les anciennes données sous la nouvelle clé.
+    """
+    key = _generation_key(model)
+    transaction.on_commit(lambda: _incr_generation(key))
+
+
+def response_cache_key(request, models):
+    generations = '.'.join(str(g) for g in get_generations(models))
+    raw = f'{request.path}?{normalized_params(request.query_params)}#{generations}'
+    return 'response:' + hashlib.md5(raw.encode('utf-8')).hexdigest()
+
+
+def cache_response(view_method):
+    """
+    Met en cache la réponse d'une action GET publique.
+
+    La clé combine le chemin, les paramètres normalisés et la génération de
+    chaque modèle listé dans `cache_dependencies` sur la vue ; les receivers
+    post_save/post_delete des apps incrémentent ces générations. Les
+    requêtes authentifiées (administration) contournent le cache, comme
+    toutes les requêtes si le cache n'est pas partagé entre processus
+    (response_cache_enabled).
+
+    Les validateurs posés par conditional_list ou conditional_detail sont
+    conservés avec la réponse : un client à jour reçoit un 304 sans requête
+    SQL.
+    """
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        if request.method != 'GET' or request.user.is_authenticated or not response_cache_enabled():
+            _metrics_inc('bypass')
+            return view_method(self, request, *args, **kwargs)
+
+        key = response_cache_key(request, self.cache_dependencies)
+        cached = cache.get(key)
+        if cached is not None:
+            _metrics_inc('hits')
+            return _cached_response(request, cached)
+
+        _metrics_inc('misses')
+        response = view_method(self, request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, {
+                'data': response.data,
+                'etag': response.get('ETag'),
+                'last_modified': response.get('Last-Modified'),
+            }, RESPONSE_CACHE_TIMEOUT)
+        return response
+    return wrapper
+
+
+def _cached_response(request, cached):
+    etag = cached['etag']
+    if not etag:
+        return Response(cached['data'])
+    timestamp = parse_http_date_safe(cached['last_modified'] or '')
+    last_modified = datetime.fromtimestamp(timestamp, tz=timezone.utc) if timestamp is not None else None
+    if is_not_modified(request, etag, last_modified):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = Response(cached['data'])
+    return apply_validators(response, etag, last_modified)
+
+
+def response_cache_metrics():
+    return {name: cache.get(key, 0) for name, key in METRICS_KEYS.items()}
@@ -0,0 +1,161 @@
+"""Recherche du catalogue : plein texte (?search=) et approximative (?fuzzy=)"""
+import operator
+import re
+from functools import lru_cache, reduce
+
+from django.conf import settings
+from django.contrib.postgres.lookups import TrigramSimilar
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramSimilarity
+from django.db import connections
+from django.db.models import Case, F, FloatField, Q, Value, When
+from django.db.models.functions import Greatest
+from rest_framework import filters
+
+SEARCH_CONFIG = 'french'
+RANK_ANNOTATION = 'search_rank'
+# Seuil de similarité trigramme du repli Python ; sur PostgreSQL c'est celui de
+# l'opérateur % (pg_trgm.similarity_threshold, 0.3 par défaut) qui s'applique
+FUZZY_THRESHOLD = getattr(settings, 'FUZZY_SEARCH_THRESHOLD', 0.3)
+
+
+def supports_full_text(queryset_or_model, using='default'):
+    """Vrai si le modèle a un vecteur de recherche et que la base est PostgreSQL"""
+    model = getattr(queryset_or_model, 'model', queryset_or_model)
+    using = getattr(queryset_or_model, 'db', using)
+    return (
+        connections[using].vendor == 'postgresql'
+        and bool(getattr(model, 'search_vector_weights', None))
+    )
+
+
+def weighted_search_vector(weights):
+    """Construit le tsvector pondéré à partir de `((champ, poids), ...)`"""
+    vector = None
+    for field_name, weight in weights:
+        part = SearchVector(field_name, weight=weight, config=SEARCH_CONFIG)
+        vector = part if vector is None else vector + part
+    return vector
+
+
+def refresh_search_vector(instance):
+    """Recalcule le tsvector d'une instance (sans effet hors PostgreSQL)"""
+    model = type(instance)
+    if not instance.pk or not supports_full_text(model, using=instance._state.db or 'default'):
+        return
+    vector = weighted_search_vector(model.search_vector_weights)
+    model._default_manager.filter(pk=instance.pk).update(search_vector=vector)
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    """
+    SearchFilter adossé au tsvector pondéré du modèle.
+
+    Sur PostgreSQL, les termes sont interprétés comme une requête web
+    (dictionnaire français) sur la colonne indexée GIN `search_vector`, et
+    chaque ligne est annotée de son score `ts_rank`. Sur les autres bases
+    (settings_minimal), le comportement ILIKE de DRF est conservé.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        search_terms = self.get_search_terms(request)
+        if not search_terms or not supports_full_text(queryset):
+            return super().filter_queryset(request, queryset, view)
+
+        query = SearchQuery(' '.join(search_terms), config=SEARCH_CONFIG, search_type='websearch')
+        return queryset.filter(search_vector=query).annotate(
+            **{RANK_ANNOTATION: SearchRank(F('search_vector'), query)}
+        )
+
+
+class RankedOrderingFilter(filters.OrderingFilter):
+    """
+    OrderingFilter qui trie par pertinence quand une recherche plein texte
+    est active et qu'aucun `?ordering=` explicite n'est demandé.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        explicit = request.query_params.get(self.ordering_param)
+        if RANK_ANNOTATION in queryset.query.annotations and not explicit:
+            default = self.get_default_ordering(view) or []
+            return queryset.order_by(f'-{RANK_ANNOTATION}', *default)
+        return super().filter_queryset(request, queryset, view)
+
+
+# --- Recherche approximative (trigrammes) ---
+
+_WORD_SPLIT = re.compile(r'[^0-9a-zà-ÿ]+')
+
+
+@lru_cache(maxsize=4096)
+def trigrams(text):
+    """Trigrammes d'un texte, calculés comme pg_trgm (mots complétés par des espaces)"""
+    grams = set()
+    for word in _WORD_SPLIT.split((text or '').lower()):
+        if not word:
+            continue
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+def trigram_similarity(a, b):
+    """Équivalent Python de similarity() de pg_trgm"""
+    left, right = trigrams(a), trigrams(b)
+    if not left or not right:
+        return 0.0
+    return len(left & right) / len(left | right)
+
+
+class TrigramSearchFilter(filters.SearchFilter):
+    """
+    Recherche tolérante aux fautes de frappe sur `?fuzzy=` ("yamha mt07").
+
+    Chaque terme doit ressembler à au moins un des `fuzzy_fields` de la vue.
+    Sur PostgreSQL, l'opérateur % de pg_trgm exploite les index GIN
+    gin_trgm_ops ; ailleurs, la similarité est calculée en Python sur les
+    seules colonnes concernées. Les lignes sont annotées `search_rank` pour
+    être triées par pertinence par RankedOrderingFilter.
+    """
+    search_param = 'fuzzy'
+    search_title = 'Recherche approximative'
+    search_description = 'Termes comparés par similarité trigramme.'
+
+    def get_search_fields(self, view, request):
+        return getattr(view, 'fuzzy_fields', None)
+
+    def filter_queryset(self, request, queryset, view):
+        fields = self.get_search_fields(view, request)
+        terms = self.get_search_terms(request)
+        if not fields or not terms:
+            return queryset
+        if connections[queryset.db].vendor == 'postgresql':
+            return self.filter_postgresql(queryset, fields, terms)
+        return self.filter_python(queryset, fields, terms)
+
+    def filter_postgresql(self, queryset, fields, terms):
+        conditions = [
+            reduce(operator.or_, [Q(TrigramSimilar(F(field), Value(term))) for field in fields])
+            for term in terms
+        ]
+        queryset = queryset.filter(*conditions)
+        if RANK_ANNOTATION in queryset.query.annotations:
+            return queryset
+        query = ' '.join(terms)
+        scores = [TrigramSimilarity(field, query) for field in fields]
+        score = scores[0] if len(scores) == 1 else Greatest(*scores)
+        return queryset.annotate(**{RANK_ANNOTATION: score})
+
+    def filter_python(self, queryset, fields, terms):
+        query = ' '.join(terms)
+        scores = {}
+        for row in queryset.order_by().values_list('pk', *fields).iterator(chunk_size=2000):
+            pk, values = row[0], row[1:]
+            if all(max(trigram_similarity(term, value) for value in values) >= FUZZY_THRESHOLD for term in terms):
+                scores[pk] = max(trigram_similarity(query, value) for value in values)
+        queryset = queryset.filter(pk__in=list(scores))
+        if not scores or RANK_ANNOTATION in queryset.query.annotations:
+            return queryset
+        return queryset.annotate(**{RANK_ANNOTATION: Case(
+            *[When(pk=pk, then=Value(score)) for pk, score in scores.items()],
+            default=Value(0.0), output_field=FloatField(),
+        )})
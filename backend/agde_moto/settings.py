@@ -43,13 +43,13 @@ INSTALLED_APPS = [
     'rest_framework',
     'rest_framework_simplejwt',
     'corsheaders',
-    # 'django_ratelimit',  # Activé
     
     'agde_moto',
     'blog',
     'motorcycles',
     'parts',
     'garage',
+    'media_library',
 ]
 
 MIDDLEWARE = [
@@ -78,15 +78,33 @@ DATABASES = {
     }
 }
 
-# Configuration du cache - Utilisation du cache en mémoire pour le développement
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'unique-snowflake',
+# Configuration du cache : Redis (service `redis` de docker-compose), partagé
+# entre les workers gunicorn ; sans REDIS_URL (développement), cache en
+# mémoire propre à chaque processus
+REDIS_URL = os.environ.get('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django_redis.cache.RedisCache',
+            'LOCATION': REDIS_URL,
+            'OPTIONS': {'CLIENT_CLASS': 'django_redis.client.DefaultClient'},
+            'KEY_PREFIX': 'agde_moto',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'unique-snowflake',
+        }
     }
-}
 
-RATELIMIT_USE_CACHE = 'default'
+# Limitation de débit (agde_moto.ratelimit) sur le cache par défaut
+RATE_LIMIT_CACHE = 'default'
+# Adresse du client posée par nginx (X-Real-IP)
+RATE_LIMIT_IP_META_KEY = os.environ.get('RATE_LIMIT_IP_META_KEY', 'HTTP_X_REAL_IP')
+# Requêtes suspectes (agde_moto.inspection) : une détection journalisée sur N par règle
+REQUEST_INSPECTION_LOG_SAMPLE = int(os.environ.get('REQUEST_INSPECTION_LOG_SAMPLE', '100'))
 
 # Static files
 STATIC_URL = '/static/'
@@ -96,6 +114,35 @@ STATICFILES_DIRS = []
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = Path(os.environ.get('MEDIA_ROOT', str(BASE_DIR / 'media')))
+# Emplacement interne nginx des médias (X-Accel-Redirect) ; vide : Django sert les fichiers
+MEDIA_ACCEL_REDIRECT = os.environ.get('MEDIA_ACCEL_REDIRECT', '' if DEBUG else '/protected-media/')
+
+# Stockage des médias : 'local' (MEDIA_ROOT) ou 's3' (AWS S3, MinIO... via django-storages).
+# Les URLs en base restent en /media/... : /media/<chemin> redirige vers le bucket.
+MEDIA_STORAGE = os.environ.get('MEDIA_STORAGE', 'local')
+if MEDIA_STORAGE == 's3':
+    STORAGES = {
+        'default': {
+            'BACKEND': 'storages.backends.s3.S3Storage',
+            'OPTIONS': {
+                'bucket_name': os.environ.get('MEDIA_S3_BUCKET'),
+                # MinIO ou autre service compatible ; vide pour AWS
+                'endpoint_url': os.environ.get('MEDIA_S3_ENDPOINT_URL') or None,
+                'region_name': os.environ.get('MEDIA_S3_REGION') or None,
+                'access_key': os.environ.get('MEDIA_S3_ACCESS_KEY_ID'),
+                'secret_key': os.environ.get('MEDIA_S3_SECRET_ACCESS_KEY'),
+                # Domaine public (CDN) des fichiers ; sinon URL du bucket
+                'custom_domain': os.environ.get('MEDIA_S3_CUSTOM_DOMAIN') or None,
+                'file_overwrite': False,
+                'querystring_auth': False,
+            },
+        },
+        'staticfiles': {
+            'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+        },
+    }
+# Durée de validité des URLs d'upload direct (secondes)
+MEDIA_PRESIGNED_URL_EXPIRY = int(os.environ.get('MEDIA_PRESIGNED_URL_EXPIRY', '900'))
 
 # CORS Configuration - IMPORTANT pour la communication frontend/backend
 CORS_ALLOWED_ORIGINS = [
@@ -133,7 +180,8 @@ CSRF_TRUSTED_ORIGINS = [
 # REST Framework simple
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # simplejwt servi par un cache d'utilisateurs (agde_moto.authentication)
+        'agde_moto.authentication.JWTAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
@@ -222,11 +270,18 @@ SIMPLE_JWT = {
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
     'TOKEN_TYPE_CLAIM': 'token_type',
     'TOKEN_USER_CLASS': 'rest_framework_simplejwt.models.TokenUser',
+    # Jetons portant la version de l'utilisateur (révoqués quand elle change)
+    'TOKEN_OBTAIN_SERIALIZER': 'agde_moto.authentication.TokenObtainPairSerializer',
     'JTI_CLAIM': 'jti',
     'SLIDING_TOKEN_REFRESH_EXP_CLAIM': 'refresh_exp',
     'SLIDING_TOKEN_LIFETIME': timedelta(minutes=5),
     'SLIDING_TOKEN_REFRESH_LIFETIME': timedelta(days=1),
 }
+# Cache des utilisateurs authentifiés par JWT (par processus) : taille et durée de vie en secondes
+JWT_USER_CACHE_SIZE = int(os.getenv('JWT_USER_CACHE_SIZE', '1024'))
+JWT_USER_CACHE_TTL = int(os.getenv('JWT_USER_CACHE_TTL', '60'))
+# Jetons sans version refusés ; false le temps que ceux émis avant expirent
+JWT_REQUIRE_TOKEN_VERSION = os.getenv('JWT_REQUIRE_TOKEN_VERSION', 'true').lower() == 'true'
 
 # Configuration de sécurité des mots de passe
 AUTH_PASSWORD_VALIDATORS = [
@@ -255,10 +310,6 @@ CSRF_COOKIE_SECURE = not DEBUG
 CSRF_COOKIE_HTTPONLY = True
 CSRF_COOKIE_SAMESITE = 'Lax'
 
-# Limitation du taux de requêtes - temporairement désactivé
-# if 'django_ratelimit' not in INSTALLED_APPS:
-#     INSTALLED_APPS.append('django_ratelimit')
-
 # Remplacez la configuration DATABASES par :
 # Supprimez ces lignes (238-244) :
 # DATABASES = {
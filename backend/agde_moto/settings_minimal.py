@@ -25,11 +25,11 @@ INSTALLED_APPS = [
     'rest_framework',
     'rest_framework_simplejwt',
     'corsheaders',
-    'django_ratelimit',
     'blog',
     'motorcycles',
     'parts',
     'garage',
+    'media_library',
 ]
 
 MIDDLEWARE = [
@@ -53,15 +53,28 @@ DATABASES = {
     }
 }
 
+# TEST_DB=postgresql : tests sur PostgreSQL (plein texte, trigrammes), avec les DB_* de settings.py
+if os.environ.get('TEST_DB') == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DB_NAME', 'agde_moto'),
+            'USER': os.environ.get('DB_USER', 'agde_user'),
+            'PASSWORD': os.environ.get('DB_PASSWORD', 'agde_password123'),
+            'HOST': os.environ.get('DB_HOST', 'localhost'),
+            'PORT': os.environ.get('DB_PORT', '5432'),
+        }
+    }
+
 # Cache
+# Tests en un seul processus : le cache des réponses reste actif sur LocMem
+RESPONSE_CACHE_ENABLED = True
 CACHES = {
     'default': {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
 
-# Utiliser le cache par défaut pour django-ratelimit
-RATELIMIT_USE_CACHE = 'default'
 
 # Static files
 STATIC_URL = '/static/'
@@ -84,7 +97,8 @@ CORS_ALLOW_CREDENTIALS = True
 # REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # simplejwt servi par un cache d'utilisateurs (agde_moto.authentication)
+        'agde_moto.authentication.JWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -125,6 +139,7 @@ SIMPLE_JWT = {
     'BLACKLIST_AFTER_ROTATION': True,
     'ALGORITHM': 'HS256',
     'SIGNING_KEY': SECRET_KEY,
+    'TOKEN_OBTAIN_SERIALIZER': 'agde_moto.authentication.TokenObtainPairSerializer',
 }
 
 # Email (for development)
@@ -96,12 +96,12 @@ INSTALLED_APPS = [
     'rest_framework',
     'rest_framework_simplejwt',
     'corsheaders',
-    'django_ratelimit',
     # Applications métier
     'blog',
     'motorcycles',
     'parts',
     'garage',
+    'media_library',
 ]
 
 # Middleware avec sécurité renforcée
@@ -173,8 +173,9 @@ CACHES = {
 SESSION_ENGINE = 'django.contrib.sessions.backends.cache'
 SESSION_CACHE_ALIAS = 'default'
 
-# Activer django-ratelimit sur le cache par défaut
-RATELIMIT_USE_CACHE = 'default'
+# agde_moto.ratelimit : compteurs dans Redis, IP du client posée par nginx
+RATE_LIMIT_CACHE = 'default'
+RATE_LIMIT_IP_META_KEY = 'HTTP_X_REAL_IP'
 
 # ========================================
 # CONFIGURATION CORS RESTRICTIVE
@@ -216,7 +217,8 @@ CORS_ALLOWED_METHODS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # simplejwt servi par un cache d'utilisateurs (agde_moto.authentication)
+        'agde_moto.authentication.JWTAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
@@ -260,7 +262,11 @@ SIMPLE_JWT = {
     'USER_ID_CLAIM': 'user_id',
     'TOKEN_TYPE_CLAIM': 'token_type',
     'JTI_CLAIM': 'jti',
+    # Jetons portant la version `tv` (révocation au changement de mot de passe ou de rôle)
+    'TOKEN_OBTAIN_SERIALIZER': 'agde_moto.authentication.TokenObtainPairSerializer',
 }
+# Jetons sans version refusés ; false le temps que ceux émis avant expirent
+JWT_REQUIRE_TOKEN_VERSION = os.getenv('JWT_REQUIRE_TOKEN_VERSION', 'true').lower() == 'true'
 
 # ========================================
 # CONFIGURATION DES MOTS DE PASSE
@@ -298,6 +304,8 @@ STATICFILES_STORAGE = 'django.contrib.staticfiles.storage.ManifestStaticFilesSto
 # Configuration des uploads sécurisée
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+# Emplacement interne nginx des médias (X-Accel-Redirect)
+MEDIA_ACCEL_REDIRECT = '/protected-media/'
 
 # Limitations des uploads
 FILE_UPLOAD_MAX_MEMORY_SIZE = int(os.getenv('FILE_UPLOAD_MAX_MEMORY_SIZE', '2621440'))  # 2.5MB
@@ -0,0 +1,103 @@
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken as PlainRefreshToken
+
+from agde_moto import authentication
+from agde_moto.authentication import RefreshToken, UserCache, user_cache
+from agde_moto.testing import count_queries
+
+User = get_user_model()
+
+
+@pytest.fixture(autouse=True)
+def clear_user_cache():
+    user_cache.clear()
+    yield
+    user_cache.clear()
+
+
+@pytest.fixture
+def superadmin():
+    return User.objects.create_user('root', 'root@example.com', 'Secret123!', is_staff=True, is_superuser=True)
+
+
+def _client(token):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token.access_token}')
+    return client
+
+
+@pytest.mark.django_db
+def test_cached_user_skips_the_users_table(superadmin):
+    client = _client(RefreshToken.for_user(superadmin))
+
+    # Vue : une requête (liste des admins) ; l'authentification, une de plus au premier appel
+    first = count_queries(lambda: client.get('/api/superadmin/admins/'))
+    assert count_queries(lambda: client.get('/api/superadmin/admins/')) == first - 1
+    assert client.get('/api/superadmin/admins/').status_code == 200
+
+
+@pytest.mark.django_db
+def test_tokens_without_version_are_rejected(superadmin, monkeypatch):
+    legacy = _client(PlainRefreshToken.for_user(superadmin))
+    assert legacy.get('/api/superadmin/admins/').status_code == 401
+
+    # Période de transition : encore acceptés
+    monkeypatch.setattr(authentication, 'REQUIRE_TOKEN_VERSION', False)
+    assert legacy.get('/api/superadmin/admins/').status_code == 200
+
+
+@pytest.mark.django_db
+def test_password_or_role_change_revokes_tokens(superadmin):
+    client = _client(RefreshToken.for_user(superadmin))
+    assert client.get('/api/superadmin/admins/').status_code == 200
+
+    superadmin.set_password('Changed123!')
+    superadmin.save()
+    assert client.get('/api/superadmin/admins/').status_code == 401
+
+    client = _client(RefreshToken.for_user(superadmin))
+    assert client.get('/api/superadmin/admins/').status_code == 200
+    superadmin.is_superuser = False
+    superadmin.save()
+    assert client.get('/api/superadmin/admins/').status_code == 401
+
+
+@pytest.mark.django_db
+def test_delete_admin_invalidates_cached_user(superadmin):
+    other = User.objects.create_user('staff', 'staff@example.com', 'Secret123!', is_staff=True)
+    staff_client = _client(RefreshToken.for_user(other))
+    assert staff_client.get('/api/motorcycles/').status_code == 200
+    assert user_cache.get(other.pk) is not None
+
+    assert _client(RefreshToken.for_user(superadmin)).delete(f'/api/superadmin/admins/{other.pk}/').status_code == 200
+    assert user_cache.get(other.pk) is None
+    assert staff_client.get('/api/motorcycles/').status_code == 401
+
+
+@pytest.mark.django_db
+def test_token_endpoint_issues_versioned_tokens(superadmin):
+    response = APIClient().post('/api/token/', {'username': 'root', 'password': 'Secret123!'}, format='json')
+    assert response.status_code == 200
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.json()['access']}")
+    assert client.get('/api/superadmin/admins/').status_code == 200
+
+
+def test_user_cache_is_bounded_and_expires():
+    cache = UserCache(size=2, ttl=60)
+    users = [User(pk=pk, username=f'u{pk}') for pk in (1, 2, 3)]
+    for user in users:
+        cache.put(user.pk, user, cache.generation)
+    assert cache.get(1) is None and cache.get(3) is not None
+
+    # Lecture en base commencée avant une invalidation : pas de réinsertion
+    generation = cache.generation
+    cache.discard(2)
+    cache.put(2, users[1], generation)
+    assert cache.get(2) is None
+
+    cache.ttl = -1
+    cache.put(1, users[0], cache.generation)
+    assert cache.get(1) is None
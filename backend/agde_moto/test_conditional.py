@@ -0,0 +1,78 @@
+import pytest
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+from agde_moto.testing import assert_max_queries
+from motorcycles.models import Motorcycle, MotorcycleImage
+
+
+@pytest.fixture(autouse=True)
+def clear_cache_between_tests():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def _moto(model='MT-07'):
+    return Motorcycle.objects.create(
+        brand='Yamaha', model=model, year=2020, price='6990.00', mileage=0, engine='689cc',
+        power=73, license='A2', color='Noir', description='Test',
+    )
+
+
+@pytest.mark.django_db
+def test_list_revalidation_returns_304_until_inventory_changes(django_capture_on_commit_callbacks):
+    client = APIClient()
+    _moto()
+
+    first = client.get('/api/motorcycles/')
+    etag = first['ETag']
+    assert first.status_code == 200
+    # Pas de Last-Modified sur une liste : une suppression ne le ferait pas avancer
+    assert 'Last-Modified' not in first
+
+    # Réponse en cache : le 304 ne coûte aucune requête
+    with assert_max_queries(0):
+        assert client.get('/api/motorcycles/', HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    # Hors cache, le 304 ne coûte que l'agrégat max(updated_at)/count
+    cache.clear()
+    with assert_max_queries(1):
+        not_modified = client.get('/api/motorcycles/', HTTP_IF_NONE_MATCH=etag)
+    assert not_modified.status_code == 304
+    assert not_modified['ETag'] == etag
+
+    # Les filtres font partie de la représentation
+    assert client.get('/api/motorcycles/', {'brand': 'Yamaha'}, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    with django_capture_on_commit_callbacks(execute=True):
+        second = _moto('MT-09')
+    changed = client.get('/api/motorcycles/', HTTP_IF_NONE_MATCH=etag)
+    assert changed.status_code == 200
+    assert changed['ETag'] != etag
+
+    # Suppression : max(updated_at) inchangé, l'ETag change avec le nombre de lignes
+    etag = changed['ETag']
+    with django_capture_on_commit_callbacks(execute=True):
+        second.delete()
+    future = 'Fri, 01 Jan 2100 00:00:00 GMT'
+    assert client.get('/api/motorcycles/', HTTP_IF_NONE_MATCH=etag).status_code == 200
+    assert client.get('/api/motorcycles/', HTTP_IF_MODIFIED_SINCE=future).status_code == 200
+
+
+@pytest.mark.django_db
+def test_detail_etag_follows_images_and_if_modified_since():
+    client = APIClient()
+    moto = _moto()
+
+    first = client.get(f'/api/motorcycles/{moto.pk}/')
+    etag, last_modified = first['ETag'], first['Last-Modified']
+    assert client.get(f'/api/motorcycles/{moto.pk}/', HTTP_IF_NONE_MATCH=f'W/{etag}').status_code == 304
+    assert client.get(f'/api/motorcycles/{moto.pk}/', HTTP_IF_MODIFIED_SINCE=last_modified).status_code == 304
+
+    MotorcycleImage.objects.create(motorcycle=moto, image='/media/motorcycles/1/a.jpg')
+    refreshed = client.get(f'/api/motorcycles/{moto.pk}/', HTTP_IF_NONE_MATCH=etag)
+    assert refreshed.status_code == 200
+    assert len(refreshed.json()['images']) == 1
+
+    assert client.get('/api/motorcycles/999999/').status_code == 404
@@ -0,0 +1,67 @@
+import pytest
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+from agde_moto.testing import assert_max_queries
+from motorcycles.models import Motorcycle
+from parts.models import Category, Part
+
+
+@pytest.fixture(autouse=True)
+def clear_cache_between_tests():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def _moto(brand, year, price, is_new=False):
+    return Motorcycle.objects.create(
+        brand=brand, model='X', year=year, price=price, mileage=0, engine='650cc',
+        power=70, license='A2', color='Noir', description='Test', is_new=is_new,
+    )
+
+
+def _by_value(entries):
+    return {entry['value']: entry['count'] for entry in entries}
+
+
+@pytest.mark.django_db
+def test_motorcycle_facets_follow_filters_and_search():
+    client = APIClient()
+    _moto('Yamaha', 2020, '6500.00', is_new=True)
+    _moto('Yamaha', 2018, '4500.00')
+    _moto('Honda', 2018, '16000.00')
+
+    data = client.get('/api/motorcycles/facets/').json()
+    assert data['count'] == 3
+    assert _by_value(data['facets']['brand']) == {'Yamaha': 2, 'Honda': 1}
+    assert _by_value(data['facets']['condition']) == {True: 1, False: 2}
+    assert _by_value(data['facets']['price']) == {
+        '-3000': 0, '3000-6000': 1, '6000-10000': 1, '10000-15000': 0, '15000-': 1,
+    }
+
+    filtered = client.get('/api/motorcycles/facets/', {'year': 2018}).json()
+    assert filtered['count'] == len(client.get('/api/motorcycles/', {'year': 2018}).json())
+    assert _by_value(filtered['facets']['brand']) == {'Yamaha': 1, 'Honda': 1}
+
+    band = client.get('/api/motorcycles/', {'price__gte': 3000, 'price__lt': 6000}).json()
+    assert len(band) == 1
+
+
+@pytest.mark.django_db
+def test_part_facets_are_cached_per_normalized_query():
+    client = APIClient()
+    category = Category.objects.create(name='Freinage', slug='freinage')
+    for condition in ('new', 'new', 'used_good'):
+        Part.objects.create(
+            name='Plaquettes', category=category, brand='Brembo', compatible_models='',
+            price='45.00', condition=condition, description='Test',
+        )
+
+    data = client.get('/api/parts/facets/', {'brand': 'Brembo', 'page': 2}).json()
+    assert data['facets']['category'] == [{'value': category.id, 'label': 'Freinage', 'count': 3}]
+    assert _by_value(data['facets']['condition']) == {'new': 2, 'used_good': 1}
+
+    # Même état de filtre (pagination ignorée) : servi depuis le cache
+    with assert_max_queries(0):
+        client.get('/api/parts/facets/', {'brand': 'Brembo'})
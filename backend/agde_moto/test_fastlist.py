@@ -0,0 +1,77 @@
+import pytest
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+from agde_moto import fastlist
+from agde_moto.renderers import FastJSONRenderer
+from agde_moto.testing import assert_max_queries
+from blog.models import Category as BlogCategory, Post
+from motorcycles.models import Motorcycle, MotorcycleImage
+from parts.models import Category, Part, PartImage
+
+
+@pytest.fixture(autouse=True)
+def clear_cache_between_tests():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def catalog():
+    for i in range(4):
+        moto = Motorcycle.objects.create(
+            brand='Yamaha', model=f'MT-0{i}', year=2020 + i, price=f'{6990 + i}.50', mileage=10 * i,
+            engine='689cc', power=73, license='A2', color='Noir',
+            description='Révisée, « comme neuve » ligne 2', is_sold=(i == 3),
+        )
+        for j in range(i):
+            MotorcycleImage.objects.create(motorcycle=moto, image=f'/media/motorcycles/{moto.id}/{j}.jpg')
+    category = Category.objects.create(name='Freinage', slug='freinage')
+    for i in range(3):
+        part = Part.objects.create(
+            name=f'Levier {i}', category=category, brand='Brembo', compatible_models='Yamaha MT-07',
+            price='39.90', stock=i, condition='used_good' if i else 'new', description='Pièce',
+        )
+        PartImage.objects.create(part=part, image=f'http://192.168.0.10:8000/media/parts/{part.id}/a.jpg')
+    blog_category = BlogCategory.objects.create(name='Actus', slug='actus')
+    Post.objects.create(title='Salon', slug='salon', category=blog_category, content='Texte', is_published=True)
+
+
+def _both(client, url, monkeypatch, **params):
+    """Corps de réponse avec et sans la liste rapide"""
+    fast = client.get(url, params)
+    cache.clear()
+    monkeypatch.setattr(fastlist, 'FAST_LIST_RENDERING', False)
+    slow = client.get(url, params)
+    monkeypatch.setattr(fastlist, 'FAST_LIST_RENDERING', True)
+    cache.clear()
+    assert fast.status_code == slow.status_code == 200
+    return fast.content, slow.content
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('url, params', [
+    ('/api/motorcycles/', {}),
+    ('/api/motorcycles/', {'ordering': 'price', 'brand': 'Yamaha'}),
+    ('/api/motorcycles/', {'cursor': '', 'page_size': 2}),
+    ('/api/motorcycles/featured/', {}),
+    ('/api/parts/', {}),
+    ('/api/parts/', {'search': 'levier'}),
+    ('/api/blog/', {}),
+])
+def test_fast_list_is_byte_identical(catalog, monkeypatch, url, params):
+    fast, slow = _both(APIClient(), url, monkeypatch, **params)
+    assert fast == slow
+
+
+@pytest.mark.django_db
+def test_fast_list_query_count(catalog):
+    # Lignes, puis images groupées : pas de requête par objet
+    with assert_max_queries(3):
+        assert APIClient().get('/api/motorcycles/').status_code == 200
+
+
+def test_renderer_matches_drf_escaping():
+    data = {'texte': 'a b "c" é', 'n': 1.5, 'cle': None}
+    assert FastJSONRenderer().render(data) == b'{"texte":"a\\u2028b \\"c\\" \xc3\xa9","n":1.5,"cle":null}'
@@ -0,0 +1,76 @@
+import pytest
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+from agde_moto.testing import assert_max_queries
+from motorcycles.models import Motorcycle, MotorcycleImage
+from parts.models import Category, Part, PartImage
+
+
+@pytest.fixture(autouse=True)
+def clear_cache_between_tests():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def _moto(model='MT-07', images=3):
+    moto = Motorcycle.objects.create(
+        brand='Yamaha', model=model, year=2020, price='6990.00', mileage=0, engine='689cc',
+        power=73, license='A2', color='Noir', description='Longue description',
+    )
+    for i in range(images):
+        MotorcycleImage.objects.create(
+            motorcycle=moto, image=f'/media/motorcycles/{moto.id}/{i}.jpg', is_primary=(i == 1)
+        )
+    return moto
+
+
+@pytest.mark.django_db
+def test_fields_and_exclude_select_serialized_fields():
+    client = APIClient()
+    _moto()
+
+    row = client.get('/api/motorcycles/', {'fields': 'brand,price,unknown'}).json()[0]
+    assert set(row) == {'id', 'brand', 'price'}
+
+    row = client.get('/api/motorcycles/', {'exclude': 'description,images'}).json()[0]
+    assert 'description' not in row and 'images' not in row
+    assert 'model' in row and 'primary_image' not in row
+
+    # Représentation par défaut inchangée
+    row = client.get('/api/motorcycles/').json()[0]
+    assert 'description' in row and len(row['images']) == 3 and 'primary_image' not in row
+
+
+@pytest.mark.django_db
+def test_card_view_returns_primary_image_only():
+    client = APIClient()
+    for i in range(3):
+        _moto(f'MT-0{i}')
+    _moto('Sans photo', images=0)
+
+    with assert_max_queries(3):
+        rows = client.get('/api/motorcycles/', {'view': 'card'}).json()
+    assert 'description' not in rows[0] and 'images' not in rows[0]
+    by_model = {row['model']: row['primary_image'] for row in rows}
+    assert by_model['Sans photo'] is None
+    assert by_model['MT-00']['image'].endswith('/1.jpg')
+
+    featured = client.get('/api/motorcycles/featured/', {'view': 'card'}).json()
+    assert {row['model']: row['primary_image'] for row in featured}['MT-01']['is_primary'] is True
+
+
+@pytest.mark.django_db
+def test_part_card_view_keeps_category():
+    category = Category.objects.create(name='Freinage', slug='freinage')
+    part = Part.objects.create(
+        name='Levier', category=category, brand='Brembo', compatible_models='Yamaha MT-07',
+        price='39.90', stock=5, description='Pièce',
+    )
+    PartImage.objects.create(part=part, image='/media/parts/1/a.jpg')
+
+    row = APIClient().get('/api/parts/', {'view': 'card'}).json()[0]
+    assert row['category']['name'] == 'Freinage'
+    assert row['primary_image']['image'] == '/media/parts/1/a.jpg'
+    assert 'compatible_models' not in row
@@ -0,0 +1,100 @@
+import base64
+import io
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from PIL import Image
+from rest_framework.test import APIClient
+
+from agde_moto.management.commands.backfill_image_metadata import Command as BackfillCommand
+from motorcycles.models import Motorcycle, MotorcycleImage
+from parts.models import Category, Part, PartImage
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    cache.clear()
+    yield tmp_path
+    cache.clear()
+
+
+def _jpeg(width=1200, height=800, orientation=None):
+    buffer = io.BytesIO()
+    exif = Image.Exif()
+    if orientation:
+        exif[0x0112] = orientation
+    Image.new('RGB', (width, height), (30, 90, 160)).save(buffer, 'JPEG', exif=exif)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def moto():
+    return Motorcycle.objects.create(
+        brand='Yamaha', model='MT-07', year=2020, price='6990.00', mileage=0, engine='689cc',
+        power=73, license='A2', color='Noir', description='Test',
+    )
+
+
+@pytest.mark.django_db
+def test_upload_records_dimensions_and_placeholder(moto):
+    admin = get_user_model().objects.create_user('admin', 'admin@example.com', 'Secret123!', is_staff=True)
+    client = APIClient()
+    client.force_authenticate(admin)
+    content = _jpeg(orientation=6)
+    upload = SimpleUploadedFile('photo.jpg', content, content_type='image/jpeg')
+    created = client.post(f'/api/motorcycles/{moto.pk}/upload_images/', {'images': [upload]}, format='multipart').json()[0]
+
+    # Orientation EXIF appliquée : portrait
+    assert (created['width'], created['height']) == (800, 1200)
+    assert created['file_size'] == len(content)
+    assert created['mime_type'] == 'image/jpeg'
+    prefix = 'data:image/webp;base64,'
+    assert created['placeholder'].startswith(prefix)
+    with Image.open(io.BytesIO(base64.b64decode(created['placeholder'][len(prefix):]))) as preview:
+        assert max(preview.size) <= 16 and preview.size[1] > preview.size[0]
+
+    detail = APIClient().get(f'/api/motorcycles/{moto.pk}/').json()
+    assert detail['images'][0]['placeholder'] == created['placeholder']
+    listed = APIClient().get('/api/motorcycles/').json()
+    assert listed[0]['images'][0]['width'] == 800
+
+
+@pytest.mark.django_db
+def test_backfill_fills_existing_rows(moto, media_root):
+    folder = media_root / 'parts' / '1'
+    folder.mkdir(parents=True)
+    buffer = io.BytesIO()
+    Image.new('RGBA', (40, 20)).save(buffer, 'PNG')
+    (folder / 'old.png').write_bytes(buffer.getvalue())
+    part = Part.objects.create(
+        name='Levier', category=Category.objects.create(name='Freinage', slug='freinage'),
+        brand='Brembo', compatible_models='', price='39.90', stock=5, description='Pièce',
+    )
+    image = PartImage.objects.create(part=part, image='/media/parts/1/old.png')
+    (folder / 'notes.jpg').write_bytes(b'pas une image')
+    unreadable = PartImage.objects.create(part=part, image='/media/parts/1/notes.jpg')
+    external = MotorcycleImage.objects.create(motorcycle=moto, image='https://cdn.example.com/photo.jpg')
+    # Lignes antérieures au relevé à l'upload
+    PartImage.objects.update(width=None, height=None, file_size=None, mime_type='', placeholder='')
+
+    # agde_moto n'est pas une application installée avec settings_minimal
+    out = io.StringIO()
+    call_command(BackfillCommand(), stdout=out)
+    assert 'parts.PartImage: 1 mise(s) à jour, 1 illisible(s), 0 ignorée(s)' in out.getvalue()
+    image.refresh_from_db()
+    assert (image.width, image.height, image.mime_type) == (40, 20, 'image/png')
+    assert image.file_size == len(buffer.getvalue())
+    assert image.placeholder.startswith('data:image/webp;base64,')
+    unreadable.refresh_from_db()
+    assert (unreadable.width, unreadable.file_size, unreadable.mime_type) == (None, 13, 'image/jpeg')
+    external.refresh_from_db()
+    assert external.width is None
+
+    # Le fichier illisible n'est pas relu au passage suivant
+    out = io.StringIO()
+    call_command(BackfillCommand(), stdout=out)
+    assert 'parts.PartImage: 0 mise(s) à jour, 0 illisible(s), 0 ignorée(s)' in out.getvalue()
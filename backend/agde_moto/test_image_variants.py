@@ -0,0 +1,146 @@
+import io
+import os
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from PIL import Image
+from rest_framework.test import APIClient
+
+from agde_moto import image_variants
+from agde_moto.management.commands.regenerate_image_variants import Command as RegenerateCommand
+from blog.models import Category as BlogCategory, Post
+from media_library import manifest
+from motorcycles.models import Motorcycle, MotorcycleImage
+from utils import file_cleanup
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path, monkeypatch):
+    settings.MEDIA_ROOT = str(tmp_path)
+    monkeypatch.setattr(image_variants, 'VARIANTS_ASYNC', False)
+    monkeypatch.setattr(file_cleanup, 'CLEANUP_ASYNC', False)
+    monkeypatch.setattr(manifest, 'HASH_ASYNC', False)
+    cache.clear()
+    yield tmp_path
+    cache.clear()
+
+
+def _photo(width=1400, height=900, orientation=6):
+    """JPEG de téléphone : EXIF avec orientation (6 = rotation de 90°)"""
+    exif = Image.Exif()
+    exif[0x0112] = orientation
+    exif[0x010F] = 'PhoneMaker'
+    buffer = io.BytesIO()
+    Image.new('RGB', (width, height), (200, 30, 30)).save(buffer, 'JPEG', exif=exif)
+    return SimpleUploadedFile('photo.jpg', buffer.getvalue(), content_type='image/jpeg')
+
+
+@pytest.mark.django_db
+def test_upload_generates_oriented_stripped_variants(media_root, django_capture_on_commit_callbacks):
+    admin = get_user_model().objects.create_user('admin', 'admin@example.com', 'Secret123!', is_staff=True)
+    client = APIClient()
+    client.force_authenticate(admin)
+    moto = Motorcycle.objects.create(
+        brand='Yamaha', model='MT-07', year=2020, price='6990.00', mileage=0, engine='689cc',
+        power=73, license='A2', color='Noir', description='Test',
+    )
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = client.post(f'/api/motorcycles/{moto.pk}/upload_images/', {'images': [_photo()]}, format='multipart')
+    assert response.status_code == 201
+
+    image = MotorcycleImage.objects.get(motorcycle=moto)
+    assert image.variants['source'] == image.image
+    # Orientation appliquée : portrait 900x1400
+    assert (image.variants['width'], image.variants['height']) == (900, 1400)
+    webp = image.variants['formats']['webp']
+    assert [entry['width'] for entry in webp] == [320, 640]
+
+    path = os.path.join(media_root, webp[0]['key'])
+    with Image.open(path) as variant:
+        assert variant.format == 'WEBP'
+        assert variant.size == (320, 498)
+        assert not variant.getexif()
+
+    detail = APIClient().get(f'/api/motorcycles/{moto.pk}/').json()
+    srcset = detail['images'][0]['srcset']['webp']
+    assert srcset == f"/media/{webp[0]['key']} 320w, /media/{webp[1]['key']} 640w"
+
+    with django_capture_on_commit_callbacks(execute=True):
+        image.delete()
+    assert not os.path.exists(path)
+
+
+@pytest.mark.django_db
+def test_unreadable_upload_is_recorded_without_retry(media_root, django_capture_on_commit_callbacks):
+    moto = Motorcycle.objects.create(
+        brand='Yamaha', model='MT-07', year=2020, price='6990.00', mileage=0, engine='689cc',
+        power=73, license='A2', color='Noir', description='Test',
+    )
+    os.makedirs(media_root / 'motorcycles', exist_ok=True)
+    (media_root / 'motorcycles' / 'notes.jpg').write_bytes(b'pas une image')
+
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        image = MotorcycleImage.objects.create(motorcycle=moto, image='/media/motorcycles/notes.jpg')
+    # Une seule génération programmée : l'échec enregistré n'en relance pas
+    assert [callback.__qualname__ for callback in callbacks].count('schedule_variants.<locals>.<lambda>') == 1
+
+    image.refresh_from_db()
+    assert 'error' in image.variants
+    assert not image_variants.needs_variants(image.image, image.variants)
+
+
+@pytest.mark.django_db
+def test_lost_jobs_are_regenerated_by_command(media_root, django_capture_on_commit_callbacks):
+    moto = Motorcycle.objects.create(
+        brand='Yamaha', model='MT-07', year=2020, price='6990.00', mileage=0, engine='689cc',
+        power=73, license='A2', color='Noir', description='Test',
+    )
+    os.makedirs(media_root / 'motorcycles', exist_ok=True)
+    Image.new('RGB', (800, 600), (10, 120, 40)).save(media_root / 'motorcycles' / 'lost.jpg', 'JPEG')
+    # Tâche programmée mais jamais exécutée (worker redémarré)
+    with django_capture_on_commit_callbacks(execute=False):
+        image = MotorcycleImage.objects.create(motorcycle=moto, image='motorcycles/lost.jpg')
+    assert image_variants.needs_variants(image.image, image.variants)
+
+    out = io.StringIO()
+    call_command(RegenerateCommand(), '--dry-run', stdout=out)
+    assert 'motorcycles.MotorcycleImage: 1 image(s) à traiter' in out.getvalue()
+    image.refresh_from_db()
+    assert image.variants == {}
+
+    call_command(RegenerateCommand(), stdout=io.StringIO())
+    image.refresh_from_db()
+    assert image.variants['source'] == image.image
+    assert [entry['width'] for entry in image.variants['formats']['webp']] == [320, 640]
+    assert os.path.exists(media_root / image.variants['formats']['webp'][0]['key'])
+
+
+@pytest.mark.django_db
+def test_image_replaced_during_generation_keeps_current_file(media_root, monkeypatch):
+    os.makedirs(media_root / 'blog' / '1', exist_ok=True)
+    for name in ('old.jpg', 'new.jpg'):
+        Image.new('RGB', (800, 600), (10, 120, 40)).save(media_root / 'blog' / '1' / name, 'JPEG')
+    post = Post.objects.create(
+        title='Salon', slug='salon', category=BlogCategory.objects.create(name='Actus', slug='actus'),
+        content='Texte', image='blog/1/old.jpg',
+    )
+    generate = image_variants.generate_variants
+
+    def replaced_meanwhile(key):
+        variants = generate(key)
+        # Nouvelle couverture enregistrée pendant la génération (sans déclencher le pool)
+        Post.objects.filter(pk=post.pk).update(image='blog/1/new.jpg')
+        return variants
+
+    monkeypatch.setattr(image_variants, 'generate_variants', replaced_meanwhile)
+    image_variants.process_variants('blog.Post', post.pk, 'image', 'image_variants')
+
+    post.refresh_from_db()
+    assert post.image == 'blog/1/new.jpg'
+    # Variantes de l'ancienne image abandonnées, nouvelle couverture intacte
+    assert post.image_variants == {}
+    assert sorted(os.listdir(media_root / 'blog' / '1')) == ['new.jpg', 'old.jpg']
@@ -0,0 +1,46 @@
+import logging
+
+from django.test import RequestFactory
+
+from agde_moto.inspection import RequestInspector
+
+factory = RequestFactory()
+
+
+def test_attack_patterns_are_detected_and_harmless_values_are_not():
+    inspector = RequestInspector()
+    attacks = {
+        "x' UNION ALL SELECT password FROM auth_user--": 'union_select',
+        '1; DROP TABLE motorcycles': 'stacked_query',
+        'DROP TABLE motorcycles': 'drop',
+        "admin' OR '1'='1": 'tautology',
+        "1' AND SLEEP(5)": 'sleep',
+    }
+    for value, rule in attacks.items():
+        assert inspector.query.match(value.lower()) == rule
+    for value in ('update;2024', 'selection noire', 'mise à jour -- update', 'Moto d\'occasion; révisée'):
+        assert inspector.query.match(value.lower()) is None
+    assert inspector.user_agent.match('sqlmap/1.7') == 'scanner'
+
+
+def test_hits_are_counted_and_logs_sampled(caplog):
+    inspector = RequestInspector(log_sample=3)
+    with caplog.at_level(logging.WARNING, logger='agde_moto'):
+        for _ in range(4):
+            inspector.inspect(factory.get('/api/parts/', {'search': 'a', 'q': "' or 1=1"}, HTTP_USER_AGENT='Nikto'))
+        inspector.inspect(factory.get('/api/parts/', {'search': 'casque; gants'}))
+    assert inspector.hit_counts() == {'tautology': 4, 'scanner': 4}
+    # Premières détections, puis une sur trois
+    assert len(caplog.records) == 4
+    assert "Paramètre: q" in caplog.records[1].getMessage()
+
+
+def test_rule_sets_are_configurable():
+    inspector = RequestInspector(rules={
+        'query': {'tautology': None, 'path_traversal': (('../',), None)},
+        'user_agent': {'curl': (('curl/',), None)},
+    })
+    assert inspector.query.match("' or 1=1") is None
+    assert inspector.query.match('../../etc/passwd') == 'path_traversal'
+    assert inspector.user_agent.match('curl/8.0') == 'curl'
+    assert inspector.user_agent.match('sqlmap') == 'scanner'
@@ -0,0 +1,86 @@
+import pytest
+from rest_framework.test import APIClient
+
+from motorcycles.models import Motorcycle
+
+
+def _moto(i, price='5000.00'):
+    return Motorcycle.objects.create(
+        brand='Honda', model=f'CB{i}', year=2015 + i % 8, price=price,
+        mileage=i * 100, engine='500cc', power=47, license='A2',
+        color='Rouge', description='Test',
+    )
+
+
+def _walk(client, url):
+    ids, pages = [], 0
+    while url:
+        data = client.get(url).json()
+        ids.extend(row['id'] for row in data['results'])
+        url = data['next']
+        pages += 1
+    return ids, pages
+
+
+@pytest.mark.django_db
+def test_cursor_walk_is_stable_under_inserts():
+    client = APIClient()
+    for i in range(25):
+        _moto(i)
+
+    first = client.get('/api/motorcycles/?cursor=&page_size=10').json()
+    assert first['count'] == 25
+    assert first['previous'] is None
+    seen = [row['id'] for row in first['results']]
+
+    # Une insertion entre deux pages ne décale ni ne duplique les lignes suivantes
+    _moto(99)
+    rest, _ = _walk(client, first['next'])
+    seen += rest
+    assert len(seen) == len(set(seen)) == 25
+
+
+@pytest.mark.django_db
+def test_cursor_follows_ordering_with_ties_and_previous_link():
+    client = APIClient()
+    for i in range(7):
+        _moto(i, price='4000.00' if i % 2 else '3000.00')
+
+    ids, pages = _walk(client, '/api/motorcycles/?cursor=&page_size=3&ordering=price')
+    expected = list(Motorcycle.objects.order_by('price', 'id').values_list('id', flat=True))
+    assert ids == expected
+    assert pages == 3
+
+    second = client.get(client.get('/api/motorcycles/?cursor=&page_size=3&ordering=price').json()['next']).json()
+    back = client.get(second['previous']).json()
+    assert [row['id'] for row in back['results']] == expected[:3]
+
+
+@pytest.mark.django_db
+def test_cursor_count_modes_and_invalid_cursor():
+    client = APIClient()
+    for i in range(3):
+        _moto(i)
+
+    assert 'count' not in client.get('/api/motorcycles/?cursor=&count=none').json()
+    # SQLite n'a pas d'estimation : repli sur le total exact
+    assert client.get('/api/motorcycles/?cursor=&count=estimate').json()['count'] == 3
+    assert client.get('/api/motorcycles/?cursor=bogus').status_code == 400
+
+
+@pytest.mark.django_db
+def test_ranked_search_keeps_relevance_order_across_pages():
+    client = APIClient()
+    best = Motorcycle.objects.create(
+        brand='Honda', model='CB', year=2015, price='5000.00', mileage=0, engine='500cc',
+        power=47, license='A2', color='Rouge', description='Test',
+    )
+    for i in range(4):
+        _moto(i)
+
+    # Le plus pertinent est le plus ancien : un curseur (-created_at, -id) le renverrait en dernier
+    first = client.get('/api/motorcycles/?cursor=&page_size=2&fuzzy=cb').json()
+    assert first['count'] == 5
+    assert first['results'][0]['id'] == best.id
+    ids, _ = _walk(client, '/api/motorcycles/?cursor=&page_size=2&fuzzy=cb')
+    assert ids[0] == best.id and sorted(ids) == sorted(Motorcycle.objects.values_list('id', flat=True))
@@ -0,0 +1,66 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from rest_framework.test import APIClient
+
+from agde_moto.testing import assert_max_queries
+from motorcycles.models import Motorcycle, MotorcycleImage
+
+
+@pytest.fixture(autouse=True)
+def clear_cache_between_tests():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def moto():
+    moto = Motorcycle.objects.create(
+        brand='Yamaha', model='MT-07', year=2020, price='6990.00', mileage=0, engine='689cc',
+        power=73, license='A2', color='Noir', description='Test',
+    )
+    for i in range(3):
+        MotorcycleImage.objects.create(motorcycle=moto, image=f'/media/motorcycles/{moto.id}/{i}.jpg')
+    return moto
+
+
+def _primary_id(moto):
+    return Motorcycle.objects.values_list('primary_image_id', flat=True).get(pk=moto.pk)
+
+
+@pytest.mark.django_db
+def test_primary_image_follows_set_and_delete(moto):
+    first, second, third = MotorcycleImage.objects.filter(motorcycle=moto).order_by('id')
+    # Sans image principale : la plus ancienne
+    assert _primary_id(moto) == first.pk
+
+    admin = get_user_model().objects.create_user('admin', 'admin@example.com', 'Secret123!', is_staff=True)
+    client = APIClient()
+    client.force_authenticate(admin)
+    url = f'/api/motorcycles/{moto.pk}/set_primary_image/'
+    assert client.post(url, {'image_id': third.pk}, format='json').status_code == 200
+    assert client.post(url, {'image_id': second.pk}, format='json').status_code == 200
+    assert list(MotorcycleImage.objects.filter(motorcycle=moto, is_primary=True).values_list('pk', flat=True)) == [second.pk]
+    assert _primary_id(moto) == second.pk
+    assert client.post(url, {'image_id': 999999}, format='json').status_code == 404
+
+    second.delete()
+    assert _primary_id(moto) == first.pk
+
+
+@pytest.mark.django_db
+def test_single_primary_is_enforced_by_the_database(moto):
+    images = list(MotorcycleImage.objects.filter(motorcycle=moto))
+    MotorcycleImage.objects.filter(pk=images[0].pk).update(is_primary=True)
+    with pytest.raises(IntegrityError), transaction.atomic():
+        MotorcycleImage.objects.filter(pk=images[1].pk).update(is_primary=True)
+
+
+@pytest.mark.django_db
+def test_card_list_skips_the_images_prefetch(moto):
+    # Validateurs ETag + liste avec jointure sur primary_image
+    with assert_max_queries(2):
+        rows = APIClient().get('/api/motorcycles/', {'view': 'card'}).json()
+    assert rows[0]['primary_image']['image'] == f'/media/motorcycles/{moto.id}/0.jpg'
@@ -0,0 +1,76 @@
+import pytest
+from django.core.cache import cache
+from django.test import RequestFactory
+from rest_framework.test import APIClient
+
+from agde_moto import ratelimit
+from agde_moto.middleware.security import DDoSProtectionMiddleware
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def test_parse_rate():
+    assert ratelimit.parse_rate('5/m') == (5, 60)
+    assert ratelimit.parse_rate('10/2h') == (10, 7200)
+
+
+def test_sliding_window_weights_the_previous_window():
+    limiter = ratelimit.SlidingWindowLimiter()
+    assert [limiter.hit('k', 4, 60, now=6000 + second) for second in range(4)] == [None] * 4
+    # Fenêtre pleine : attente jusqu'à la fin de la fenêtre courante
+    assert limiter.hit('k', 4, 60, now=6010) == 50
+    # Mi-fenêtre suivante : 4 * 0.5 = 2 requêtes encore comptées
+    assert limiter.hit('k', 4, 60, now=6090) is None
+    assert limiter.hit('k', 4, 60, now=6090) is None
+    assert limiter.hit('k', 4, 60, now=6090) == 15
+    # Refusée : non comptée
+    assert cache.get('ratelimit:k:101') == 2
+
+
+def test_redis_script_path(settings):
+    fakeredis = pytest.importorskip('fakeredis')
+    pytest.importorskip('lupa')
+    # Vrai backend django-redis, connexions servies par fakeredis : le script Lua est exécuté
+    settings.CACHES = {**settings.CACHES, 'shared': {
+        'BACKEND': 'django_redis.cache.RedisCache',
+        'LOCATION': 'redis://localhost:6379/15',
+        'OPTIONS': {'CONNECTION_POOL_KWARGS': {'connection_class': fakeredis.FakeConnection}},
+    }}
+    limiter = ratelimit.SlidingWindowLimiter(alias='shared')
+    assert limiter._redis_script() is not None
+
+    assert [limiter.hit('k', 2, 60, now=6000) for _ in range(2)] == [None, None]
+    assert limiter.hit('k', 2, 60, now=6030) == 30
+    assert limiter.hit('k', 2, 60, now=6090) is None
+    assert limiter.hit('k', 2, 60, now=6090) == 30
+    # Refusée : non comptée
+    assert int(limiter.cache.client.get_client().get(limiter.cache.make_key('ratelimit:k:101'))) == 1
+
+
+@pytest.mark.django_db
+def test_login_is_limited_per_username_with_429():
+    client = APIClient()
+    for ip in ('10.0.0.1', '10.0.0.2', '10.0.0.3'):
+        r = client.post('/api/login/', {'username': 'Bob', 'password': 'x'}, format='json', REMOTE_ADDR=ip)
+        assert r.status_code == 401
+    r = client.post('/api/login/', {'username': 'bob', 'password': 'x'}, format='json', REMOTE_ADDR='10.0.0.4')
+    assert r.status_code == 429
+    assert int(r['Retry-After']) > 0
+    r = client.post('/api/login/', {'username': 'alice', 'password': 'x'}, format='json', REMOTE_ADDR='10.0.0.4')
+    assert r.status_code == 401
+
+
+def test_middleware_applies_route_policies(monkeypatch):
+    monkeypatch.setattr(ratelimit, 'POLICIES', {**ratelimit.POLICIES, 'global': [('ip', '2/m')]})
+    middleware = DDoSProtectionMiddleware(lambda request: None)
+    factory = RequestFactory()
+    assert middleware.process_request(factory.get('/api/motorcycles/')) is None
+    assert middleware.process_request(factory.get('/api/parts/')) is None
+    response = middleware.process_request(factory.get('/api/blog/'))
+    assert response.status_code == 429 and response['Retry-After']
+    assert middleware.process_request(factory.get('/media/parts/a.jpg')) is None
@@ -0,0 +1,82 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+from agde_moto import response_cache
+from agde_moto.response_cache import response_cache_metrics
+from agde_moto.testing import assert_max_queries
+from motorcycles.models import Motorcycle, MotorcycleImage
+
+
+@pytest.fixture(autouse=True)
+def clear_cache_between_tests():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def _moto(model='MT-07'):
+    return Motorcycle.objects.create(
+        brand='Yamaha', model=model, year=2020, price='6990.00', mileage=0, engine='689cc',
+        power=73, license='A2', color='Noir', description='Test',
+    )
+
+
+@pytest.mark.django_db
+def test_anonymous_list_is_served_from_cache_until_inventory_changes(django_capture_on_commit_callbacks):
+    client = APIClient()
+    moto = _moto()
+
+    first = client.get('/api/motorcycles/', {'brand': 'Yamaha'}).json()
+    with assert_max_queries(0):
+        # Ordre des paramètres différent : même clé normalisée
+        assert client.get('/api/motorcycles/?brand=Yamaha&').json() == first
+
+    with django_capture_on_commit_callbacks() as callbacks:
+        MotorcycleImage.objects.create(motorcycle=moto, image='/media/motorcycles/1/a.jpg')
+        # Pas encore validée : la réponse en cache reste celle d'avant
+        assert client.get('/api/motorcycles/', {'brand': 'Yamaha'}).json() == first
+    for callback in callbacks:
+        callback()
+    refreshed = client.get('/api/motorcycles/', {'brand': 'Yamaha'}).json()
+    assert len(refreshed[0]['images']) == 1
+
+    with django_capture_on_commit_callbacks(execute=True):
+        _moto('MT-09')
+    assert len(client.get('/api/motorcycles/featured/').json()) == 2
+
+    metrics = response_cache_metrics()
+    assert metrics['hits'] == 2
+    assert metrics['misses'] == 3
+
+
+@pytest.mark.django_db
+def test_authenticated_requests_bypass_cache():
+    admin = get_user_model().objects.create_user('admin', 'admin@example.com', 'Secret123!', is_staff=True)
+    client = APIClient()
+    client.force_authenticate(admin)
+    _moto()
+
+    client.get('/api/motorcycles/')
+    client.get('/api/motorcycles/')
+    metrics = response_cache_metrics()
+    assert metrics['hits'] == 0
+    assert metrics['bypass'] == 2
+
+    assert client.get('/api/cache/metrics/').status_code == 200
+    assert APIClient().get('/api/cache/metrics/').status_code in (401, 403)
+
+
+@pytest.mark.django_db
+def test_process_local_cache_disables_response_caching(monkeypatch):
+    # LocMem (un cache par worker gunicorn) : ni réponses ni facettes en cache
+    monkeypatch.setattr(response_cache, 'RESPONSE_CACHE_ENABLED', None)
+    client = APIClient()
+    _moto()
+
+    client.get('/api/motorcycles/')
+    client.get('/api/motorcycles/')
+    assert response_cache_metrics()['bypass'] == 2
+    assert client.get('/api/motorcycles/facets/').json()['count'] == 1
+    assert not [key for key in cache._cache if 'facets:' in key]
@@ -0,0 +1,87 @@
+import pytest
+from django.db import connection
+from rest_framework.test import APIClient
+
+from motorcycles.models import Motorcycle
+
+
+def _moto(brand, model, description='Très bon état'):
+    return Motorcycle.objects.create(
+        brand=brand, model=model, year=2019, price='6990.00', mileage=12000,
+        engine='689cc', power=73, license='A2', color='Bleu', description=description,
+    )
+
+
+# Lancer avec TEST_DB=postgresql (voir settings_minimal)
+postgresql_only = pytest.mark.skipif(
+    connection.vendor != 'postgresql', reason='Recherche plein texte : PostgreSQL uniquement'
+)
+
+
+@pytest.mark.django_db
+def test_search_falls_back_to_icontains_outside_postgresql():
+    client = APIClient()
+    mt07 = _moto('Yamaha', 'MT-07')
+    _moto('Kawasaki', 'Z650', description='Embrayage neuf')
+
+    response = client.get('/api/motorcycles/', {'search': 'yamaha'})
+    assert [row['id'] for row in response.json()] == [mt07.id]
+
+    response = client.get('/api/motorcycles/', {'search': 'embrayage', 'ordering': 'price'})
+    assert len(response.json()) == 1
+
+    # Le vecteur n'est maintenu que sur PostgreSQL
+    mt07.refresh_from_db()
+    assert mt07.search_vector is None
+
+
+@postgresql_only
+@pytest.mark.django_db
+def test_full_text_search_uses_weighted_vector_and_rank():
+    client = APIClient()
+    # « Yamaha » en description (poids B) d'une Honda, en marque (poids A) de la MT-07
+    honda = _moto('Honda', 'CB500F', description='Plus agile que la Yamaha du voisin')
+    mt07 = _moto('Yamaha', 'MT-07')
+    _moto('Kawasaki', 'Z650', description='Embrayages neufs')
+
+    # Vecteur maintenu par les signaux, colonne indexée GIN
+    mt07.refresh_from_db()
+    assert mt07.search_vector is not None
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT indexdef FROM pg_indexes WHERE indexname = 'moto_search_vector_gin'")
+        assert 'gin (search_vector)' in cursor.fetchone()[0]
+
+    # Pertinence : le poids A passe devant le poids B
+    ids = [row['id'] for row in client.get('/api/motorcycles/', {'search': 'yamaha'}).json()]
+    assert ids == [mt07.id, honda.id]
+
+    # Racinisation française : le singulier trouve le pluriel
+    rows = client.get('/api/motorcycles/', {'search': 'embrayage'}).json()
+    assert [row['model'] for row in rows] == ['Z650']
+
+
+def test_trigram_similarity_matches_pg_trgm():
+    from agde_moto.search import trigram_similarity
+
+    assert trigram_similarity('word', 'word') == 1.0
+    # similarity('kawazaki', 'Kawasaki') = 0.5 avec pg_trgm
+    assert trigram_similarity('kawazaki', 'Kawasaki') == pytest.approx(0.5)
+    assert trigram_similarity('abc', '') == 0.0
+
+
+@pytest.mark.django_db
+def test_fuzzy_search_tolerates_typos_and_ranks_results():
+    client = APIClient()
+    mt07 = _moto('Yamaha', 'MT-07')
+    mt09 = _moto('Yamaha', 'MT-09')
+    z650 = _moto('Kawasaki', 'Z650')
+
+    ids = [row['id'] for row in client.get('/api/motorcycles/', {'fuzzy': 'kawazaki'}).json()]
+    assert ids == [z650.id]
+
+    ids = [row['id'] for row in client.get('/api/motorcycles/', {'fuzzy': 'yamha mt07'}).json()]
+    assert ids[0] == mt07.id
+    assert z650.id not in ids
+
+    ids = [row['id'] for row in client.get('/api/motorcycles/', {'fuzzy': 'yamha', 'ordering': 'created_at'}).json()]
+    assert ids == [mt07.id, mt09.id]
@@ -0,0 +1,58 @@
+"""Outils de test partagés : budget de requêtes SQL par endpoint"""
+from contextlib import contextmanager
+
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Levée quand un bloc exécute plus de requêtes SQL que son budget"""
+
+
+@contextmanager
+def assert_max_queries(budget, using='default'):
+    """
+    Vérifie qu'un bloc n'exécute pas plus de `budget` requêtes SQL.
+
+    Contrairement à assertNumQueries, le budget est un plafond : un endpoint
+    qui devient plus économe ne casse pas le test.
+    """
+    context = CaptureQueriesContext(connections[using])
+    with context:
+        yield context
+    executed = len(context.captured_queries)
+    if executed > budget:
+        details = '\n'.join(
+            f"{i}. {query['sql']}" for i, query in enumerate(context.captured_queries, start=1)
+        )
+        raise QueryBudgetExceeded(
+            f"{executed} requêtes exécutées pour un budget de {budget} :\n{details}"
+        )
+
+
+def count_queries(func, using='default'):
+    """Exécute `func` et retourne le nombre de requêtes SQL émises"""
+    context = CaptureQueriesContext(connections[using])
+    with context:
+        func()
+    return len(context.captured_queries)
+
+
+def assert_constant_queries(func, grow, budget=None, using='default'):
+    """
+    Vérifie que `func` émet le même nombre de requêtes avant et après `grow()`.
+
+    `grow` ajoute des données (par exemple des motos et leurs images) ; un
+    endpoint sans N+1 doit garder un coût constant quelle que soit la taille
+    de la page. Si `budget` est fourni, il sert aussi de plafond absolu.
+    """
+    before = count_queries(func, using=using)
+    grow()
+    after = count_queries(func, using=using)
+    if after != before:
+        raise QueryBudgetExceeded(
+            f"Le nombre de requêtes varie avec le volume de données : {before} -> {after}"
+        )
+    if budget is not None and after > budget:
+        raise QueryBudgetExceeded(f"{after} requêtes exécutées pour un budget de {budget}")
+    return after
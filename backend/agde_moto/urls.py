@@ -1,5 +1,5 @@
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.conf import settings
 from django.conf.urls.static import static
 from django.http import JsonResponse
@@ -16,6 +16,8 @@ from .password_reset import (
 from .email_diagnostic import email_diagnostic_view
 from .admin_diagnostic_view import admin_diagnostic_page
 from .superadmin_views import list_admins, create_admin, delete_admin
+from .views import cache_metrics
+from media_library.views import serve_media
 
 def api_health(request):
     """Endpoint de santé de l'API"""
@@ -38,6 +40,7 @@ urlpatterns = [
     path('api/admin/password-reset/', request_password_reset, name='request_password_reset'),
     path('api/admin/password-reset/<str:uidb64>/<str:token>/', confirm_password_reset, name='confirm_password_reset'),
     path('api/admin/password-reset/metrics/', password_reset_metrics, name='password_reset_metrics'),
+    path('api/cache/metrics/', cache_metrics, name='cache_metrics'),
     # Admin OTP endpoints
     path('api/admin/otp/request/', request_admin_otp, name='request_admin_otp'),
     path('api/admin/otp/confirm/', confirm_admin_otp, name='confirm_admin_otp'),
@@ -54,13 +57,15 @@ urlpatterns = [
     path('api/parts/', include('parts.urls')),
     path('api/blog/', include('blog.urls')),
     path('api/garage/', include('garage.urls')),
+    path('api/uploads/', include('media_library.urls')),
     # Super admin endpoints
     path('api/superadmin/admins/', list_admins),
     path('api/superadmin/admins/create/', create_admin),
     path('api/superadmin/admins/<int:user_id>/', delete_admin),
+    # Médias : X-Accel-Redirect vers nginx en production, fichier servi par Django sinon
+    re_path(r'^%s(?P<path>.+)$' % settings.MEDIA_URL.lstrip('/'), serve_media, name='serve_media'),
 ]
 
-# Serve media files in development
+# Serve static files in development
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
@@ -1,10 +1,12 @@
 """Vues principales du projet Agde Moto"""
 from django.http import JsonResponse
 from django.shortcuts import render
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 from django.views.decorators.csrf import csrf_exempt
 import logging
+from .response_cache import response_cache_metrics
 
 logger = logging.getLogger('agde_moto')
 
@@ -37,3 +39,9 @@ def api_status(request):
             'admin': '/admin/'
         }
     })
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def cache_metrics(request):
+    """Compteurs hit/miss du cache de réponses du catalogue"""
+    return Response(response_cache_metrics())
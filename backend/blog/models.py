@@ -1,5 +1,8 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 
+from media_library.keys import MediaKeyField
+
 class Category(models.Model):
     name = models.CharField(max_length=100)
     slug = models.SlugField(unique=True)
@@ -17,13 +20,25 @@ class Post(models.Model):
     slug = models.SlugField(unique=True)
     category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='posts')
     content = models.TextField()
-    image = models.URLField(max_length=500, blank=True)
+    # Clé de stockage (`blog/<id>/<uuid>.jpg`) ou URL externe
+    image = MediaKeyField(max_length=500, blank=True)
+    # Variantes redimensionnées générées après l'upload (agde_moto.image_variants)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     is_published = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # tsvector pondéré (index GIN créé par migration, PostgreSQL uniquement)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    search_vector_weights = (('title', 'A'), ('content', 'B'))
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Index composites pour la pagination par curseur (champ de tri, id)
+            models.Index(fields=['created_at', 'id'], name='post_created_id_idx'),
+            models.Index(fields=['updated_at', 'id'], name='post_updated_id_idx'),
+        ]
     
     def __str__(self):
         return self.title
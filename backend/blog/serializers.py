@@ -1,4 +1,6 @@
 from rest_framework import serializers
+from agde_moto.image_variants import SrcsetField
+from media_library.keys import MediaUrlField
 from .models import Category, Post
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -15,12 +17,14 @@ class PostSerializer(serializers.ModelSerializer):
     title = serializers.CharField(required=True, allow_blank=False)
     content = serializers.CharField(required=True, allow_blank=False)
     slug = serializers.CharField(required=False, allow_blank=True)
+    image = MediaUrlField()
+    image_srcset = SrcsetField(source='image_variants')
     
     class Meta:
         model = Post
         fields = [
             'id', 'title', 'slug', 'category', 'category_id',
-            'content', 'image', 'is_published', 
+            'content', 'image', 'image_srcset', 'is_published', 
             'created_at', 'updated_at'
         ]
         read_only_fields = ['image', 'created_at', 'updated_at']
@@ -1,7 +1,12 @@
-from django.db.models.signals import post_delete, pre_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
-from .models import Post
+from django.utils import timezone
+from .models import Category, Post
 from utils.file_cleanup import delete_file_from_url, delete_directory
+from agde_moto.image_variants import schedule_variants, variant_keys
+from agde_moto.response_cache import bump_generation
+from agde_moto.search import refresh_search_vector
+from media_library.manifest import forget_media, forget_owner, record_media
 
 @receiver(post_delete, sender=Post)
 def delete_post_directory(sender, instance, **kwargs):
@@ -15,6 +20,9 @@ def delete_post_directory(sender, instance, **kwargs):
     # Also try to delete the file if it's not in that directory for some reason
     if instance.image:
         delete_file_from_url(instance.image)
+    for key in variant_keys(instance.image_variants):
+        delete_file_from_url(key)
+    forget_owner('blog', instance.id)
 
 @receiver(pre_save, sender=Post)
 def delete_old_post_image(sender, instance, **kwargs):
@@ -31,3 +39,50 @@ def delete_old_post_image(sender, instance, **kwargs):
 
     if old_instance.image and old_instance.image != instance.image:
         delete_file_from_url(old_instance.image)
+        for key in variant_keys(old_instance.image_variants):
+            delete_file_from_url(key)
+        forget_media('blog', instance.pk, [old_instance.image, *variant_keys(old_instance.image_variants)])
+
+@receiver(post_save, sender=Post)
+def update_post_search_vector(sender, instance, update_fields=None, **kwargs):
+    """
+    Keeps the weighted full-text vector in sync with the indexed fields.
+    """
+    indexed = {name for name, _ in Post.search_vector_weights}
+    if update_fields is None or indexed & set(update_fields):
+        refresh_search_vector(instance)
+
+@receiver([post_save, post_delete], sender=Post)
+@receiver([post_save, post_delete], sender=Category)
+def bump_blog_cache_generation(sender, **kwargs):
+    """
+    Invalidates cached public responses that depend on this model.
+    """
+    bump_generation(sender)
+
+@receiver(post_save, sender=Category)
+def touch_posts_on_category_change(sender, instance, raw=False, created=False, **kwargs):
+    """
+    A renamed category changes every post representation that embeds it.
+    """
+    if raw or created:
+        return
+    Post.objects.filter(category=instance).update(updated_at=timezone.now())
+
+@receiver(post_save, sender=Post)
+def generate_post_image_variants(sender, instance, raw=False, **kwargs):
+    """
+    Queues resized WebP/AVIF variants when the cover image changes.
+    """
+    if raw:
+        return
+    schedule_variants(instance, variants_field='image_variants')
+
+@receiver(post_save, sender=Post)
+def record_post_image_manifest(sender, instance, raw=False, update_fields=None, **kwargs):
+    """
+    Records the cover image and its variants in the media manifest.
+    """
+    if raw or (update_fields is not None and not {'image', 'image_variants'} & set(update_fields)):
+        return
+    record_media('blog', instance.pk, [instance.image, *variant_keys(instance.image_variants)])
@@ -1,10 +1,15 @@
-from rest_framework import viewsets, filters, status
+from rest_framework import viewsets, status
 from rest_framework.exceptions import NotFound
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
+from agde_moto.conditional import conditional_detail, conditional_list
+from agde_moto.fastlist import FastListMixin
+from agde_moto.pagination import KeysetPagination
+from agde_moto.response_cache import cache_response
+from agde_moto.search import FullTextSearchFilter, RankedOrderingFilter
 from .models import Category, Post
 from .serializers import CategorySerializer, PostSerializer
 from django.utils.text import slugify
@@ -16,15 +21,17 @@ class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
     lookup_field = 'slug'
     permission_classes = [AllowAny]  # Lecture publique pour les catégories
 
-class PostViewSet(viewsets.ModelViewSet):
+class PostViewSet(FastListMixin, viewsets.ModelViewSet):
     """ViewSet pour les articles de blog"""
-    queryset = Post.objects.filter(is_published=True)
+    queryset = Post.objects.filter(is_published=True).select_related('category')
     serializer_class = PostSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter, RankedOrderingFilter]
     filterset_fields = ['category']
     search_fields = ['title', 'content']
     ordering_fields = ['created_at', 'updated_at']
     ordering = ['-created_at']
+    pagination_class = KeysetPagination
+    cache_dependencies = [Post, Category]
     lookup_field = 'slug'
     
     def get_permissions(self):
@@ -40,18 +47,29 @@ class PostViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         """Queryset personnalisé selon l'action"""
         if self.action in ['list', 'retrieve'] and not self.request.user.is_authenticated:
-            return Post.objects.filter(is_published=True)
-        return Post.objects.all()
+            return Post.objects.filter(is_published=True).select_related('category')
+        return Post.objects.select_related('category')
 
-    def get_object(self):
+    @cache_response
+    @conditional_list
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @conditional_detail
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    def filter_lookup(self, queryset):
+        """Article par id numérique ou par slug"""
         lookup = self.kwargs.get(self.lookup_field)
-        qs = self.get_queryset()
-        obj = None
-        if lookup is not None:
-            if str(lookup).isdigit():
-                obj = qs.filter(pk=int(lookup)).first()
-            else:
-                obj = qs.filter(slug=lookup).first()
+        if lookup is None:
+            return queryset.none()
+        if str(lookup).isdigit():
+            return queryset.filter(pk=int(lookup))
+        return queryset.filter(slug=lookup)
+
+    def get_object(self):
+        obj = self.filter_lookup(self.get_queryset()).first()
         if not obj:
             raise NotFound()
         self.check_object_permissions(self.request, obj)
@@ -59,7 +77,7 @@ class PostViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated], url_path='admin')
     def admin_list(self, request):
-        qs = Post.objects.all().order_by('-created_at')
+        qs = Post.objects.select_related('category').order_by('-created_at')
         page = self.paginate_queryset(qs)
         if page is not None:
             serializer = self.get_serializer(page, many=True)
@@ -117,10 +135,8 @@ class PostViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['post'], parser_classes=[MultiPartParser, FormParser])
     def upload_image(self, request, slug=None):
         """Upload d'image pour un article de blog"""
-        import os
-        import uuid
-        from django.conf import settings
-        from django.core.files.storage import default_storage
+        from media_library.blobs import save_upload
+        from media_library.keys import key_url
         
         post = self.get_object()
         file = request.FILES.get('image')
@@ -128,23 +144,14 @@ class PostViewSet(viewsets.ModelViewSet):
         if not file:
             return Response({'error': 'Aucun fichier fourni'}, status=status.HTTP_400_BAD_REQUEST)
         
-        # Générer un nom de fichier unique
-        file_extension = os.path.splitext(file.name)[1]
-        unique_filename = f"blog/{post.id}/{uuid.uuid4()}{file_extension}"
-        
-        # Sauvegarder le fichier
-        file_path = default_storage.save(unique_filename, file)
-        
-        # Créer l'URL complète
-        if settings.DEBUG:
-            image_url = f"http://178.16.130.95:8000/media/{file_path}"
-        else:
-            image_url = f"{settings.MEDIA_URL}{file_path}"
+        # Sauvegarder le fichier (nom unique, ou blob partagé en mode adressé par contenu)
+        file_path = save_upload(f"blog/{post.id}", file)
         
-        post.image = image_url
+        # Clé de stockage en base, URL publique dans la réponse
+        post.image = file_path
         post.save()
         
-        return Response({'image': image_url}, status=status.HTTP_200_OK)
+        return Response({'image': key_url(file_path)}, status=status.HTTP_200_OK)
     
     @action(detail=True, methods=['delete'])
     def delete_image(self, request, slug=None):
@@ -4,6 +4,7 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 # from django_ratelimit.decorators import ratelimit  # Temporairement désactivé
 from django.utils.html import escape
+from agde_moto.conditional import conditional_response, make_etag
 from .models import GarageSettings
 from .serializers import GarageSettingsSerializer
 import logging
@@ -23,9 +24,13 @@ def garage_settings_view(request):
         
         if request.method == 'GET':
             # Accès libre en lecture
-            serializer = GarageSettingsSerializer(settings)
             logger.info(f"Consultation des paramètres du garage depuis {request.META.get('REMOTE_ADDR')}")
-            return Response(serializer.data)
+            return conditional_response(
+                request,
+                make_etag('garage.garagesettings', settings.pk, settings.updated_at),
+                settings.updated_at,
+                lambda: Response(GarageSettingsSerializer(settings).data),
+            )
         
         elif request.method == 'PUT':
             # Vérification de l'authentification et des permissions pour les modifications
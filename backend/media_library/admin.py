@@ -0,0 +1,24 @@
+from django.contrib import admin
+from .models import MediaBlob, MediaFile, UploadSession
+
+
+@admin.register(UploadSession)
+class UploadSessionAdmin(admin.ModelAdmin):
+    list_display = ['filename', 'target', 'object_id', 'offset', 'size', 'status', 'created_by', 'updated_at']
+    list_filter = ['target', 'status']
+    readonly_fields = ['id', 'path', 'offset', 'created_at', 'updated_at']
+
+
+@admin.register(MediaBlob)
+class MediaBlobAdmin(admin.ModelAdmin):
+    list_display = ['path', 'size', 'refcount', 'created_at']
+    search_fields = ['sha256', 'path']
+    readonly_fields = ['sha256', 'path', 'size', 'refcount', 'created_at']
+
+
+@admin.register(MediaFile)
+class MediaFileAdmin(admin.ModelAdmin):
+    list_display = ['path', 'owner_type', 'owner_id', 'size', 'present', 'linked', 'indexed_at']
+    list_filter = ['owner_type', 'present', 'linked']
+    search_fields = ['path', 'sha256']
+    readonly_fields = ['owner_type', 'owner_id', 'path', 'size', 'mtime', 'sha256', 'present', 'linked', 'indexed_at']
@@ -0,0 +1,169 @@
+"""Stockage adressé par contenu : fichiers identiques stockés une seule fois"""
+import hashlib
+import os
+import uuid
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+# Mode optionnel : désactivé, chaque upload garde son propre nom uuid4
+CONTENT_ADDRESSED = getattr(settings, 'MEDIA_CONTENT_ADDRESSED', False)
+BLOB_PREFIX = 'blobs/'
+HASH_BLOCK_SIZE = 64 * 1024
+
+
+class HashingFile(File):
+    """Fichier dont les blocs lus par le stockage alimentent l'empreinte"""
+
+    def __init__(self, file):
+        super().__init__(file, name=getattr(file, 'name', None))
+        self.digest = hashlib.sha256()
+        self.size_read = 0
+
+    def chunks(self, chunk_size=None):
+        for chunk in super().chunks(chunk_size):
+            self.digest.update(chunk)
+            self.size_read += len(chunk)
+            yield chunk
+
+
+def blob_path(sha256, extension):
+    return f'{BLOB_PREFIX}{sha256[:2]}/{sha256[2:4]}/{sha256}{extension.lower()}'
+
+
+def is_blob_path(relative_path):
+    return relative_path.startswith(BLOB_PREFIX)
+
+
+def save_upload(directory, upload):
+    """
+    Enregistre un fichier téléversé et retourne son nom dans default_storage.
+
+    Hors mode adressé par contenu : `<directory>/<uuid4><ext>`. Sinon,
+    l'empreinte est calculée pendant l'écriture même (un seul passage sur
+    les octets) ; si un blob identique existe, la copie est supprimée et
+    une référence est ajoutée au blob existant.
+    """
+    extension = os.path.splitext(upload.name)[1]
+    if not CONTENT_ADDRESSED:
+        return default_storage.save(f'{directory}/{uuid.uuid4()}{extension}', upload)
+    hashing = HashingFile(upload)
+    temporary = default_storage.save(f'{BLOB_PREFIX}tmp/{uuid.uuid4()}{extension}', hashing)
+    return _adopt(temporary, hashing.digest.hexdigest(), hashing.size_read, extension)
+
+
+def adopt_file(relative_path):
+    """Range un fichier déjà écrit (upload fragmenté terminé) dans le stockage par contenu"""
+    if not CONTENT_ADDRESSED or is_blob_path(relative_path):
+        return relative_path
+    digest = hashlib.sha256()
+    size = 0
+    with default_storage.open(relative_path, 'rb') as source:
+        for block in iter(lambda: source.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+            size += len(block)
+    return _adopt(relative_path, digest.hexdigest(), size, os.path.splitext(relative_path)[1])
+
+
+def _adopt(relative_path, sha256, size, extension):
+    from .models import MediaBlob
+
+    with transaction.atomic():
+        blob = MediaBlob.objects.select_for_update().filter(sha256=sha256).first()
+        if blob is None:
+            final = blob_path(sha256, extension)
+            try:
+                with transaction.atomic():
+                    MediaBlob.objects.create(sha256=sha256, path=final, size=size)
+            except IntegrityError:
+                # Même contenu enregistré en parallèle : on rejoint ce blob
+                blob = MediaBlob.objects.select_for_update().get(sha256=sha256)
+            else:
+                _move(relative_path, final)
+                return final
+        MediaBlob.objects.filter(pk=blob.pk).update(refcount=F('refcount') + 1)
+        # Blob libéré (refcount 0) dont le nettoyage n'a pas encore tourné :
+        # repris tel quel, ou reconstitué si son fichier est déjà parti
+        if not blob.refcount and not default_storage.exists(blob.path):
+            _move(relative_path, blob.path)
+            return blob.path
+    default_storage.delete(relative_path)
+    return blob.path
+
+
+def _move(source, destination):
+    try:
+        source_path, destination_path = default_storage.path(source), default_storage.path(destination)
+    except NotImplementedError:
+        with default_storage.open(source, 'rb') as content:
+            default_storage.save(destination, content)
+        default_storage.delete(source)
+        return
+    os.makedirs(os.path.dirname(destination_path), exist_ok=True)
+    os.replace(source_path, destination_path)
+
+
+def discard_upload(relative_path):
+    """Annule un enregistrement de save_upload (référence rendue ou fichier supprimé)"""
+    if is_blob_path(relative_path):
+        release_blob(relative_path)
+    else:
+        default_storage.delete(relative_path)
+
+
+def release_blob(relative_path, delete_files=True):
+    """
+    Retire une référence au blob ; le fichier (et ses variantes) n'est
+    supprimé qu'avec la dernière. Les variantes d'un blob partagé
+    appartiennent au blob : leur suppression individuelle est ignorée.
+
+    Avec `delete_files=False`, la dernière référence laisse la ligne à
+    `refcount=0` : l'appelant programme `purge_blob` (après commit) si la
+    valeur retournée est vraie. D'ici là, un upload du même contenu reprend
+    la ligne au lieu d'en créer une que le nettoyage viderait.
+    """
+    from .models import MediaBlob
+
+    with transaction.atomic():
+        blob = MediaBlob.objects.select_for_update().filter(path=relative_path).first()
+        if blob is None or not blob.refcount:
+            return False
+        if blob.refcount > 1 or not delete_files:
+            MediaBlob.objects.filter(pk=blob.pk).update(refcount=F('refcount') - 1)
+            return blob.refcount == 1
+        blob.delete()
+        delete_blob_files(relative_path)
+    return True
+
+
+def purge_blob(relative_path):
+    """
+    Supprime un blob libéré : fichiers et ligne ensemble, sous le verrou de
+    la ligne. Retourne False (rien supprimé) si un upload l'a repris entre-temps.
+    """
+    from .models import MediaBlob
+
+    with transaction.atomic():
+        blob = MediaBlob.objects.select_for_update().filter(path=relative_path).first()
+        if blob is not None and blob.refcount:
+            return False
+        delete_blob_files(relative_path)
+        if blob is not None:
+            blob.delete()
+    return True
+
+
+def delete_blob_files(relative_path):
+    directory, name = os.path.split(relative_path)
+    stem = os.path.splitext(name)[0]
+    # Le blob et ses variantes `<empreinte>_<largeur>w.<format>` (même dossier)
+    try:
+        _, files = default_storage.listdir(directory)
+    except FileNotFoundError:
+        return
+    for other in files:
+        if other.startswith(stem):
+            default_storage.delete(f'{directory}/{other}')
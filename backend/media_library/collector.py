@@ -0,0 +1,167 @@
+"""Ramasse-miettes des médias : fichiers sans ligne en base et lignes sans fichier"""
+import datetime
+import os
+import re
+import time
+
+from django.conf import settings
+
+from .keys import is_external, key_url
+from .models import MediaBlob, MediaFile, UploadSession
+
+GC_CHUNK_SIZE = 500
+# Taille maximale d'une clause IN (limite de variables SQLite incluse)
+IN_CLAUSE_SIZE = 500
+QUARANTINE_DIR = '.quarantine'
+MODES = ('dry-run', 'quarantine', 'delete')
+
+# Variante générée `<nom>_<largeur>w.<format>` (suffixe éventuel ajouté par le stockage)
+_VARIANT = re.compile(r'^(?P<stem>.+)_\d+w(?:_\w+)?\.(?:webp|avif)$')
+
+
+def image_columns():
+    """Colonnes qui référencent un fichier média : (modèle, champ)"""
+    from blog.models import Post
+    from motorcycles.models import MotorcycleImage
+    from parts.models import PartImage
+
+    return [(MotorcycleImage, 'image'), (PartImage, 'image'), (Post, 'image')]
+
+
+def scan_directories(root):
+    """
+    Parcours os.scandir de MEDIA_ROOT, dossier par dossier :
+    `(dossier relatif, [(chemin relatif, taille, mtime)])`. Les dossiers
+    cachés (dont la quarantaine) sont ignorés.
+    """
+    pending = ['']
+    while pending:
+        relative = pending.pop()
+        files = []
+        try:
+            entries = os.scandir(os.path.join(root, relative))
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.name.startswith('.'):
+                    continue
+                path = f'{relative}{entry.name}'
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(f'{path}/')
+                elif entry.is_file(follow_symlinks=False):
+                    stat = entry.stat(follow_symlinks=False)
+                    files.append((path, stat.st_size, stat.st_mtime))
+        if files:
+            yield relative, files
+
+
+def _in_chunks(values, size=IN_CLAUSE_SIZE):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def referenced_paths(paths):
+    """Chemins du lot référencés par une image ou un upload en cours (requêtes IN sur les clés)"""
+    referenced = set()
+    for values in _in_chunks(paths):
+        for model, column in image_columns():
+            referenced.update(model.objects.filter(**{f'{column}__in': values}).values_list(column, flat=True))
+        referenced.update(
+            UploadSession.objects.filter(status=UploadSession.STATUS_PENDING, path__in=values)
+            .values_list('path', flat=True)
+        )
+    return referenced
+
+
+class MediaCollector:
+    """
+    Compare MEDIA_ROOT aux colonnes d'images par lots, sans charger
+    l'ensemble des fichiers ni des lignes en mémoire : seul le dossier en
+    cours est conservé. Une variante est orpheline si son original l'est.
+    Les fichiers plus récents que `min_age` (upload en cours d'insertion)
+    ne sont jamais touchés.
+    """
+
+    def __init__(self, mode='dry-run', min_age=datetime.timedelta(hours=24), chunk_size=GC_CHUNK_SIZE):
+        if mode not in MODES:
+            raise ValueError(mode)
+        self.mode = mode
+        self.chunk_size = chunk_size
+        self.cutoff = time.time() - min_age.total_seconds()
+        self.root = str(settings.MEDIA_ROOT)
+        self.quarantine = os.path.join(
+            self.root, QUARANTINE_DIR, datetime.datetime.now().strftime('%Y%m%d-%H%M%S'),
+        )
+        self.stats = {'scanned': 0, 'recent': 0, 'orphans': 0, 'reclaimable_bytes': 0, 'errors': 0}
+
+    def orphans(self):
+        """Fichiers orphelins : `(chemin relatif, taille)`"""
+        for _, files in scan_directories(self.root):
+            self.stats['scanned'] += len(files)
+            originals, variants = [], []
+            for item in files:
+                (variants if _VARIANT.match(os.path.basename(item[0])) else originals).append(item)
+            kept_stems = set()
+            for start in range(0, len(originals), self.chunk_size):
+                chunk = originals[start:start + self.chunk_size]
+                referenced = referenced_paths([path for path, _, _ in chunk])
+                for path, size, mtime in chunk:
+                    if path in referenced or mtime > self.cutoff:
+                        kept_stems.add(os.path.splitext(path)[0])
+                        self.stats['recent'] += path not in referenced
+                        continue
+                    yield path, size
+            for path, size, mtime in variants:
+                stem = os.path.join(os.path.dirname(path), _VARIANT.match(os.path.basename(path)).group('stem'))
+                if stem in kept_stems or mtime > self.cutoff:
+                    continue
+                yield path, size
+
+    def run(self, on_orphan=None):
+        """Traite les orphelins selon le mode ; retourne les statistiques"""
+        removed = []
+        for path, size in self.orphans():
+            self.stats['orphans'] += 1
+            self.stats['reclaimable_bytes'] += size
+            if on_orphan:
+                on_orphan(path, size)
+            if self.mode == 'dry-run':
+                continue
+            try:
+                self._remove(path)
+            except OSError:
+                self.stats['errors'] += 1
+                continue
+            removed.append(path)
+            if len(removed) >= self.chunk_size:
+                self._forget(removed)
+                removed = []
+        self._forget(removed)
+        return self.stats
+
+    def _remove(self, path):
+        source = os.path.join(self.root, path)
+        if self.mode == 'delete':
+            os.remove(source)
+            return
+        destination = os.path.join(self.quarantine, path)
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        os.replace(source, destination)
+
+    def _forget(self, paths):
+        """Le manifeste et les blobs ne doivent plus désigner les fichiers retirés"""
+        if paths:
+            MediaFile.objects.filter(path__in=paths).delete()
+            MediaBlob.objects.filter(path__in=paths).delete()
+
+    def missing(self):
+        """Lignes dont le fichier local n'existe plus : `(modèle, pk, url)`"""
+        for model, column in image_columns():
+            rows = model.objects.exclude(**{column: ''}).values_list('pk', column)
+            for pk, key in rows.iterator(chunk_size=self.chunk_size):
+                if is_external(key):
+                    continue
+                if not os.path.isfile(os.path.join(self.root, key)):
+                    yield model._meta.label, pk, key_url(key)
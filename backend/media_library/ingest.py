@@ -0,0 +1,87 @@
+"""Enregistrement concurrent des fichiers d'un lot et insertion groupée des images"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import transaction
+from rest_framework import status
+from rest_framework.response import Response
+
+from agde_moto.image_variants import describe_image
+
+from .blobs import discard_upload, save_upload
+
+logger = logging.getLogger('agde_moto')
+
+INGEST_WORKERS = getattr(settings, 'UPLOAD_INGEST_WORKERS', 4)
+
+
+def _save_file(directory, upload):
+    return save_upload(directory, upload)
+
+
+def save_files(directory, files):
+    """
+    Écrit les fichiers en parallèle (pool borné) et relève dans le même
+    thread leurs dimensions, poids, type et aperçu. Retourne
+    `[(fichier, nom enregistré ou None, métadonnées, erreur ou None)]` dans
+    l'ordre reçu.
+    """
+    def save(upload):
+        try:
+            name = _save_file(directory, upload)
+        except Exception as exc:
+            logger.warning(f"Échec de l'enregistrement de {upload.name}: {exc}")
+            return upload, None, {}, str(exc)
+        return upload, name, describe_image(name), None
+
+    if len(files) == 1:
+        return [save(files[0])]
+    with ThreadPoolExecutor(max_workers=min(INGEST_WORKERS, len(files))) as executor:
+        return list(executor.map(save, files))
+
+
+def ingest_images(owner, files, image_model, owner_field, images_saved):
+    """
+    Enregistre un lot d'images d'un objet : fichiers écrits en parallèle puis
+    une seule insertion `bulk_create` dans une transaction.
+
+    bulk_create n'émettant pas post_save, `images_saved` (la fonction de
+    l'app que son receiver post_save appelle aussi, par exemple
+    `motorcycles.signals.motorcycle_images_saved`) est appelée une fois pour
+    le lot dans la transaction. Si l'insertion échoue, les fichiers déjà
+    écrits sont supprimés.
+
+    Retourne `(images créées, erreurs par fichier)`.
+    """
+    directory = f'{owner._meta.app_label}/{owner.pk}'
+    results = save_files(directory, files)
+    errors = [{'file': upload.name, 'error': error} for upload, _, _, error in results if error]
+    saved = [(name, metadata) for _, name, metadata, error in results if not error]
+    if not saved:
+        return [], errors
+
+    try:
+        with transaction.atomic():
+            images = image_model.objects.bulk_create([
+                image_model(**{owner_field: owner, 'image': name, **metadata})
+                for name, metadata in saved
+            ])
+            images_saved(images)
+    except Exception:
+        for name, _ in saved:
+            discard_upload(name)
+        raise
+    return images, errors
+
+
+def upload_response(created, errors):
+    """201 si tout est enregistré, 207 avec le détail par fichier sinon"""
+    if not errors:
+        return Response(created, status=status.HTTP_201_CREATED)
+    if not created:
+        return Response(
+            {'error': "Aucun fichier n'a pu être enregistré", 'errors': errors},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+    return Response({'created': created, 'errors': errors}, status=status.HTTP_207_MULTI_STATUS)
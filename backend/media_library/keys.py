@@ -0,0 +1,131 @@
+"""
+Clés de stockage des images : les colonnes d'images contiennent le nom du
+fichier dans default_storage (`parts/3/<uuid>.jpg`), ou une URL externe
+telle quelle. L'URL publique est reconstituée à la sérialisation par un
+simple préfixe.
+"""
+from urllib.parse import unquote, urlsplit
+
+from django.conf import settings
+from django.db import models, transaction
+from rest_framework import serializers
+
+EXTERNAL_PREFIXES = ('http://', 'https://')
+# Anciennes URLs absolues : http://<hôte>:8000/media/... ; seuls ces hôtes
+# (ancien serveur, domaine du site, développement) sont ramenés à des clés, toute autre URL
+# externe est conservée telle quelle
+LEGACY_MEDIA_HOSTS = frozenset(getattr(
+    settings, 'LEGACY_MEDIA_HOSTS',
+    ('178.16.130.95', 'agdemoto.fr', 'www.agdemoto.fr', 'localhost', '127.0.0.1', 'backend'),
+))
+LEGACY_MEDIA_SEGMENT = '/media/'
+MIGRATION_CHUNK_SIZE = 500
+
+
+def is_external(value):
+    return value.startswith(EXTERNAL_PREFIXES)
+
+
+def to_key(value):
+    """
+    Forme canonique d'une valeur stockée : `/media/x`, `http://<ancien
+    hôte>/media/x` et `x` donnent `x` ; les autres URLs externes sont
+    conservées.
+    """
+    value = (value or '').strip()
+    media_url = settings.MEDIA_URL
+    if value.startswith(media_url):
+        return unquote(value[len(media_url):])
+    if is_external(value):
+        parts = urlsplit(value)
+        if parts.hostname in LEGACY_MEDIA_HOSTS and parts.path.startswith(LEGACY_MEDIA_SEGMENT):
+            return unquote(parts.path[len(LEGACY_MEDIA_SEGMENT):])
+    return value
+
+
+def key_url(key, prefix=None):
+    """URL publique d'une clé (MEDIA_URL + clé) ; une URL externe est rendue telle quelle"""
+    if not key or is_external(key):
+        return key
+    return f'{settings.MEDIA_URL if prefix is None else prefix}{key}'
+
+
+def _entry_to_key(entry):
+    converted = {name: value for name, value in entry.items() if name != 'url'}
+    converted['key'] = to_key(entry.get('key') or entry.get('url'))
+    return converted
+
+
+def variants_to_keys(variants):
+    """Variantes enregistrées avec des URLs (`source`, `url`) ramenées à des clés"""
+    if not variants:
+        return variants
+    converted = dict(variants)
+    if converted.get('source'):
+        converted['source'] = to_key(converted['source'])
+    if 'formats' in converted:
+        converted['formats'] = {
+            extension: [_entry_to_key(entry) for entry in entries]
+            for extension, entries in converted['formats'].items()
+        }
+    return converted
+
+
+class MediaKeyField(models.CharField):
+    """
+    Colonne d'image en clé de stockage. Toute valeur enregistrée (admin,
+    update(), anciennes URLs) est ramenée à sa forme canonique.
+    """
+
+    def pre_save(self, model_instance, add):
+        value = to_key(getattr(model_instance, self.attname))
+        setattr(model_instance, self.attname, value)
+        return value
+
+    def get_prep_value(self, value):
+        value = super().get_prep_value(value)
+        return to_key(value) if value else value
+
+
+class MediaUrlField(serializers.CharField):
+    """URL publique d'une clé de stockage, préfixe calculé une fois par champ"""
+
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+        self.prefix = settings.MEDIA_URL
+
+    def to_representation(self, value):
+        if not value or is_external(value):
+            return value
+        return self.prefix + value
+
+
+def canonicalize_rows(model, column, variants_column=None, chunk_size=MIGRATION_CHUNK_SIZE):
+    """
+    Réécrit une table en clés de stockage, par lots de `chunk_size` lignes
+    dans l'ordre des clés primaires, chaque lot dans sa propre transaction.
+    Les lignes déjà canoniques ne sont pas modifiées : une migration
+    interrompue reprend là où elle s'est arrêtée. Retourne le nombre de
+    lignes réécrites.
+    """
+    fields = [column] + ([variants_column] if variants_column else [])
+    last_pk, updated = 0, 0
+    while True:
+        rows = list(
+            model._default_manager.filter(pk__gt=last_pk).order_by('pk').values_list('pk', *fields)[:chunk_size]
+        )
+        if not rows:
+            return updated
+        last_pk = rows[-1][0]
+        changed = []
+        for pk, value, *variants in rows:
+            values = {column: to_key(value)}
+            if variants_column:
+                values[variants_column] = variants_to_keys(variants[0])
+            if values[column] != value or (variants_column and values[variants_column] != variants[0]):
+                changed.append(model(pk=pk, **values))
+        if changed:
+            with transaction.atomic():
+                model._default_manager.bulk_update(changed, fields)
+            updated += len(changed)
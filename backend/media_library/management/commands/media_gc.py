@@ -0,0 +1,57 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.template.defaultfilters import filesizeformat
+
+from media_library.collector import GC_CHUNK_SIZE, MODES, MediaCollector
+from media_library.storage import is_local
+
+
+class Command(BaseCommand):
+    help = (
+        'Repère les fichiers média sans image en base (et les images sans fichier), '
+        'indique l\'espace récupérable et les met en quarantaine ou les supprime.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--mode', choices=MODES, default='dry-run',
+            help='dry-run : rapport seul ; quarantine : déplacés sous MEDIA_ROOT/.quarantine/ ; delete : supprimés',
+        )
+        parser.add_argument('--min-age-hours', type=int, default=24, help='Ignore les fichiers modifiés plus récemment')
+        parser.add_argument('--chunk-size', type=int, default=GC_CHUNK_SIZE, help='Fichiers comparés par lot de requêtes')
+        parser.add_argument('--skip-missing', action='store_true', help='Ne vérifie pas les images dont le fichier manque')
+
+    def handle(self, *args, **options):
+        if not is_local():
+            raise CommandError('Parcours du disque impossible : le stockage des médias n\'est pas local')
+        collector = MediaCollector(
+            mode=options['mode'],
+            min_age=timedelta(hours=options['min_age_hours']),
+            chunk_size=options['chunk_size'],
+        )
+        verbose = options['verbosity'] > 1
+
+        def report(path, size):
+            if verbose:
+                self.stdout.write(f'- {path} ({filesizeformat(size)})')
+
+        stats = collector.run(on_orphan=report)
+        verb = {'dry-run': 'récupérables', 'quarantine': 'mis en quarantaine', 'delete': 'libérés'}[options['mode']]
+        self.stdout.write(
+            f"{stats['scanned']} fichier(s) parcouru(s), {stats['orphans']} orphelin(s), "
+            f"{stats['recent']} récent(s) ignoré(s), {stats['errors']} erreur(s)"
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"{filesizeformat(stats['reclaimable_bytes'])} ({stats['reclaimable_bytes']} octets) {verb}"
+        ))
+
+        if options['skip_missing']:
+            return
+        missing = 0
+        for label, pk, url in collector.missing():
+            missing += 1
+            if verbose:
+                self.stdout.write(f'- {label} #{pk} : {url}')
+        style = self.style.WARNING if missing else self.style.SUCCESS
+        self.stdout.write(style(f'{missing} image(s) en base sans fichier'))
@@ -0,0 +1,29 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from media_library.models import UploadSession
+from media_library.uploads import discard
+
+
+class Command(BaseCommand):
+    help = 'Supprime les sessions d\'upload fragmenté abandonnées et leurs fichiers partiels.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=24, help='Inactivité au-delà de laquelle une session est abandonnée')
+        parser.add_argument('--dry-run', action='store_true', help='Affiche sans supprimer')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options['hours'])
+        sessions = UploadSession.objects.filter(status=UploadSession.STATUS_PENDING, updated_at__lt=cutoff)
+        count = 0
+        for session in sessions.iterator():
+            count += 1
+            if options['dry_run']:
+                self.stdout.write(f'- {session}')
+                continue
+            discard(session)
+            session.delete()
+        verb = 'à supprimer' if options['dry_run'] else 'supprimée(s)'
+        self.stdout.write(self.style.SUCCESS(f'{count} session(s) {verb}'))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from media_library import manifest
+from media_library.models import MediaFile, UploadSession
+
+
+class Command(BaseCommand):
+    help = 'Reconstruit le manifeste des fichiers média à partir du stockage (os.scandir en local) et des images en base.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--type', dest='owner_types', action='append',
+            choices=[choice for choice, _ in UploadSession.TARGET_CHOICES],
+            help='Type d\'objet à reconstruire (répétable ; tous par défaut)',
+        )
+        parser.add_argument('--rehash', action='store_true', help='Recalcule toutes les empreintes SHA-256')
+
+    def handle(self, *args, **options):
+        owner_types = options['owner_types'] or [choice for choice, _ in UploadSession.TARGET_CHOICES]
+        for owner_type in owner_types:
+            count = manifest.rebuild(owner_type, rehash=options['rehash'])
+            entries = MediaFile.objects.filter(owner_type=owner_type)
+            orphans = entries.filter(present=True, linked=False).count()
+            missing = entries.filter(present=False).count()
+            self.stdout.write(f'- {owner_type}: {count} fichier(s), {orphans} orphelin(s), {missing} manquant(s)')
+        self.stdout.write(self.style.SUCCESS('Manifeste reconstruit'))
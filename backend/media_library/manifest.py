@@ -0,0 +1,304 @@
+"""Manifeste des fichiers média : relevés tenus à jour sans parcourir le disque à la lecture"""
+import datetime
+import hashlib
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+
+from utils.file_cleanup import media_relative_path
+
+from .blobs import HASH_BLOCK_SIZE, is_blob_path
+from .keys import key_url
+from .models import MediaFile
+from .storage import is_local
+
+logger = logging.getLogger('agde_moto')
+
+REBUILD_BATCH_SIZE = 1000
+# Faux en développement/tests : empreintes calculées dans le thread courant, après commit
+HASH_ASYNC = getattr(settings, 'MEDIA_MANIFEST_HASH_ASYNC', True)
+
+
+def media_url(path):
+    return f'{settings.MEDIA_URL}{quote(path)}'
+
+
+def file_digest(full_path):
+    digest = hashlib.sha256()
+    with open(full_path, 'rb') as source:
+        for block in iter(lambda: source.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _blob_digest(path):
+    """Le nom d'un blob est son empreinte (ses variantes portent un suffixe)"""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return stem if len(stem) == 64 else ''
+
+
+def _mtime(timestamp):
+    return datetime.datetime.fromtimestamp(timestamp, tz=datetime.timezone.utc)
+
+
+def snapshot(path, stat=None, digest=True):
+    """Champs du manifeste pour un chemin relatif ; `stat` évite un appel système si déjà connu"""
+    if stat is None and not is_local():
+        return _stored_snapshot(path, digest)
+    full_path = os.path.join(settings.MEDIA_ROOT, path)
+    if stat is None:
+        try:
+            stat = os.stat(full_path)
+        except OSError:
+            return {'size': 0, 'mtime': None, 'sha256': '', 'present': False}
+    sha256 = _blob_digest(path) if is_blob_path(path) else ''
+    if not sha256 and digest:
+        try:
+            sha256 = file_digest(full_path)
+        except OSError:
+            sha256 = ''
+    return {'size': stat.st_size, 'mtime': _mtime(stat.st_mtime), 'sha256': sha256, 'present': True}
+
+
+def _stored_snapshot(path, digest):
+    """Variante de snapshot par l'API Storage (stockage objet : pas de stat)"""
+    try:
+        size = default_storage.size(path)
+    except (OSError, ValueError):
+        return {'size': 0, 'mtime': None, 'sha256': '', 'present': False}
+    try:
+        mtime = default_storage.get_modified_time(path)
+    except (NotImplementedError, OSError):
+        mtime = None
+    sha256 = _blob_digest(path) if is_blob_path(path) else ''
+    if not sha256 and digest:
+        sha256 = stored_digest(path)
+    return {'size': size, 'mtime': mtime, 'sha256': sha256, 'present': True}
+
+
+def stored_digest(path):
+    """Empreinte d'un fichier lu par l'API Storage"""
+    hasher = hashlib.sha256()
+    with default_storage.open(path, 'rb') as source:
+        for block in iter(lambda: source.read(HASH_BLOCK_SIZE), b''):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+def _paths(urls):
+    return [media_relative_path(url) for url in urls if url]
+
+
+def record_media(owner_type, owner_id, urls):
+    """
+    Enregistre les fichiers référencés par une ou plusieurs images qui
+    viennent d'être créées ou modifiées, en une seule insertion (mise à
+    jour en cas de conflit). Les chemins déjà relevés comme liés ne sont
+    pas relus. Seuls taille et date sont relevés ici : l'empreinte des
+    fichiers qui ne sont pas des blobs est calculée hors de la requête,
+    après le commit (voir `schedule_digests`).
+    """
+    paths = _paths(urls)
+    if not paths:
+        return
+    known = set(
+        MediaFile.objects.filter(owner_type=owner_type, owner_id=owner_id, path__in=paths, linked=True)
+        .values_list('path', flat=True)
+    )
+    entries = [
+        MediaFile(owner_type=owner_type, owner_id=owner_id, path=path, linked=True, **snapshot(path, digest=False))
+        for path in dict.fromkeys(paths) if path not in known
+    ]
+    if entries:
+        MediaFile.objects.bulk_create(
+            entries, update_conflicts=True, unique_fields=['owner_type', 'owner_id', 'path'],
+            update_fields=['size', 'mtime', 'sha256', 'present', 'linked', 'indexed_at'],
+        )
+        schedule_digests(owner_type, owner_id, [entry.path for entry in entries if entry.present and not entry.sha256])
+
+
+
+def forget_media(owner_type, owner_id, urls):
+    """Retire du manifeste les fichiers d'une image supprimée"""
+    paths = _paths(urls)
+    if paths:
+        MediaFile.objects.filter(owner_type=owner_type, owner_id=owner_id, path__in=paths).delete()
+
+
+def forget_owner(owner_type, owner_id):
+    """Retire du manifeste tous les fichiers d'un objet supprimé avec son dossier"""
+    MediaFile.objects.filter(owner_type=owner_type, owner_id=owner_id).delete()
+
+
+def owner_manifest(owner_type, owner_id, linked_keys):
+    """
+    Fichiers d'un objet d'après le manifeste, en une requête.
+
+    `linked_keys` sont les clés de stockage des images de l'objet. Retourne
+    `(fichiers présents, URLs référencées sans fichier)` ; chaque
+    fichier indique s'il est orphelin (présent sur le disque mais
+    référencé par aucune image).
+    """
+    entries = list(MediaFile.objects.filter(owner_type=owner_type, owner_id=owner_id))
+    files = [
+        {
+            'filename': os.path.basename(entry.path),
+            'url': media_url(entry.path),
+            'size': entry.size,
+            'modified': entry.mtime,
+            'sha256': entry.sha256,
+            'orphan': not entry.linked,
+        }
+        for entry in entries if entry.present
+    ]
+    present = {entry.path for entry in entries if entry.present}
+    missing = [key_url(key) for key in linked_keys if key and key not in present]
+    return files, missing
+
+
+def linked_paths(owner_type):
+    """`{chemin relatif: {id propriétaire}}` des fichiers référencés en base (images et variantes)"""
+    from agde_moto.image_variants import variant_keys
+    from blog.models import Post
+    from motorcycles.models import MotorcycleImage
+    from parts.models import PartImage
+
+    sources = {
+        'motorcycles': (MotorcycleImage.objects.all(), 'motorcycle_id', 'image', 'variants'),
+        'parts': (PartImage.objects.all(), 'part_id', 'image', 'variants'),
+        'blog': (Post.objects.exclude(image=''), 'id', 'image', 'image_variants'),
+    }
+    queryset, owner_field, image_field, variants_field = sources[owner_type]
+    linked = {}
+    rows = queryset.values_list(owner_field, image_field, variants_field).iterator(chunk_size=REBUILD_BATCH_SIZE)
+    for owner_id, url, variants in rows:
+        for path in _paths([url, *variant_keys(variants)]):
+            linked.setdefault(path, set()).add(owner_id)
+    return linked
+
+
+def scan_owner_files(owner_type):
+    """Parcourt `MEDIA_ROOT/<type>/<id>/` avec os.scandir : `(id, chemin relatif, stat)`"""
+    root = os.path.join(settings.MEDIA_ROOT, owner_type)
+    if not os.path.isdir(root):
+        return
+    with os.scandir(root) as owners:
+        for owner in owners:
+            if not owner.is_dir(follow_symlinks=False) or not owner.name.isdigit():
+                continue
+            with os.scandir(owner.path) as files:
+                for entry in files:
+                    if entry.name.startswith('.') or not entry.is_file(follow_symlinks=False):
+                        continue
+                    yield int(owner.name), f'{owner_type}/{owner.name}/{entry.name}', entry.stat(follow_symlinks=False)
+
+
+def scan_stored_owner_files(owner_type):
+    """Variante de scan_owner_files par l'API Storage (stockage objet) : `(id, chemin relatif, None)`"""
+    try:
+        owners, _ = default_storage.listdir(owner_type)
+    except (FileNotFoundError, NotImplementedError):
+        return
+    for owner in owners:
+        if not owner.isdigit():
+            continue
+        _, files = default_storage.listdir(f'{owner_type}/{owner}')
+        for name in files:
+            if not name.startswith('.'):
+                yield int(owner), f'{owner_type}/{owner}/{name}', None
+
+
+def rebuild(owner_type, rehash=False):
+    """
+    Reconstruit le manifeste d'un type d'objet à partir du stockage (disque
+    local ou stockage objet) et de la base. Les empreintes déjà connues sont conservées tant que la taille et
+    la date de modification n'ont pas changé (sauf `rehash`).
+
+    Retourne le nombre d'entrées enregistrées.
+    """
+    linked = linked_paths(owner_type)
+    previous = {
+        (owner_id, path): (size, mtime, sha256)
+        for owner_id, path, size, mtime, sha256 in MediaFile.objects.filter(owner_type=owner_type)
+        .values_list('owner_id', 'path', 'size', 'mtime', 'sha256').iterator(chunk_size=REBUILD_BATCH_SIZE)
+    }
+    entries = {}
+    local = is_local()
+
+    def add(owner_id, path, stat):
+        fields = snapshot(path, stat, digest=False)
+        known = previous.get((owner_id, path))
+        if fields['present'] and not fields['sha256']:
+            if known and not rehash and known[0] == fields['size'] and known[1] == fields['mtime'] and known[2]:
+                fields['sha256'] = known[2]
+            elif local:
+                fields['sha256'] = file_digest(os.path.join(settings.MEDIA_ROOT, path))
+            else:
+                fields['sha256'] = stored_digest(path)
+        entries[(owner_id, path)] = MediaFile(
+            owner_type=owner_type, owner_id=owner_id, path=path,
+            linked=owner_id in linked.get(path, ()), **fields,
+        )
+
+    for owner_id, path, stat in (scan_owner_files if local else scan_stored_owner_files)(owner_type):
+        add(owner_id, path, stat)
+    # Fichiers référencés hors du dossier de l'objet (blobs partagés, anciens chemins) ou absents
+    for path, owners in linked.items():
+        for owner_id in owners:
+            if (owner_id, path) not in entries:
+                add(owner_id, path, None)
+
+    with transaction.atomic():
+        MediaFile.objects.filter(owner_type=owner_type).delete()
+        MediaFile.objects.bulk_create(entries.values(), batch_size=REBUILD_BATCH_SIZE)
+    return len(entries)
+
+
+# --- Empreintes calculées hors du thread de requête ---
+# Une tâche perdue (worker redémarré) laisse une empreinte vide, que
+# `rebuild_media_manifest` complète.
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='media-manifest')
+    return _executor
+
+
+def fill_digests(owner_type, owner_id, paths):
+    """Calcule l'empreinte des entrées qui n'en ont pas encore ; exécuté par le pool"""
+    try:
+        pending = MediaFile.objects.filter(
+            owner_type=owner_type, owner_id=owner_id, path__in=paths, present=True, sha256='',
+        ).values_list('pk', 'path')
+        for pk, path in pending:
+            fields = snapshot(path)
+            MediaFile.objects.filter(pk=pk, sha256='').update(
+                size=fields['size'], mtime=fields['mtime'], sha256=fields['sha256'], present=fields['present'],
+            )
+    except Exception:
+        logger.exception(f"Échec du calcul des empreintes pour {owner_type} #{owner_id}")
+    finally:
+        if HASH_ASYNC:
+            close_old_connections()
+
+
+def schedule_digests(owner_type, owner_id, paths):
+    """Programme le calcul des empreintes après le commit de la transaction courante"""
+    if not paths:
+        return
+    if HASH_ASYNC:
+        transaction.on_commit(lambda: get_executor().submit(fill_digests, owner_type, owner_id, paths))
+    else:
+        transaction.on_commit(lambda: fill_digests(owner_type, owner_id, paths))
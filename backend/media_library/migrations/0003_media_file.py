@@ -0,0 +1,35 @@
+# Generated by Django 5.0.3 on 2026-10-18 17:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('media_library', '0002_media_blob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('owner_type', models.CharField(choices=[('motorcycles', 'Moto'), ('parts', 'Pièce détachée'), ('blog', 'Article de blog')], max_length=20)),
+                ('owner_id', models.PositiveIntegerField()),
+                ('path', models.CharField(max_length=500)),
+                ('size', models.BigIntegerField(default=0)),
+                ('mtime', models.DateTimeField(blank=True, null=True)),
+                ('sha256', models.CharField(blank=True, max_length=64)),
+                ('present', models.BooleanField(default=True)),
+                ('linked', models.BooleanField(default=False)),
+                ('indexed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['path'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='mediafile',
+            constraint=models.UniqueConstraint(fields=('owner_type', 'owner_id', 'path'), name='media_file_owner_path_unique'),
+        ),
+    ]
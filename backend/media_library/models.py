@@ -0,0 +1,90 @@
+import uuid
+
+from django.conf import settings
+from django.db import models
+
+
+class UploadSession(models.Model):
+    """Upload fragmenté et reprenable d'un fichier vers motorcycles|parts|blog/<id>/"""
+    TARGET_CHOICES = [
+        ('motorcycles', 'Moto'),
+        ('parts', 'Pièce détachée'),
+        ('blog', 'Article de blog'),
+    ]
+    STATUS_PENDING = 'pending'
+    STATUS_COMPLETE = 'complete'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'En cours'),
+        (STATUS_COMPLETE, 'Terminé'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    target = models.CharField(max_length=20, choices=TARGET_CHOICES)
+    object_id = models.PositiveIntegerField()
+    filename = models.CharField(max_length=255)
+    # Nom définitif dans default_storage, réservé à la création
+    path = models.CharField(max_length=500, unique=True)
+    size = models.BigIntegerField()
+    offset = models.BigIntegerField(default=0)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    # Upload direct vers le stockage objet (URL signée) au lieu de fragments
+    direct = models.BooleanField(default=False)
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'updated_at'], name='upload_status_updated_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.filename} -> {self.path} ({self.offset}/{self.size})"
+
+    @property
+    def is_complete(self):
+        return self.status == self.STATUS_COMPLETE
+
+
+class MediaBlob(models.Model):
+    """Fichier stocké une seule fois, nommé par son empreinte SHA-256 et compté par référence"""
+    sha256 = models.CharField(max_length=64, unique=True)
+    path = models.CharField(max_length=500, unique=True)
+    size = models.BigIntegerField()
+    # Nombre d'images (motos, pièces, articles) qui pointent sur ce fichier
+    refcount = models.PositiveIntegerField(default=1)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.path} ({self.refcount} réf.)"
+
+
+class MediaFile(models.Model):
+    """
+    Manifeste des fichiers média par objet propriétaire, tenu à jour par les
+    chemins d'upload et de suppression et reconstruit par la commande
+    `rebuild_media_manifest`. Permet de lister les fichiers d'un objet sans
+    parcourir le disque.
+    """
+    owner_type = models.CharField(max_length=20, choices=UploadSession.TARGET_CHOICES)
+    owner_id = models.PositiveIntegerField()
+    # Chemin relatif à MEDIA_ROOT
+    path = models.CharField(max_length=500)
+    size = models.BigIntegerField(default=0)
+    mtime = models.DateTimeField(null=True, blank=True)
+    sha256 = models.CharField(max_length=64, blank=True)
+    # Fichier présent sur le disque lors du dernier relevé
+    present = models.BooleanField(default=True)
+    # Référencé par une image (ou une variante) en base ; sinon orphelin
+    linked = models.BooleanField(default=False)
+    indexed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['path']
+        constraints = [
+            models.UniqueConstraint(fields=['owner_type', 'owner_id', 'path'], name='media_file_owner_path_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.owner_type}/{self.owner_id}: {self.path}"
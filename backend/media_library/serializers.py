@@ -0,0 +1,49 @@
+import mimetypes
+import os
+
+from rest_framework import serializers
+
+from .models import UploadSession
+from .uploads import ALLOWED_EXTENSIONS, UPLOAD_MAX_SIZE, get_owner
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    """Serializer pour les sessions d'upload fragmenté"""
+
+    class Meta:
+        model = UploadSession
+        fields = ['id', 'target', 'object_id', 'filename', 'size', 'offset', 'status', 'direct', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'offset', 'status', 'direct', 'created_at', 'updated_at']
+
+    def validate_filename(self, value):
+        if os.path.splitext(value)[1].lower() not in ALLOWED_EXTENSIONS:
+            raise serializers.ValidationError('Type de fichier non autorisé')
+        return os.path.basename(value)
+
+    def validate_size(self, value):
+        if value <= 0:
+            raise serializers.ValidationError('Taille invalide')
+        if value > UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError(f'Fichier trop volumineux (maximum {UPLOAD_MAX_SIZE} octets)')
+        return value
+
+    def validate(self, attrs):
+        if get_owner(attrs['target'], attrs['object_id']) is None:
+            raise serializers.ValidationError({'object_id': 'Objet introuvable'})
+        return attrs
+
+
+class PresignSerializer(UploadSessionSerializer):
+    """Demande d'upload direct vers le stockage objet"""
+    content_type = serializers.CharField(max_length=100, required=False)
+
+    class Meta(UploadSessionSerializer.Meta):
+        fields = UploadSessionSerializer.Meta.fields + ['content_type']
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        content_type = attrs.get('content_type') or mimetypes.guess_type(attrs['filename'])[0]
+        if not (content_type or '').startswith('image/'):
+            raise serializers.ValidationError({'content_type': 'Type de contenu non autorisé'})
+        attrs['content_type'] = content_type
+        return attrs
@@ -0,0 +1,124 @@
+"""Distribution des médias : X-Accel-Redirect vers nginx, repli fichier avec Range"""
+import mimetypes
+import os
+import posixpath
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+# Emplacement interne nginx (`internal;`) ; vide : Django sert le fichier lui-même
+ACCEL_REDIRECT_PREFIX = getattr(settings, 'MEDIA_ACCEL_REDIRECT', '')
+# Dossiers publiables sous MEDIA_ROOT
+PUBLIC_PREFIXES = ('motorcycles/', 'parts/', 'blog/', 'blobs/')
+PRIVATE_PREFIXES = ('blobs/tmp/',)
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+DEFAULT_CACHE_CONTROL = 'public, max-age=3600'
+STREAM_BLOCK_SIZE = 64 * 1024
+
+# uuid4 ou empreinte SHA-256, éventuellement suivis d'un suffixe de variante (_640w)
+_CONTENT_NAME = re.compile(r'^(?:[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}|[0-9a-f]{64})(?:_\w+)?\.\w+$')
+_RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def normalize_media_path(path):
+    """Chemin relatif sûr (pas de `..`, pas de chemin absolu), ou Http404"""
+    normalized = posixpath.normpath(path).lstrip('/')
+    if normalized.startswith('..') or '/../' in f'/{normalized}/' or normalized in ('', '.'):
+        raise Http404('Fichier introuvable')
+    if not normalized.startswith(PUBLIC_PREFIXES) or normalized.startswith(PRIVATE_PREFIXES):
+        raise Http404('Fichier introuvable')
+    return normalized
+
+
+def cache_control_for(path):
+    """Noms uuid/empreinte jamais réécrits : cache immuable d'un an"""
+    if _CONTENT_NAME.match(posixpath.basename(path)):
+        return IMMUTABLE_CACHE_CONTROL
+    return DEFAULT_CACHE_CONTROL
+
+
+def content_type_for(path):
+    content_type, _ = mimetypes.guess_type(path)
+    return content_type or 'application/octet-stream'
+
+
+def accel_response(path):
+    """Réponse vide : nginx sert le fichier depuis son emplacement interne"""
+    response = HttpResponse(content_type=content_type_for(path))
+    response['X-Accel-Redirect'] = f"{ACCEL_REDIRECT_PREFIX.rstrip('/')}/{quote(path)}"
+    response['Cache-Control'] = cache_control_for(path)
+    return response
+
+
+def parse_range(header, size):
+    """Plage d'octets unique `bytes=a-b` -> (début, fin incluse), None si absente, ValueError si invalide"""
+    if not header:
+        return None
+    match = _RANGE.match(header.strip())
+    if not match or match.groups() == ('', ''):
+        raise ValueError(header)
+    first, last = match.groups()
+    if first == '':
+        # Suffixe : les N derniers octets
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError(header)
+    return start, end
+
+
+def _iter_range(handle, start, length):
+    try:
+        handle.seek(start)
+        remaining = length
+        while remaining > 0:
+            block = handle.read(min(STREAM_BLOCK_SIZE, remaining))
+            if not block:
+                break
+            remaining -= len(block)
+            yield block
+    finally:
+        handle.close()
+
+
+def file_response(request, path):
+    """Repli de développement : fichier servi par Django, avec If-Modified-Since et Range"""
+    full_path = os.path.join(settings.MEDIA_ROOT, path)
+    try:
+        stat = os.stat(full_path)
+    except OSError:
+        raise Http404('Fichier introuvable')
+    if not os.path.isfile(full_path):
+        raise Http404('Fichier introuvable')
+    if not was_modified_since(request.META.get('HTTP_IF_MODIFIED_SINCE'), stat.st_mtime):
+        return HttpResponseNotModified()
+
+    content_type = content_type_for(path)
+    try:
+        byte_range = parse_range(request.META.get('HTTP_RANGE'), stat.st_size)
+    except ValueError:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{stat.st_size}'
+        return response
+
+    if byte_range is None:
+        response = FileResponse(open(full_path, 'rb'), content_type=content_type)
+    else:
+        start, end = byte_range
+        length = end - start + 1
+        response = StreamingHttpResponse(
+            _iter_range(open(full_path, 'rb'), start, length), status=206, content_type=content_type,
+        )
+        response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+        response['Content-Length'] = str(length)
+    response['Accept-Ranges'] = 'bytes'
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    response['Cache-Control'] = cache_control_for(path)
+    return response
@@ -0,0 +1,83 @@
+"""
+Stockage des médias derrière l'API Storage de Django : système de fichiers
+local (défaut) ou stockage objet compatible S3 (django-storages, MinIO...).
+"""
+import os
+import shutil
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+
+# Durée de validité des URLs d'upload direct, en secondes
+PRESIGNED_URL_EXPIRY = getattr(settings, 'MEDIA_PRESIGNED_URL_EXPIRY', 15 * 60)
+
+
+class PresignUnsupported(Exception):
+    """Le stockage configuré ne sait pas émettre d'URL d'upload direct"""
+
+
+def is_local(storage=None):
+    """Vrai si les fichiers sont accessibles par un chemin du système de fichiers"""
+    storage = storage or default_storage
+    try:
+        storage.path('')
+    except NotImplementedError:
+        return False
+    return True
+
+
+def stored_size(name, storage=None):
+    """Taille d'un fichier du stockage, None s'il n'existe pas"""
+    storage = storage or default_storage
+    if not storage.exists(name):
+        return None
+    return storage.size(name)
+
+
+def delete_tree(prefix, storage=None):
+    """Supprime un dossier et son contenu ; retourne False s'il n'existait pas"""
+    storage = storage or default_storage
+    if is_local(storage):
+        path = storage.path(prefix)
+        if not os.path.isdir(path):
+            return False
+        shutil.rmtree(path)
+        return True
+    # Stockage objet : pas de dossier, seulement des clés sous le préfixe
+    directories, files = storage.listdir(prefix)
+    for name in files:
+        storage.delete(f"{prefix.rstrip('/')}/{name}")
+    for directory in directories:
+        delete_tree(f"{prefix.rstrip('/')}/{directory}", storage)
+    return bool(directories or files)
+
+
+def _s3_client(storage):
+    # S3Storage (django-storages) expose la ressource boto3 dans `connection`
+    connection = getattr(storage, 'connection', None)
+    return getattr(getattr(connection, 'meta', None), 'client', None)
+
+
+def presigned_put(name, content_type, expires_in=PRESIGNED_URL_EXPIRY, storage=None):
+    """
+    URL signée permettant au navigateur d'envoyer le fichier directement au
+    stockage (`PUT`, avec l'en-tête Content-Type indiqué). Un backend peut
+    fournir sa propre méthode `presigned_put_url(name, content_type,
+    expires_in)` ; sinon le client S3 de django-storages est utilisé.
+    """
+    storage = storage or default_storage
+    presign = getattr(storage, 'presigned_put_url', None)
+    if presign is not None:
+        return presign(name, content_type, expires_in)
+    client = _s3_client(storage)
+    if client is None:
+        raise PresignUnsupported('Upload direct indisponible avec ce stockage')
+    from storages.utils import clean_name
+
+    key = storage._normalize_name(clean_name(name))
+    return client.generate_presigned_url(
+        'put_object',
+        Params={'Bucket': storage.bucket_name, 'Key': key, 'ContentType': content_type},
+        ExpiresIn=expires_in,
+        HttpMethod='PUT',
+    )
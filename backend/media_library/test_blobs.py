@@ -0,0 +1,106 @@
+import os
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from rest_framework.test import APIClient
+
+from blog.models import Category as BlogCategory, Post
+from media_library import blobs
+from media_library.models import MediaBlob
+from motorcycles.models import Motorcycle, MotorcycleImage
+from parts.models import Category, Part, PartImage
+from utils import file_cleanup
+
+
+@pytest.fixture(autouse=True)
+def content_addressed(settings, tmp_path, monkeypatch):
+    settings.MEDIA_ROOT = str(tmp_path)
+    monkeypatch.setattr(blobs, 'CONTENT_ADDRESSED', True)
+    monkeypatch.setattr(file_cleanup, 'CLEANUP_ASYNC', False)
+    return tmp_path
+
+
+@pytest.fixture
+def client():
+    admin = get_user_model().objects.create_user('admin', 'admin@example.com', 'Secret123!', is_staff=True)
+    client = APIClient()
+    client.force_authenticate(admin)
+    return client
+
+
+def _photo(content=b'meme-photo-de-stock'):
+    return SimpleUploadedFile('stock.JPG', content, content_type='image/jpeg')
+
+
+@pytest.mark.django_db
+def test_identical_uploads_share_one_refcounted_blob(client, content_addressed, django_capture_on_commit_callbacks):
+    moto = Motorcycle.objects.create(
+        brand='Yamaha', model='MT-07', year=2020, price='6990.00', mileage=0, engine='689cc',
+        power=73, license='A2', color='Noir', description='Test',
+    )
+    part = Part.objects.create(
+        name='Levier', category=Category.objects.create(name='Freinage', slug='freinage'),
+        brand='Brembo', compatible_models='', price='39.90', stock=5, description='Pièce',
+    )
+    post = Post.objects.create(
+        title='Salon', slug='salon', category=BlogCategory.objects.create(name='Actus', slug='actus'),
+        content='Texte', is_published=True,
+    )
+
+    assert client.post(f'/api/motorcycles/{moto.pk}/upload_images/', {'images': [_photo()]}, format='multipart').status_code == 201
+    assert client.post(f'/api/parts/{part.pk}/upload_images/', {'images': [_photo()]}, format='multipart').status_code == 201
+    assert client.post(f'/api/blog/{post.slug}/upload_image/', {'image': _photo()}, format='multipart').status_code == 200
+
+    blob = MediaBlob.objects.get()
+    assert blob.refcount == 3 and blob.size == len(b'meme-photo-de-stock')
+    assert blob.path.startswith('blobs/') and blob.path.endswith('.jpg')
+    path = os.path.join(content_addressed, blob.path)
+    # Une seule copie sur disque, plus aucun fichier temporaire
+    assert os.path.exists(path)
+    assert os.listdir(content_addressed / 'blobs' / 'tmp') == []
+    assert MotorcycleImage.objects.get().image == blob.path
+
+    MotorcycleImage.objects.get().delete()
+    PartImage.objects.get().delete()
+    assert MediaBlob.objects.get().refcount == 1
+    assert os.path.exists(path)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Post.objects.get(pk=post.pk).delete()
+        assert MediaBlob.objects.get().refcount == 0
+        # Fichier et ligne supprimés seulement après le commit
+        assert os.path.exists(path)
+    assert not os.path.exists(path)
+    assert not MediaBlob.objects.exists()
+
+
+@pytest.mark.django_db
+def test_blob_reused_before_cleanup_keeps_its_file(content_addressed, django_capture_on_commit_callbacks):
+    moto = Motorcycle.objects.create(
+        brand='Yamaha', model='MT-07', year=2020, price='6990.00', mileage=0, engine='689cc',
+        power=73, license='A2', color='Noir', description='Test',
+    )
+    image = MotorcycleImage.objects.create(motorcycle=moto, image=blobs.save_upload('motorcycles/1', _photo()))
+    path = os.path.join(content_addressed, image.image)
+    with django_capture_on_commit_callbacks() as callbacks:
+        image.delete()
+    # Même contenu téléversé avant le passage du nettoyage : la ligne est reprise
+    assert blobs.save_upload('motorcycles/1', _photo()) == image.image
+    assert MediaBlob.objects.get().refcount == 1
+
+    for callback in callbacks:
+        callback()
+    assert os.path.exists(path)
+    assert MediaBlob.objects.get().refcount == 1
+
+
+@pytest.mark.django_db
+def test_different_content_gets_its_own_blob():
+    first = blobs.save_upload('parts/1', _photo(b'a'))
+    second = blobs.save_upload('parts/1', _photo(b'b'))
+    assert first != second
+    assert MediaBlob.objects.count() == 2
+
+    blobs.discard_upload(first)
+    assert list(MediaBlob.objects.values_list('path', flat=True)) == [second]
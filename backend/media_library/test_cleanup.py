@@ -0,0 +1,83 @@
+import time
+
+import pytest
+from django.db import transaction
+
+from motorcycles.models import Motorcycle, MotorcycleImage
+from utils import file_cleanup
+from utils.file_cleanup import CleanupTask, CleanupWorker
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    folder = tmp_path / 'motorcycles' / '1'
+    folder.mkdir(parents=True)
+    for name in ('a.jpg', 'b.jpg'):
+        (folder / name).write_bytes(b'image')
+    return tmp_path
+
+
+@pytest.fixture
+def image():
+    moto = Motorcycle.objects.create(
+        brand='Yamaha', model='MT-07', year=2020, price='6990.00', mileage=0, engine='689cc',
+        power=73, license='A2', color='Noir', description='Test',
+    )
+    return MotorcycleImage.objects.create(motorcycle=moto, image='/media/motorcycles/1/a.jpg')
+
+
+@pytest.mark.django_db
+def test_rolled_back_delete_keeps_file(image, media_root, monkeypatch, django_capture_on_commit_callbacks):
+    monkeypatch.setattr(file_cleanup, 'CLEANUP_ASYNC', False)
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                image.delete()
+                raise RuntimeError('annulé')
+    assert callbacks == []
+    assert (media_root / 'motorcycles' / '1' / 'a.jpg').exists()
+
+
+@pytest.mark.django_db
+def test_worker_batches_deletions_in_background(image, media_root, monkeypatch, django_capture_on_commit_callbacks):
+    worker = CleanupWorker()
+    processed = []
+    process = worker.process
+    monkeypatch.setattr(worker, 'process', lambda batch, retry=True: processed.append(len(batch)) or process(batch, retry))
+    monkeypatch.setattr(file_cleanup, 'cleanup_worker', worker)
+    monkeypatch.setattr(file_cleanup, 'CLEANUP_BATCH_WAIT', 0.2)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        image.delete()
+        file_cleanup.delete_file_from_url('/media/motorcycles/1/b.jpg')
+
+    deadline = time.monotonic() + 5
+    while not processed and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert processed == [2]
+    assert not (media_root / 'motorcycles' / '1' / 'a.jpg').exists()
+    assert not (media_root / 'motorcycles' / '1' / 'b.jpg').exists()
+
+
+def test_failed_unlink_is_retried_then_reported(media_root, monkeypatch, caplog):
+    worker = CleanupWorker()
+    resubmitted = []
+    monkeypatch.setattr(worker, 'submit', resubmitted.extend)
+    monkeypatch.setattr(file_cleanup, 'CLEANUP_RETRY_DELAY', 0)
+
+    def busy(name):
+        raise PermissionError('fichier verrouillé')
+
+    monkeypatch.setattr(file_cleanup.default_storage, 'delete', busy)
+    tasks = [CleanupTask('file', 'motorcycles/1/a.jpg'), CleanupTask('file', 'motorcycles/1/absent.jpg')]
+    assert worker.process(tasks) == {'deleted': 0, 'missing': 1, 'kept': 0, 'retried': 1, 'failed': 0}
+
+    deadline = time.monotonic() + 5
+    while not resubmitted and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert resubmitted == [CleanupTask('file', 'motorcycles/1/a.jpg', attempts=1)]
+
+    last = CleanupTask('file', 'motorcycles/1/a.jpg', attempts=file_cleanup.CLEANUP_MAX_ATTEMPTS - 1)
+    assert worker.process([last])['failed'] == 1
+    assert 'gave up' in caplog.text
@@ -0,0 +1,85 @@
+import io
+import os
+import time
+
+import pytest
+from django.core.management import call_command
+
+from media_library.collector import MediaCollector
+from media_library.models import MediaBlob, UploadSession
+from motorcycles.models import Motorcycle, MotorcycleImage
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    return tmp_path
+
+
+def _write(root, path, content=b'image', age=2 * 86400):
+    full = root / path
+    full.parent.mkdir(parents=True, exist_ok=True)
+    full.write_bytes(content)
+    stamp = time.time() - age
+    os.utime(full, (stamp, stamp))
+
+
+@pytest.fixture
+def tree(media_root):
+    moto = Motorcycle.objects.create(
+        brand='Yamaha', model='MT-07', year=2020, price='6990.00', mileage=0, engine='689cc',
+        power=73, license='A2', color='Noir', description='Test',
+    )
+    folder = f'motorcycles/{moto.pk}'
+    _write(media_root, f'{folder}/kept.jpg')
+    _write(media_root, f'{folder}/kept_320w.webp')
+    _write(media_root, f'{folder}/legacy photo.jpg')
+    _write(media_root, f'{folder}/orphan.jpg', b'orphan-bytes')
+    _write(media_root, f'{folder}/orphan_320w.webp', b'webp')
+    _write(media_root, f'{folder}/fresh.jpg', age=0)
+    _write(media_root, f'{folder}/partial.jpg')
+    _write(media_root, 'blobs/ab/cd/abcd.jpg', b'blob')
+    MotorcycleImage.objects.create(motorcycle=moto, image=f'/media/{folder}/kept.jpg')
+    # Ancienne URL absolue, nom encodé
+    MotorcycleImage.objects.create(motorcycle=moto, image=f'http://178.16.130.95:8000/media/{folder}/legacy%20photo.jpg')
+    MotorcycleImage.objects.create(motorcycle=moto, image=f'/media/{folder}/gone.jpg')
+    UploadSession.objects.create(target='motorcycles', object_id=moto.pk, filename='p.jpg', path=f'{folder}/partial.jpg', size=10)
+    MediaBlob.objects.create(sha256='abcd', path='blobs/ab/cd/abcd.jpg', size=4)
+    return folder
+
+
+@pytest.mark.django_db
+def test_dry_run_reports_orphans_and_missing_rows(tree, media_root):
+    collector = MediaCollector(chunk_size=2)
+    orphans = dict(collector.orphans())
+    assert orphans == {
+        f'{tree}/orphan.jpg': 12,
+        f'{tree}/orphan_320w.webp': 4,
+        'blobs/ab/cd/abcd.jpg': 4,
+    }
+    assert collector.stats['recent'] == 1
+    assert [url for _, _, url in collector.missing()] == [f'/media/{tree}/gone.jpg']
+
+    out = io.StringIO()
+    call_command('media_gc', stdout=out)
+    assert '20 octets' in out.getvalue()
+    assert '1 image(s) en base sans fichier' in out.getvalue()
+    assert (media_root / tree / 'orphan.jpg').exists()
+
+
+@pytest.mark.django_db
+def test_quarantine_and_delete_modes(tree, media_root):
+    stats = MediaCollector(mode='quarantine').run()
+    assert stats['orphans'] == 3 and stats['reclaimable_bytes'] == 20
+    assert not (media_root / tree / 'orphan.jpg').exists()
+    quarantined = [
+        os.path.relpath(os.path.join(directory, name), media_root)
+        for directory, _, names in os.walk(media_root / '.quarantine') for name in names
+    ]
+    assert len(quarantined) == 3 and any(path.endswith(f'{tree}/orphan.jpg') for path in quarantined)
+    assert not MediaBlob.objects.exists()
+
+    # La quarantaine n'est pas reparcourue
+    assert MediaCollector(mode='delete').run()['orphans'] == 0
+    assert (media_root / tree / 'kept_320w.webp').exists()
+    assert (media_root / tree / 'partial.jpg').exists()
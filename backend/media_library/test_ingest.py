@@ -0,0 +1,116 @@
+import os
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db.models.signals import post_save
+from rest_framework.test import APIClient
+
+from media_library import ingest
+from media_library.models import MediaFile
+from motorcycles.models import MotorcycleImage
+from motorcycles.signals import motorcycle_image_saved
+from parts.models import Category, Part, PartImage
+from parts.signals import part_image_saved, part_images_saved
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def client():
+    admin = get_user_model().objects.create_user('admin', 'admin@example.com', 'Secret123!', is_staff=True)
+    client = APIClient()
+    client.force_authenticate(admin)
+    return client
+
+
+@pytest.fixture
+def part():
+    category = Category.objects.create(name='Freinage', slug='freinage')
+    return Part.objects.create(
+        name='Levier', category=category, brand='Brembo', compatible_models='Yamaha MT-07',
+        price='39.90', stock=5, description='Pièce',
+    )
+
+
+def _files(count):
+    return [SimpleUploadedFile(f'photo{i}.jpg', b'jpeg-%d' % i, content_type='image/jpeg') for i in range(count)]
+
+
+def _stored(media_root, part):
+    directory = media_root / 'parts' / str(part.pk)
+    return sorted(os.listdir(directory)) if directory.exists() else []
+
+
+@pytest.mark.django_db
+def test_batch_is_written_concurrently_and_bulk_inserted(client, part, media_root, django_capture_on_commit_callbacks):
+    before = Part.objects.get(pk=part.pk).updated_at
+    saves = []
+
+    def count_saves(sender, **kwargs):
+        saves.append(sender)
+
+    post_save.connect(count_saves, sender=PartImage)
+    try:
+        with django_capture_on_commit_callbacks() as callbacks:
+            response = client.post(f'/api/parts/{part.pk}/upload_images/', {'images': _files(6)}, format='multipart')
+    finally:
+        post_save.disconnect(count_saves, sender=PartImage)
+    assert response.status_code == 201
+    assert len(response.json()) == 6
+    images = PartImage.objects.filter(part=part).order_by('id')
+    assert images.count() == 6
+    assert len(_stored(media_root, part)) == 6
+    # Pas de post_save par ligne : effets appliqués une fois pour le lot
+    assert saves == []
+    # Variantes par image ; invalidation et empreintes du manifeste une fois pour le lot
+    scheduled = [callback.__qualname__.split('.')[0] for callback in callbacks]
+    assert {name: scheduled.count(name) for name in set(scheduled)} == {
+        'schedule_variants': 6, 'schedule_digests': 1, 'bump_generation': 1,
+    }
+    refreshed = Part.objects.get(pk=part.pk)
+    assert refreshed.updated_at > before
+    assert refreshed.primary_image_id == images[0].pk
+    assert MediaFile.objects.filter(owner_type='parts', owner_id=part.pk, linked=True).count() == 6
+
+
+@pytest.mark.django_db
+def test_partial_failure_is_reported_per_file(client, part, media_root, monkeypatch):
+    save_file = ingest._save_file
+
+    def flaky(directory, upload):
+        if upload.name == 'photo1.jpg':
+            raise OSError('disque plein')
+        return save_file(directory, upload)
+
+    monkeypatch.setattr(ingest, '_save_file', flaky)
+    response = client.post(f'/api/parts/{part.pk}/upload_images/', {'images': _files(3)}, format='multipart')
+    assert response.status_code == 207
+    body = response.json()
+    assert len(body['created']) == 2
+    assert body['errors'] == [{'file': 'photo1.jpg', 'error': 'disque plein'}]
+    assert len(_stored(media_root, part)) == 2
+
+
+@pytest.mark.django_db
+def test_failed_insert_removes_written_files(part, media_root, monkeypatch):
+    def broken_bulk_create(*args, **kwargs):
+        raise RuntimeError('base indisponible')
+
+    monkeypatch.setattr(PartImage.objects, 'bulk_create', broken_bulk_create)
+    with pytest.raises(RuntimeError):
+        ingest.ingest_images(part, _files(3), PartImage, 'part', part_images_saved)
+    assert _stored(media_root, part) == []
+    assert not PartImage.objects.exists()
+
+
+@pytest.mark.parametrize('image_model, receiver', [(MotorcycleImage, motorcycle_image_saved), (PartImage, part_image_saved)])
+def test_image_post_save_goes_through_the_shared_helper(image_model, receiver):
+    # Un receiver post_save ajouté à côté ne s'appliquerait pas aux uploads groupés :
+    # ses effets doivent aller dans <app>_images_saved
+    sync_receivers, async_receivers = post_save._live_receivers(image_model)
+    assert [*sync_receivers, *async_receivers] == [receiver]
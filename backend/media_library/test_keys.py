@@ -0,0 +1,66 @@
+import pytest
+from django.db import connection
+from rest_framework.test import APIClient
+
+from media_library.keys import canonicalize_rows, key_url, to_key
+from motorcycles.models import Motorcycle, MotorcycleImage
+
+
+@pytest.fixture
+def moto():
+    return Motorcycle.objects.create(
+        brand='Yamaha', model='MT-07', year=2020, price='6990.00', mileage=0, engine='689cc',
+        power=73, license='A2', color='Noir', description='Test',
+    )
+
+
+def test_to_key_accepts_every_stored_form():
+    assert to_key('/media/parts/3/a.jpg') == 'parts/3/a.jpg'
+    assert to_key('http://178.16.130.95:8000/media/parts/3/legacy%20photo.jpg') == 'parts/3/legacy photo.jpg'
+    assert to_key('parts/3/a.jpg') == 'parts/3/a.jpg'
+    assert to_key('https://cdn.example.com/photo.jpg') == 'https://cdn.example.com/photo.jpg'
+    # Seuls les anciens hôtes du site sont ramenés à des clés
+    assert to_key('https://cdn.example.com/media/x.jpg') == 'https://cdn.example.com/media/x.jpg'
+    assert key_url('parts/3/a.jpg') == '/media/parts/3/a.jpg'
+    assert key_url('https://cdn.example.com/photo.jpg') == 'https://cdn.example.com/photo.jpg'
+
+
+@pytest.mark.django_db
+def test_saved_values_are_canonical_and_served_with_the_prefix(moto):
+    image = MotorcycleImage.objects.create(motorcycle=moto, image=f'http://localhost:8000/media/motorcycles/{moto.pk}/a.jpg')
+    assert image.image == f'motorcycles/{moto.pk}/a.jpg'
+    MotorcycleImage.objects.filter(pk=image.pk).update(image=f'/media/motorcycles/{moto.pk}/b.jpg')
+    assert MotorcycleImage.objects.get(pk=image.pk).image == f'motorcycles/{moto.pk}/b.jpg'
+
+    body = APIClient().get(f'/api/motorcycles/{moto.pk}/').json()
+    assert body['images'][0]['image'] == f'/media/motorcycles/{moto.pk}/b.jpg'
+
+
+@pytest.mark.django_db
+def test_canonicalize_rows_rewrites_legacy_rows_in_chunks(moto):
+    legacy = [
+        f'http://178.16.130.95:8000/media/motorcycles/{moto.pk}/a.jpg',
+        f'/media/motorcycles/{moto.pk}/b.jpg',
+        f'motorcycles/{moto.pk}/c.jpg',
+        'https://cdn.example.com/media/d.jpg',
+    ]
+    images = [MotorcycleImage.objects.create(motorcycle=moto, image='placeholder.jpg') for _ in legacy]
+    # Lignes écrites avant la migration : ni pre_save ni get_prep_value
+    for image, value in zip(images, legacy):
+        MotorcycleImage.objects.filter(pk=image.pk).update(variants={
+            'source': value,
+            'formats': {'webp': [{'width': 320, 'height': 200, 'url': f'/media/motorcycles/{moto.pk}/x_320w.webp'}]},
+        })
+    with connection.cursor() as cursor:
+        for image, value in zip(images, legacy):
+            cursor.execute('UPDATE motorcycles_motorcycleimage SET image = %s WHERE id = %s', [value, image.pk])
+
+    assert canonicalize_rows(MotorcycleImage, 'image', 'variants', chunk_size=3) == 4
+    rows = list(MotorcycleImage.objects.order_by('pk').values_list('image', 'variants'))
+    assert [image for image, _ in rows] == [
+        f'motorcycles/{moto.pk}/a.jpg', f'motorcycles/{moto.pk}/b.jpg', f'motorcycles/{moto.pk}/c.jpg',
+        'https://cdn.example.com/media/d.jpg',
+    ]
+    assert rows[0][1]['formats']['webp'][0] == {'width': 320, 'height': 200, 'key': f'motorcycles/{moto.pk}/x_320w.webp'}
+    # Relancée : rien à réécrire
+    assert canonicalize_rows(MotorcycleImage, 'image', 'variants') == 0
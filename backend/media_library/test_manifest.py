@@ -0,0 +1,98 @@
+import hashlib
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from rest_framework.test import APIClient
+
+from media_library import manifest
+from media_library.models import MediaFile
+from motorcycles.models import Motorcycle, MotorcycleImage
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path, monkeypatch):
+    settings.MEDIA_ROOT = str(tmp_path)
+    monkeypatch.setattr(manifest, 'HASH_ASYNC', False)
+    return tmp_path
+
+
+@pytest.fixture
+def client():
+    admin = get_user_model().objects.create_user('admin', 'admin@example.com', 'Secret123!', is_staff=True)
+    client = APIClient()
+    client.force_authenticate(admin)
+    return client
+
+
+@pytest.fixture
+def moto():
+    return Motorcycle.objects.create(
+        brand='Yamaha', model='MT-07', year=2020, price='6990.00', mileage=0, engine='689cc',
+        power=73, license='A2', color='Noir', description='Test',
+    )
+
+
+@pytest.mark.django_db
+def test_upload_and_delete_maintain_manifest(client, moto, django_assert_max_num_queries, django_capture_on_commit_callbacks):
+    upload = SimpleUploadedFile('photo.jpg', b'jpeg-bytes', content_type='image/jpeg')
+    with django_capture_on_commit_callbacks(execute=True):
+        response = client.post(f'/api/motorcycles/{moto.pk}/upload_images/', {'images': [upload]}, format='multipart')
+    assert response.status_code == 201
+    image = MotorcycleImage.objects.get(motorcycle=moto)
+    entry = MediaFile.objects.get(owner_type='motorcycles', owner_id=moto.pk)
+    assert (entry.size, entry.present, entry.linked) == (10, True, True)
+    assert entry.sha256 == hashlib.sha256(b'jpeg-bytes').hexdigest()
+
+    with django_assert_max_num_queries(3):
+        body = client.get(f'/api/motorcycles/{moto.pk}/list_images/').json()
+    assert [item['url'] for item in body['filesystem']] == [f'/media/{image.image}']
+    assert body['filesystem'][0]['orphan'] is False
+    assert body['missing'] == []
+
+    image.delete()
+    assert not MediaFile.objects.exists()
+
+
+@pytest.mark.django_db
+def test_rebuild_flags_orphans_and_missing_files(client, moto, media_root):
+    folder = media_root / 'motorcycles' / str(moto.pk)
+    folder.mkdir(parents=True)
+    (folder / 'kept.jpg').write_bytes(b'kept')
+    (folder / 'orphan.jpg').write_bytes(b'orphan')
+    MotorcycleImage.objects.create(motorcycle=moto, image=f'/media/motorcycles/{moto.pk}/kept.jpg')
+    MotorcycleImage.objects.create(motorcycle=moto, image=f'/media/motorcycles/{moto.pk}/gone.jpg')
+    MediaFile.objects.all().delete()
+
+    call_command('rebuild_media_manifest', '--type', 'motorcycles')
+    body = client.get(f'/api/motorcycles/{moto.pk}/list_images/').json()
+    assert {item['filename']: item['orphan'] for item in body['filesystem']} == {'kept.jpg': False, 'orphan.jpg': True}
+    assert body['missing'] == [f'/media/motorcycles/{moto.pk}/gone.jpg']
+    assert MediaFile.objects.get(path=f'motorcycles/{moto.pk}/orphan.jpg').sha256 == hashlib.sha256(b'orphan').hexdigest()
+
+
+@pytest.mark.django_db
+def test_digest_is_computed_after_commit(moto, media_root, django_capture_on_commit_callbacks):
+    folder = media_root / 'motorcycles' / str(moto.pk)
+    folder.mkdir(parents=True)
+    (folder / 'photo.jpg').write_bytes(b'photo')
+    with django_capture_on_commit_callbacks() as callbacks:
+        MotorcycleImage.objects.create(motorcycle=moto, image=f'motorcycles/{moto.pk}/photo.jpg')
+    # Pas de lecture du fichier dans la requête
+    entry = MediaFile.objects.get(path=f'motorcycles/{moto.pk}/photo.jpg')
+    assert (entry.size, entry.sha256) == (5, '')
+
+    for callback in callbacks:
+        callback()
+    entry.refresh_from_db()
+    assert entry.sha256 == hashlib.sha256(b'photo').hexdigest()
+
+
+@pytest.mark.django_db
+def test_list_images_is_staff_only(moto):
+    assert APIClient().get(f'/api/motorcycles/{moto.pk}/list_images/').status_code == 401
+    user = get_user_model().objects.create_user('client', 'client@example.com', 'Secret123!')
+    client = APIClient()
+    client.force_authenticate(user)
+    assert client.get(f'/api/motorcycles/{moto.pk}/list_images/').status_code == 403
@@ -0,0 +1,70 @@
+import pytest
+
+from media_library import serving
+from media_library.models import UploadSession
+
+NAME = '0f8fad5b-d9cb-469f-a165-70867728950e.jpg'
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path, monkeypatch):
+    settings.MEDIA_ROOT = str(tmp_path)
+    monkeypatch.setattr(serving, 'ACCEL_REDIRECT_PREFIX', '')
+    directory = tmp_path / 'motorcycles' / '1'
+    directory.mkdir(parents=True)
+    (directory / NAME).write_bytes(bytes(range(100)))
+    (directory / 'legacy.jpg').write_bytes(b'ancien')
+    return tmp_path
+
+
+def _content(response):
+    return b''.join(response.streaming_content)
+
+
+@pytest.mark.django_db
+def test_accel_redirect_with_immutable_cache(client, monkeypatch):
+    monkeypatch.setattr(serving, 'ACCEL_REDIRECT_PREFIX', '/protected-media/')
+    response = client.get(f'/media/motorcycles/1/{NAME}')
+    assert response.status_code == 200
+    assert response['X-Accel-Redirect'] == f'/protected-media/motorcycles/1/{NAME}'
+    assert response['Content-Type'] == 'image/jpeg'
+    assert response['Cache-Control'] == serving.IMMUTABLE_CACHE_CONTROL
+    assert response.content == b''
+
+    legacy = client.get('/media/motorcycles/1/legacy.jpg')
+    assert legacy['Cache-Control'] == serving.DEFAULT_CACHE_CONTROL
+
+
+@pytest.mark.django_db
+def test_fallback_serves_ranges(client):
+    full = client.get(f'/media/motorcycles/1/{NAME}')
+    assert full.status_code == 200
+    assert full['Accept-Ranges'] == 'bytes'
+    assert _content(full) == bytes(range(100))
+
+    partial = client.get(f'/media/motorcycles/1/{NAME}', HTTP_RANGE='bytes=10-19')
+    assert partial.status_code == 206
+    assert partial['Content-Range'] == 'bytes 10-19/100'
+    assert _content(partial) == bytes(range(10, 20))
+
+    suffix = client.get(f'/media/motorcycles/1/{NAME}', HTTP_RANGE='bytes=-5')
+    assert _content(suffix) == bytes(range(95, 100))
+
+    unsatisfiable = client.get(f'/media/motorcycles/1/{NAME}', HTTP_RANGE='bytes=200-')
+    assert unsatisfiable.status_code == 416
+    assert unsatisfiable['Content-Range'] == 'bytes */100'
+
+    not_modified = client.get(f'/media/motorcycles/1/{NAME}', HTTP_IF_MODIFIED_SINCE=full['Last-Modified'])
+    assert not_modified.status_code == 304
+
+
+@pytest.mark.django_db
+def test_unauthorized_paths_are_not_served(client, media_root):
+    (media_root / 'secret.txt').write_bytes(b'secret')
+    assert client.get('/media/secret.txt').status_code == 404
+    assert client.get('/media/motorcycles/../secret.txt').status_code == 404
+    assert client.get('/media/motorcycles/1/absent.jpg').status_code == 404
+    assert client.post(f'/media/motorcycles/1/{NAME}').status_code == 405
+
+    UploadSession.objects.create(target='motorcycles', object_id=1, filename='a.jpg', path='motorcycles/1/legacy.jpg', size=6)
+    assert client.get('/media/motorcycles/1/legacy.jpg').status_code == 404
@@ -0,0 +1,170 @@
+import hashlib
+import io
+import os
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import InMemoryStorage, default_storage
+from django.core.management import call_command
+from PIL import Image
+from rest_framework.test import APIClient
+
+from media_library import storage
+from media_library.models import MediaFile, UploadSession
+from motorcycles.models import Motorcycle, MotorcycleImage
+from utils.file_cleanup import CleanupTask, cleanup_worker
+
+
+class PresigningStorage(InMemoryStorage):
+    """Stockage sans chemin local qui signe ses URLs d'upload, comme un bucket"""
+
+    def __init__(self, **options):
+        # settings.STORAGES modifié en test ne transmet pas OPTIONS (compatibilité DEFAULT_FILE_STORAGE)
+        options.setdefault('base_url', 'https://cdn.example.com/')
+        super().__init__(**options)
+
+    def path(self, name):
+        raise NotImplementedError('Pas de chemin local')
+
+    def _relative_path(self, name):
+        return os.path.relpath(super().path(name), self.location)
+
+    def presigned_put_url(self, name, content_type, expires_in):
+        return f'https://bucket.example.com/{name}?signature=test&expires={expires_in}'
+
+
+@pytest.fixture
+def object_storage(settings):
+    settings.STORAGES = {
+        'default': {'BACKEND': 'media_library.test_storage.PresigningStorage'},
+        'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    }
+    assert not storage.is_local()
+    return default_storage
+
+
+@pytest.fixture
+def client():
+    admin = get_user_model().objects.create_user('admin', 'admin@example.com', 'Secret123!', is_staff=True)
+    client = APIClient()
+    client.force_authenticate(admin)
+    return client
+
+
+@pytest.fixture
+def moto():
+    return Motorcycle.objects.create(
+        brand='Yamaha', model='MT-07', year=2020, price='6990.00', mileage=0, engine='689cc',
+        power=73, license='A2', color='Noir', description='Test',
+    )
+
+
+def _jpeg():
+    buffer = io.BytesIO()
+    Image.new('RGB', (64, 48), (10, 120, 200)).save(buffer, 'JPEG')
+    return buffer.getvalue()
+
+
+@pytest.mark.django_db
+def test_direct_upload_to_object_storage(client, moto, object_storage):
+    payload = _jpeg()
+    response = client.post('/api/uploads/presign/', {
+        'target': 'motorcycles', 'object_id': moto.pk, 'filename': 'photo.JPG', 'size': len(payload),
+    }, format='json')
+    assert response.status_code == 201
+    body = response.json()
+    session = UploadSession.objects.get(pk=body['session']['id'])
+    assert session.direct and session.path.startswith(f'motorcycles/{moto.pk}/')
+    assert body['upload']['method'] == 'PUT'
+    assert body['upload']['url'].startswith(f'https://bucket.example.com/{session.path}?')
+    assert body['upload']['headers'] == {'Content-Type': 'image/jpeg'}
+    # Aucun fichier réservé : le navigateur l'envoie lui-même
+    assert not object_storage.exists(session.path)
+
+    # Fichier absent ou incomplet : 409
+    assert client.post(f'/api/uploads/{session.pk}/finalize/').status_code == 409
+    # Non servi tant que la session n'est pas finalisée
+    object_storage.save(session.path, ContentFile(payload))
+    assert client.get(f'/media/{session.path}').status_code == 404
+
+    finalized = client.post(f'/api/uploads/{session.pk}/finalize/')
+    assert finalized.status_code == 201
+    image = MotorcycleImage.objects.get(motorcycle=moto)
+    assert image.image == session.path
+    assert (image.width, image.height, image.mime_type) == (64, 48, 'image/jpeg')
+
+    served = client.get(f'/media/{session.path}')
+    assert served.status_code == 302
+    assert served['Location'] == f'https://cdn.example.com/{session.path}'
+
+
+@pytest.mark.django_db
+def test_presign_requires_object_storage(client, moto, settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    response = client.post('/api/uploads/presign/', {
+        'target': 'motorcycles', 'object_id': moto.pk, 'filename': 'photo.jpg', 'size': 10,
+    }, format='json')
+    assert response.status_code == 501
+    assert not UploadSession.objects.exists()
+
+    # Type de contenu refusé
+    assert client.post('/api/uploads/presign/', {
+        'target': 'motorcycles', 'object_id': moto.pk, 'filename': 'photo.jpg', 'size': 10, 'content_type': 'text/html',
+    }, format='json').status_code == 400
+
+
+@pytest.mark.django_db
+def test_cleanup_goes_through_the_storage(object_storage):
+    for name in ('motorcycles/7/a.jpg', 'motorcycles/7/variants/a-480.webp', 'motorcycles/8/b.jpg'):
+        object_storage.save(name, ContentFile(b'image'))
+
+    summary = cleanup_worker.process([
+        CleanupTask('directory', 'motorcycles/7'),
+        CleanupTask('file', 'motorcycles/8/b.jpg'),
+        CleanupTask('file', 'motorcycles/8/b.jpg'),
+    ], retry=False)
+    assert summary == {'deleted': 2, 'missing': 1, 'kept': 0, 'retried': 0, 'failed': 0}
+    assert not object_storage.exists('motorcycles/7/a.jpg')
+    assert not object_storage.exists('motorcycles/7/variants/a-480.webp')
+    assert not object_storage.exists('motorcycles/8/b.jpg')
+
+
+@pytest.mark.django_db
+def test_manifest_rebuild_reads_object_storage(moto, object_storage, settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    key = object_storage.save(f'motorcycles/{moto.pk}/photo.jpg', ContentFile(b'image'))
+    orphan = object_storage.save(f'motorcycles/{moto.pk}/orphan.jpg', ContentFile(b'orphan'))
+    MotorcycleImage.objects.create(motorcycle=moto, image=key)
+    MediaFile.objects.all().delete()
+
+    call_command('rebuild_media_manifest', '--type', 'motorcycles', stdout=io.StringIO())
+    entry = MediaFile.objects.get(path=key)
+    assert (entry.size, entry.present, entry.linked) == (5, True, True)
+    assert entry.sha256 == hashlib.sha256(b'image').hexdigest()
+    assert MediaFile.objects.get(path=orphan).linked is False
+
+
+@pytest.mark.django_db
+def test_s3_presigned_put(settings):
+    moto_server = pytest.importorskip('moto')
+    pytest.importorskip('storages.backends.s3')
+    import boto3
+
+    with moto_server.mock_aws():
+        boto3.client('s3', region_name='us-east-1').create_bucket(Bucket='media')
+        settings.AWS_STORAGE_BUCKET_NAME = 'media'
+        settings.AWS_S3_REGION_NAME = 'us-east-1'
+        settings.AWS_S3_ACCESS_KEY_ID = settings.AWS_S3_SECRET_ACCESS_KEY = 'test'
+        settings.STORAGES = {
+            'default': {'BACKEND': 'storages.backends.s3.S3Storage'},
+            'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+        }
+        assert not storage.is_local()
+        url = storage.presigned_put('motorcycles/1/photo.jpg', 'image/jpeg', expires_in=60)
+        assert 'motorcycles/1/photo.jpg' in url and 'Signature' in url
+
+        # Le navigateur envoie le fichier à l'URL signée ; le backend le voit ensuite
+        requests = pytest.importorskip('requests')
+        assert requests.put(url, data=b'jpeg', headers={'Content-Type': 'image/jpeg'}).status_code == 200
+        assert storage.stored_size('motorcycles/1/photo.jpg') == 4
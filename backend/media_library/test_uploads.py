@@ -0,0 +1,103 @@
+import io
+import os
+
+import pytest
+from django.contrib.auth import get_user_model
+from PIL import Image
+from rest_framework.test import APIClient
+
+from media_library.models import UploadSession
+from motorcycles.models import Motorcycle, MotorcycleImage
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def client():
+    admin = get_user_model().objects.create_user('admin', 'admin@example.com', 'Secret123!', is_staff=True)
+    client = APIClient()
+    client.force_authenticate(admin)
+    return client
+
+
+@pytest.fixture
+def moto():
+    return Motorcycle.objects.create(
+        brand='Yamaha', model='MT-07', year=2020, price='6990.00', mileage=0, engine='689cc',
+        power=73, license='A2', color='Noir', description='Test',
+    )
+
+
+def _jpeg():
+    buffer = io.BytesIO()
+    Image.new('RGB', (64, 48), (10, 120, 200)).save(buffer, 'JPEG')
+    return buffer.getvalue()
+
+
+def _put(client, session_id, data, start, total):
+    return client.generic(
+        'PUT', f'/api/uploads/{session_id}/', data, content_type='application/octet-stream',
+        HTTP_CONTENT_RANGE=f'bytes {start}-{start + len(data) - 1}/{total}',
+    )
+
+
+@pytest.mark.django_db
+def test_chunked_upload_resumes_and_attaches_image(client, moto, media_root):
+    payload = _jpeg()
+    created = client.post('/api/uploads/', {
+        'target': 'motorcycles', 'object_id': moto.pk, 'filename': 'photo.JPG', 'size': len(payload),
+    }, format='json')
+    assert created.status_code == 201
+    session_id = created.json()['id']
+    session = UploadSession.objects.get(pk=session_id)
+    assert session.path.startswith(f'motorcycles/{moto.pk}/') and session.path.endswith('.jpg')
+
+    half = len(payload) // 2
+    assert _put(client, session_id, payload[:half], 0, len(payload)).json()['offset'] == half
+
+    # Fragment rejoué à un mauvais offset : 409 avec l'offset de reprise
+    replay = _put(client, session_id, payload[:half], 0, len(payload))
+    assert replay.status_code == 409 and replay.json()['offset'] == half
+
+    early = client.post(f'/api/uploads/{session_id}/finalize/')
+    assert early.status_code == 409
+
+    assert client.get(f'/api/uploads/{session_id}/').json()['offset'] == half
+    assert _put(client, session_id, payload[half:], half, len(payload)).status_code == 200
+
+    finalized = client.post(f'/api/uploads/{session_id}/finalize/')
+    assert finalized.status_code == 201
+    image = MotorcycleImage.objects.get(motorcycle=moto)
+    assert image.image == session.path
+    assert finalized.json()['result']['id'] == image.pk
+    with open(os.path.join(media_root, session.path), 'rb') as stored:
+        assert stored.read() == payload
+
+    assert client.post(f'/api/uploads/{session_id}/finalize/').status_code == 409
+
+
+@pytest.mark.django_db
+def test_upload_session_validation_and_abort(client, moto, media_root):
+    assert client.post('/api/uploads/', {
+        'target': 'motorcycles', 'object_id': moto.pk, 'filename': 'script.php', 'size': 10,
+    }, format='json').status_code == 400
+    assert client.post('/api/uploads/', {
+        'target': 'parts', 'object_id': 999999, 'filename': 'a.jpg', 'size': 10,
+    }, format='json').status_code == 400
+    assert APIClient().post('/api/uploads/', {}, format='json').status_code == 401
+
+    session_id = client.post('/api/uploads/', {
+        'target': 'motorcycles', 'object_id': moto.pk, 'filename': 'a.jpg', 'size': 10,
+    }, format='json').json()['id']
+    path = os.path.join(media_root, UploadSession.objects.get(pk=session_id).path)
+    assert os.path.exists(path)
+
+    bad_range = client.generic('PUT', f'/api/uploads/{session_id}/', b'abc', content_type='application/octet-stream')
+    assert bad_range.status_code == 400
+
+    assert client.delete(f'/api/uploads/{session_id}/').status_code == 204
+    assert not os.path.exists(path)
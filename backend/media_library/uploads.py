@@ -0,0 +1,132 @@
+"""Uploads fragmentés : cibles, écriture des fragments et rattachement final"""
+import os
+import re
+import uuid
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+from agde_moto.image_variants import describe_image
+
+from .blobs import adopt_file
+from .keys import key_url
+
+ALLOWED_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp', '.gif', '.avif', '.heic'}
+UPLOAD_MAX_SIZE = getattr(settings, 'UPLOAD_MAX_SIZE', 100 * 1024 * 1024)
+CHUNK_MAX_SIZE = getattr(settings, 'UPLOAD_CHUNK_MAX_SIZE', 16 * 1024 * 1024)
+STREAM_BLOCK_SIZE = 64 * 1024
+
+_CONTENT_RANGE = re.compile(r'^bytes (\d+)-(\d+)/(\d+)$')
+
+
+class ChunkError(Exception):
+    """Fragment refusé ; `status` est le code HTTP à renvoyer"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def _attach_motorcycle_image(motorcycle, key, metadata):
+    from motorcycles.models import MotorcycleImage
+    from motorcycles.serializers import MotorcycleImageSerializer
+
+    image = MotorcycleImage.objects.create(motorcycle=motorcycle, image=key, **metadata)
+    return MotorcycleImageSerializer(image).data
+
+
+def _attach_part_image(part, key, metadata):
+    from parts.models import PartImage
+    from parts.serializers import PartImageSerializer
+
+    image = PartImage.objects.create(part=part, image=key, **metadata)
+    return PartImageSerializer(image).data
+
+
+def _attach_post_image(post, key, metadata):
+    post.image = key
+    post.save()
+    return {'image': key_url(key)}
+
+
+# cible -> (modèle propriétaire, rattachement du fichier terminé)
+UPLOAD_TARGETS = {
+    'motorcycles': ('motorcycles.Motorcycle', _attach_motorcycle_image),
+    'parts': ('parts.Part', _attach_part_image),
+    'blog': ('blog.Post', _attach_post_image),
+}
+
+
+def get_owner(target, object_id):
+    model_label, _ = UPLOAD_TARGETS[target]
+    return apps.get_model(model_label)._default_manager.filter(pk=object_id).first()
+
+
+def new_path(target, object_id, filename):
+    """Nom définitif unique `<cible>/<id>/<uuid4><ext>`"""
+    extension = os.path.splitext(filename)[1].lower()
+    return f'{target}/{object_id}/{uuid.uuid4()}{extension}'
+
+
+def reserve_path(target, object_id, filename):
+    """Réserve le nom définitif (fichier vide) sous `<cible>/<id>/`"""
+    return default_storage.save(new_path(target, object_id, filename), ContentFile(b''))
+
+
+def parse_content_range(header, size):
+    """`bytes <début>-<fin>/<total>` -> (début, longueur)"""
+    match = _CONTENT_RANGE.match(header or '')
+    if not match:
+        raise ChunkError('En-tête Content-Range manquant ou invalide')
+    start, end, total = (int(group) for group in match.groups())
+    if total != size or end < start or end >= size:
+        raise ChunkError('Content-Range incohérent avec la taille annoncée')
+    length = end - start + 1
+    if length > CHUNK_MAX_SIZE:
+        raise ChunkError('Fragment trop volumineux', status=413)
+    return start, length
+
+
+def write_chunk(session, stream, start, length):
+    """
+    Écrit le fragment directement à sa position dans le fichier définitif,
+    par blocs, sans passer par un fichier temporaire. Retourne le nombre
+    d'octets reçus : une connexion coupée en cours de fragment conserve ce
+    qui est arrivé et le client reprend à partir du nouvel offset.
+    """
+    if start != session.offset:
+        raise ChunkError(f'Offset attendu : {session.offset}', status=409)
+    try:
+        path = default_storage.path(session.path)
+    except NotImplementedError:
+        raise ChunkError("Stockage sans accès fichier : upload fragmenté indisponible", status=501)
+
+    written = 0
+    with open(path, 'r+b') as destination:
+        destination.seek(start)
+        while written < length:
+            block = stream.read(min(STREAM_BLOCK_SIZE, length - written))
+            if not block:
+                break
+            destination.write(block)
+            written += len(block)
+    return written
+
+
+def attach(session):
+    """Rattache le fichier terminé à son objet ; retourne la représentation créée"""
+    _, attach_file = UPLOAD_TARGETS[session.target]
+    owner = get_owner(session.target, session.object_id)
+    if owner is None:
+        return None
+    # En mode adressé par contenu, le fichier rejoint (ou devient) un blob
+    path = adopt_file(session.path)
+    return attach_file(owner, path, describe_image(path))
+
+
+def discard(session):
+    """Supprime le fichier partiel d'une session abandonnée"""
+    if default_storage.exists(session.path):
+        default_storage.delete(session.path)
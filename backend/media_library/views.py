@@ -0,0 +1,146 @@
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.http import Http404, HttpResponseRedirect
+from django.views.decorators.http import require_safe
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from .models import UploadSession
+from .serializers import PresignSerializer, UploadSessionSerializer
+from . import serving, storage
+from .uploads import ChunkError, attach, discard, new_path, parse_content_range, reserve_path, write_chunk
+
+
+class UploadSessionViewSet(mixins.CreateModelMixin,
+                           mixins.RetrieveModelMixin,
+                           mixins.DestroyModelMixin,
+                           viewsets.GenericViewSet):
+    """
+    Upload fragmenté et reprenable.
+
+    1. POST /api/uploads/ {target, object_id, filename, size} : session et
+       nom définitif réservé sous `<target>/<object_id>/`
+    2. PUT /api/uploads/<id>/ avec `Content-Range: bytes <début>-<fin>/<taille>`
+       et le fragment brut en corps ; GET /api/uploads/<id>/ donne l'offset
+       à partir duquel reprendre
+    3. POST /api/uploads/<id>/finalize/ : rattache l'image à son objet
+    DELETE /api/uploads/<id>/ abandonne la session et son fichier partiel.
+
+    Avec un stockage objet, POST /api/uploads/presign/ remplace les étapes
+    1 et 2 : le navigateur envoie le fichier en un PUT sur l'URL signée
+    retournée, sans passer par l'API, puis appelle finalize.
+    """
+    serializer_class = UploadSessionSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return UploadSession.objects.filter(created_by=self.request.user)
+
+    def perform_create(self, serializer):
+        data = serializer.validated_data
+        serializer.save(
+            created_by=self.request.user,
+            path=reserve_path(data['target'], data['object_id'], data['filename']),
+        )
+
+    def update(self, request, *args, **kwargs):
+        """Écrit un fragment à son offset"""
+        with transaction.atomic():
+            session = self.get_locked_session()
+            if session.is_complete:
+                return Response({'error': 'Session déjà finalisée'}, status=status.HTTP_409_CONFLICT)
+            if session.direct:
+                return Response({'error': 'Session d\'upload direct'}, status=status.HTTP_409_CONFLICT)
+            try:
+                start, length = parse_content_range(request.META.get('HTTP_CONTENT_RANGE'), session.size)
+                written = write_chunk(session, request.stream, start, length)
+            except ChunkError as exc:
+                return Response({'error': str(exc), 'offset': session.offset}, status=exc.status)
+            session.offset += written
+            session.save(update_fields=['offset', 'updated_at'])
+        return Response(self.get_serializer(session).data)
+
+    @action(detail=False, methods=['post'])
+    def presign(self, request):
+        """Session d'upload direct : réserve une clé et signe un PUT vers le stockage"""
+        serializer = PresignSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        content_type = data.pop('content_type')
+        path = new_path(data['target'], data['object_id'], data['filename'])
+        try:
+            url = storage.presigned_put(path, content_type)
+        except storage.PresignUnsupported as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_501_NOT_IMPLEMENTED)
+        session = UploadSession.objects.create(created_by=request.user, path=path, direct=True, **data)
+        return Response(
+            {
+                'session': self.get_serializer(session).data,
+                'upload': {
+                    'url': url,
+                    'method': 'PUT',
+                    'headers': {'Content-Type': content_type},
+                    'expires_in': storage.PRESIGNED_URL_EXPIRY,
+                },
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+    def perform_destroy(self, instance):
+        if not instance.is_complete:
+            discard(instance)
+        instance.delete()
+
+    @action(detail=True, methods=['post'])
+    def finalize(self, request, pk=None):
+        """Rattache le fichier complet à sa moto, sa pièce ou son article"""
+        with transaction.atomic():
+            session = self.get_locked_session()
+            if session.is_complete:
+                return Response({'error': 'Session déjà finalisée'}, status=status.HTTP_409_CONFLICT)
+            if session.direct:
+                # Le fichier a été envoyé au stockage sans passer par l'API
+                session.offset = storage.stored_size(session.path) or 0
+            if session.offset != session.size:
+                return Response(
+                    {'error': 'Fichier incomplet', 'offset': session.offset, 'size': session.size},
+                    status=status.HTTP_409_CONFLICT,
+                )
+            result = attach(session)
+            if result is None:
+                return Response({'error': 'Objet introuvable'}, status=status.HTTP_404_NOT_FOUND)
+            session.status = UploadSession.STATUS_COMPLETE
+            session.save(update_fields=['status', 'offset', 'updated_at'])
+        return Response(
+            {'session': self.get_serializer(session).data, 'result': result},
+            status=status.HTTP_201_CREATED,
+        )
+
+    def get_locked_session(self):
+        session = self.get_queryset().select_for_update().filter(pk=self.kwargs['pk']).first()
+        if session is None:
+            raise NotFound()
+        return session
+
+
+@require_safe
+def serve_media(request, path):
+    """
+    Fichiers média : en production, la réponse ne porte que l'en-tête
+    `X-Accel-Redirect` et nginx envoie le fichier (sendfile) depuis son
+    emplacement interne ; en développement, Django sert le fichier avec
+    prise en charge de Range. Avec un stockage objet, redirection vers
+    l'URL du fichier dans le bucket (ou son CDN). Les fichiers d'uploads
+    non finalisés ne sont jamais servis.
+    """
+    path = serving.normalize_media_path(path)
+    if UploadSession.objects.filter(path=path, status=UploadSession.STATUS_PENDING).exists():
+        raise Http404('Fichier introuvable')
+    if not storage.is_local():
+        return HttpResponseRedirect(default_storage.url(path))
+    if serving.ACCEL_REDIRECT_PREFIX:
+        return serving.accel_response(path)
+    return serving.file_response(request, path)
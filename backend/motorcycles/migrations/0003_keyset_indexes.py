@@ -0,0 +1,29 @@
+# Generated by Django 5.0.3 on 2026-10-18 16:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('motorcycles', '0002_alter_motorcycleimage_image'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='motorcycle',
+            index=models.Index(fields=['created_at', 'id'], name='moto_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='motorcycle',
+            index=models.Index(fields=['price', 'id'], name='moto_price_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='motorcycle',
+            index=models.Index(fields=['year', 'id'], name='moto_year_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='motorcycle',
+            index=models.Index(fields=['mileage', 'id'], name='moto_mileage_id_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.0.3 on 2026-10-18 16:46
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    """Index GIN et remplissage initial du tsvector (PostgreSQL uniquement)"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS moto_search_vector_gin ON motorcycles_motorcycle USING gin (search_vector)"
+    )
+    schema_editor.execute("""
+        UPDATE motorcycles_motorcycle SET search_vector =
+        setweight(to_tsvector('french', coalesce(brand, '')), 'A')
+        || setweight(to_tsvector('french', coalesce(model, '')), 'A')
+        || setweight(to_tsvector('french', coalesce(description, '')), 'B')
+    """)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS moto_search_vector_gin")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('motorcycles', '0003_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='motorcycle',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,32 @@
+from django.db import migrations
+
+
+def create_trigram_indexes(apps, schema_editor):
+    """Extension pg_trgm et index GIN trigrammes (PostgreSQL uniquement)"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS moto_brand_trgm ON motorcycles_motorcycle USING gin (brand gin_trgm_ops)"
+    )
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS moto_model_trgm ON motorcycles_motorcycle USING gin (model gin_trgm_ops)"
+    )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS moto_brand_trgm")
+    schema_editor.execute("DROP INDEX IF EXISTS moto_model_trgm")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('motorcycles', '0004_search_vector'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.0.3 on 2026-10-18 17:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Min, OuterRef, Subquery
+
+
+def dedupe_primary_images(apps, schema_editor):
+    """Une seule image principale par moto : la plus ancienne est gardée"""
+    MotorcycleImage = apps.get_model('motorcycles', 'MotorcycleImage')
+    duplicates = (
+        MotorcycleImage.objects.filter(is_primary=True).values('motorcycle')
+        .annotate(count=Count('id'), keep=Min('id')).filter(count__gt=1)
+    )
+    for row in duplicates.iterator():
+        MotorcycleImage.objects.filter(motorcycle=row['motorcycle'], is_primary=True).exclude(pk=row['keep']).update(is_primary=False)
+
+
+def fill_primary_image(apps, schema_editor):
+    """Image des cartes : la principale, sinon la plus ancienne"""
+    Motorcycle = apps.get_model('motorcycles', 'Motorcycle')
+    MotorcycleImage = apps.get_model('motorcycles', 'MotorcycleImage')
+    first = MotorcycleImage.objects.filter(motorcycle=OuterRef('pk')).order_by('-is_primary', 'id').values('pk')[:1]
+    Motorcycle.objects.update(primary_image=Subquery(first))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('motorcycles', '0007_image_metadata'),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe_primary_images, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='motorcycleimage',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_primary', True)), fields=('motorcycle',), name='moto_single_primary_image'),
+        ),
+        migrations.AddField(
+            model_name='motorcycle',
+            name='primary_image',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='motorcycles.motorcycleimage'),
+        ),
+        migrations.RunPython(fill_primary_image, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.0.3 on 2026-10-18 17:25
+
+import media_library.keys
+from django.db import migrations
+from media_library.keys import canonicalize_rows
+
+
+def image_storage_keys(apps, schema_editor):
+    """URLs stockées (/media/..., http://<hôte>/media/...) -> clés de stockage, par lots"""
+    canonicalize_rows(apps.get_model('motorcycles', 'MotorcycleImage'), 'image', 'variants')
+
+
+class Migration(migrations.Migration):
+    # Chaque lot est validé séparément : relancée, la migration reprend où elle s'est arrêtée
+    atomic = False
+
+    dependencies = [
+        ('motorcycles', '0008_primary_image'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='motorcycleimage',
+            name='image',
+            field=media_library.keys.MediaKeyField(max_length=500),
+        ),
+        migrations.RunPython(image_storage_keys, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,8 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 
+from media_library.keys import MediaKeyField
+
 class Motorcycle(models.Model):
     brand = models.CharField(max_length=100)
     model = models.CharField(max_length=100)
@@ -16,18 +19,51 @@ class Motorcycle(models.Model):
     is_featured = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # tsvector pondéré (index GIN créé par migration, PostgreSQL uniquement)
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Image des cartes (la principale, sinon la plus ancienne), tenue à jour par les signaux
+    primary_image = models.ForeignKey(
+        'MotorcycleImage', null=True, blank=True, on_delete=models.SET_NULL, related_name='+', editable=False,
+    )
+
+    search_vector_weights = (('brand', 'A'), ('model', 'A'), ('description', 'B'))
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Index composites pour la pagination par curseur (champ de tri, id)
+            models.Index(fields=['created_at', 'id'], name='moto_created_id_idx'),
+            models.Index(fields=['price', 'id'], name='moto_price_id_idx'),
+            models.Index(fields=['year', 'id'], name='moto_year_id_idx'),
+            models.Index(fields=['mileage', 'id'], name='moto_mileage_id_idx'),
+        ]
 
     def __str__(self):
         return f"{self.brand} {self.model} ({self.year})"
 
 class MotorcycleImage(models.Model):
     motorcycle = models.ForeignKey(Motorcycle, on_delete=models.CASCADE, related_name='images')
-    image = models.URLField(max_length=500)
+    # Clé de stockage (`motorcycles/<id>/<uuid>.jpg`) ou URL externe
+    image = MediaKeyField(max_length=500)
     is_primary = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Variantes redimensionnées générées après l'upload (agde_moto.image_variants)
+    variants = models.JSONField(default=dict, blank=True, editable=False)
+    # Relevés à l'upload (agde_moto.image_variants.describe_image)
+    width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    file_size = models.PositiveBigIntegerField(null=True, blank=True, editable=False)
+    mime_type = models.CharField(max_length=50, blank=True, editable=False)
+    # Aperçu flou (data URI WebP de quelques centaines d'octets)
+    placeholder = models.TextField(blank=True, editable=False)
+
+    class Meta:
+        constraints = [
+            # Une seule image principale par moto
+            models.UniqueConstraint(
+                fields=['motorcycle'], condition=models.Q(is_primary=True), name='moto_single_primary_image',
+            ),
+        ]
     
     def __str__(self):
         return f"Image for {self.motorcycle.brand} {self.motorcycle.model}"
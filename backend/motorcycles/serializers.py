@@ -1,22 +1,38 @@
 from rest_framework import serializers
+from agde_moto.fieldsets import SparseFieldsetMixin
+from agde_moto.image_variants import SrcsetField
+from media_library.keys import MediaUrlField
 from .models import Motorcycle, MotorcycleImage
 
 class MotorcycleImageSerializer(serializers.ModelSerializer):
     """Serializer pour les images de motos"""
+    image = MediaUrlField()
+    srcset = SrcsetField()
     
     class Meta:
         model = MotorcycleImage
-        fields = ['id', 'image', 'is_primary', 'created_at']
+        fields = [
+            'id', 'image', 'is_primary', 'created_at', 'srcset',
+            'width', 'height', 'file_size', 'mime_type', 'placeholder',
+        ]
 
-class MotorcycleSerializer(serializers.ModelSerializer):
-    """Serializer pour les motos"""
+class MotorcycleSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    """Serializer pour les motos (champs à la demande, vue carte)"""
     images = MotorcycleImageSerializer(many=True, read_only=True)
+    # Clé étrangère dénormalisée : une jointure, sans charger `images`
+    primary_image = MotorcycleImageSerializer(read_only=True)
+    optional_fields = ('primary_image',)
     
     class Meta:
         model = Motorcycle
         fields = [
             'id', 'brand', 'model', 'year', 'price', 'mileage',
             'engine', 'power', 'license', 'color', 'description',
-            'is_sold', 'is_new', 'is_featured', 'created_at', 'updated_at', 'images'
+            'is_sold', 'is_new', 'is_featured', 'created_at', 'updated_at', 'images',
+            'primary_image',
+        ]
+        card_fields = [
+            'id', 'brand', 'model', 'year', 'price', 'mileage', 'license',
+            'is_sold', 'is_new', 'primary_image',
         ]
         read_only_fields = ['created_at', 'updated_at']
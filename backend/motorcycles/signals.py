@@ -1,7 +1,13 @@
-from django.db.models.signals import post_delete
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
+from django.utils import timezone
 from .models import Motorcycle, MotorcycleImage
 from utils.file_cleanup import delete_file_from_url, delete_directory
+from agde_moto.image_variants import schedule_variants, variant_keys
+from agde_moto.primary_images import demote_other_primaries, refresh_primary_image
+from agde_moto.response_cache import bump_generation
+from agde_moto.search import refresh_search_vector
+from media_library.manifest import forget_media, forget_owner, record_media
 
 @receiver(post_delete, sender=MotorcycleImage)
 def delete_motorcycle_image_file(sender, instance, **kwargs):
@@ -10,6 +16,9 @@ def delete_motorcycle_image_file(sender, instance, **kwargs):
     """
     if instance.image:
         delete_file_from_url(instance.image)
+    for key in variant_keys(instance.variants):
+        delete_file_from_url(key)
+    forget_media('motorcycles', instance.motorcycle_id, [instance.image, *variant_keys(instance.variants)])
 
 @receiver(post_delete, sender=Motorcycle)
 def delete_motorcycle_directory(sender, instance, **kwargs):
@@ -19,3 +28,75 @@ def delete_motorcycle_directory(sender, instance, **kwargs):
     """
     directory = f"motorcycles/{instance.id}"
     delete_directory(directory)
+    forget_owner('motorcycles', instance.id)
+
+@receiver(post_save, sender=Motorcycle)
+def update_motorcycle_search_vector(sender, instance, update_fields=None, **kwargs):
+    """
+    Keeps the weighted full-text vector in sync with the indexed fields.
+    """
+    indexed = {name for name, _ in Motorcycle.search_vector_weights}
+    if update_fields is None or indexed & set(update_fields):
+        refresh_search_vector(instance)
+
+@receiver([post_save, post_delete], sender=Motorcycle)
+@receiver(post_delete, sender=MotorcycleImage)
+def bump_motorcycle_cache_generation(sender, **kwargs):
+    """
+    Invalidates cached public responses that depend on this model.
+    """
+    bump_generation(sender)
+
+@receiver(post_delete, sender=MotorcycleImage)
+def touch_motorcycle_on_image_delete(sender, instance, **kwargs):
+    """
+    Bumps the motorcycle's updated_at so its ETag / Last-Modified change.
+    """
+    Motorcycle.objects.filter(pk=instance.motorcycle_id).update(updated_at=timezone.now())
+
+def motorcycle_images_saved(images, created=True, update_fields=None):
+    """
+    Side effects of saving images of one motorcycle, shared by the post_save
+    receiver and bulk inserts (media_library.ingest), so both stay in sync:
+    the motorcycle's updated_at is bumped (ETag / Last-Modified), cached
+    responses are invalidated, the card image is refreshed, the files are
+    recorded in the media manifest and resized variants are queued.
+    Add new post_save side effects here, not in a separate receiver.
+    """
+    motorcycle_id = images[0].motorcycle_id
+    Motorcycle.objects.filter(pk=motorcycle_id).update(updated_at=timezone.now())
+    bump_generation(MotorcycleImage)
+    if created or update_fields is None or 'is_primary' in update_fields:
+        refresh_primary_image(images[0], 'motorcycle')
+    if update_fields is None or {'image', 'variants'} & set(update_fields):
+        record_media('motorcycles', motorcycle_id, [
+            key for image in images for key in (image.image, *variant_keys(image.variants))
+        ])
+    for image in images:
+        schedule_variants(image)
+
+@receiver(post_save, sender=MotorcycleImage)
+def motorcycle_image_saved(sender, instance, raw=False, created=False, update_fields=None, **kwargs):
+    """
+    Applies motorcycle_images_saved to a single saved image.
+    """
+    if raw:
+        bump_generation(sender)
+        return
+    motorcycle_images_saved([instance], created=created, update_fields=update_fields)
+
+@receiver(pre_save, sender=MotorcycleImage)
+def demote_other_motorcycle_primary_images(sender, instance, raw=False, **kwargs):
+    """
+    Keeps a single primary image per motorcycle (enforced by a partial unique constraint).
+    """
+    if raw:
+        return
+    demote_other_primaries(instance, 'motorcycle')
+
+@receiver(post_delete, sender=MotorcycleImage)
+def refresh_motorcycle_primary_image(sender, instance, **kwargs):
+    """
+    Keeps the denormalized Motorcycle.primary_image pointing at the card image.
+    """
+    refresh_primary_image(instance, 'motorcycle')
@@ -0,0 +1,48 @@
+import pytest
+from rest_framework.test import APIClient
+
+from agde_moto.testing import assert_constant_queries, assert_max_queries
+from .models import Motorcycle, MotorcycleImage
+
+
+def _create_motorcycles(count, images_per_bike=3):
+    for i in range(count):
+        moto = Motorcycle.objects.create(
+            brand='Yamaha', model=f'MT-{i:02d}', year=2020, price='7490.00',
+            mileage=1000 * i, engine='689cc', power=73, license='A2',
+            color='Noir', description='Moto de test',
+        )
+        for j in range(images_per_bike):
+            MotorcycleImage.objects.create(
+                motorcycle=moto, image=f'/media/motorcycles/{moto.id}/{j}.jpg', is_primary=(j == 0)
+            )
+
+
+# Budget : validateurs ETag (1 agrégat), lignes, images préchargées
+@pytest.mark.django_db
+def test_motorcycle_list_query_count_is_constant(django_capture_on_commit_callbacks):
+    client = APIClient()
+    _create_motorcycles(2)
+
+    def fetch():
+        response = client.get('/api/motorcycles/')
+        assert response.status_code == 200
+
+    def grow():
+        # Données validées : les générations du cache sont incrémentées au commit
+        with django_capture_on_commit_callbacks(execute=True):
+            _create_motorcycles(20)
+
+    assert_constant_queries(fetch, grow=grow, budget=3)
+
+
+@pytest.mark.django_db
+def test_motorcycle_featured_and_retrieve_budget():
+    client = APIClient()
+    _create_motorcycles(10)
+    moto = Motorcycle.objects.first()
+
+    with assert_max_queries(3):
+        assert client.get('/api/motorcycles/featured/').status_code == 200
+    with assert_max_queries(3):
+        assert client.get(f'/api/motorcycles/{moto.id}/').status_code == 200
@@ -1,95 +1,137 @@
-from rest_framework import viewsets, filters, status
+from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
+from agde_moto.conditional import conditional_detail, conditional_list
+from agde_moto.facets import Facet, RangeFacet, cached_facets
+from agde_moto.fastlist import FastListMixin, fast_rows_supported
+from agde_moto.fieldsets import SparseQuerysetMixin
+from agde_moto.pagination import KeysetPagination
+from agde_moto import primary_images
+from agde_moto.response_cache import cache_response
+from agde_moto.search import FullTextSearchFilter, RankedOrderingFilter, TrigramSearchFilter
+from media_library.ingest import ingest_images, upload_response
+from media_library.manifest import owner_manifest
 from .models import Motorcycle, MotorcycleImage
 from .serializers import MotorcycleSerializer, MotorcycleImageSerializer
-from django.conf import settings
-import os
-from urllib.parse import quote
+from .signals import motorcycle_images_saved
 
-class MotorcycleViewSet(viewsets.ModelViewSet):
+PRICE_BANDS = [(None, 3000), (3000, 6000), (6000, 10000), (10000, 15000), (15000, None)]
+
+class MotorcycleViewSet(SparseQuerysetMixin, FastListMixin, viewsets.ModelViewSet):
     """ViewSet pour les motos avec CRUD complet"""
-    queryset = Motorcycle.objects.all()
+    queryset = Motorcycle.objects.prefetch_related('images')
     serializer_class = MotorcycleSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['brand', 'year', 'license', 'is_sold']
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter, TrigramSearchFilter, RankedOrderingFilter]
+    filterset_fields = {
+        'brand': ['exact'],
+        'year': ['exact'],
+        'license': ['exact'],
+        'is_sold': ['exact'],
+        'is_new': ['exact'],
+        'price': ['gte', 'lt'],  # tranches de prix des facettes
+    }
     search_fields = ['brand', 'model', 'description']
+    fuzzy_fields = ['brand', 'model']
     ordering_fields = ['price', 'year', 'mileage', 'created_at']
     ordering = ['-created_at']
+    pagination_class = KeysetPagination
+    cache_dependencies = [Motorcycle, MotorcycleImage]
+    facet_definitions = [
+        Facet('brand', 'brand'),
+        Facet('year', 'year'),
+        Facet('license', 'license'),
+        Facet('condition', 'is_new', labels={True: 'Neuf', False: 'Occasion'}),
+        RangeFacet('price', 'price', PRICE_BANDS),
+    ]
     
     def get_permissions(self):
         """Permissions personnalisées selon l'action"""
-        if self.action in ['list', 'retrieve', 'featured', 'list_images']:
+        if self.action in ['list', 'retrieve', 'featured', 'facets', 'compatible_parts']:
             # Lecture publique autorisée
             permission_classes = [AllowAny]
+        elif self.action == 'list_images':
+            # Empreintes, orphelins et fichiers manquants : réservé à l'équipe
+            permission_classes = [IsAdminUser]
         else:
             # Écriture nécessite une authentification
             permission_classes = [IsAuthenticated]
         return [permission() for permission in permission_classes]
     
+    @cache_response
+    @conditional_list
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @conditional_detail
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
     @action(detail=False, methods=['get'])
+    @cache_response
+    @conditional_list
     def featured(self, request):
         """Motos à la une"""
-        featured_motos = self.queryset.filter(is_sold=False)[:6]
+        if fast_rows_supported(self, request):
+            builder = self.get_row_builder()
+            return Response(builder.build(builder.values(self.get_queryset().filter(is_sold=False))[:6]))
+        featured_motos = self.apply_fieldset(self.get_queryset().filter(is_sold=False))[:6]
         serializer = self.get_serializer(featured_motos, many=True)
         return Response(serializer.data)
+
+    @action(detail=False, methods=['get'])
+    def facets(self, request):
+        """Comptages par facette pour les filtres et la recherche courants"""
+        return Response(cached_facets(self, request))
+
+    @action(detail=True, methods=['get'])
+    def compatible_parts(self, request, pk=None):
+        """Pièces détachées compatibles avec cette moto"""
+        from parts.models import Part
+        from parts.serializers import PartSerializer
+
+        motorcycle = self.get_object()
+        parts = (
+            Part.objects.compatible_with(motorcycle)
+            .filter(is_available=True)
+            .select_related('category')
+            .prefetch_related('images')
+        )
+        page = self.paginate_queryset(parts)
+        if page is not None:
+            serializer = PartSerializer(page, many=True, context=self.get_serializer_context())
+            return self.get_paginated_response(serializer.data)
+        serializer = PartSerializer(parts, many=True, context=self.get_serializer_context())
+        return Response(serializer.data)
     
     @action(detail=True, methods=['post'], parser_classes=[MultiPartParser, FormParser])
     def upload_images(self, request, pk=None):
         """Upload d'images pour une moto"""
-        import os
-        import uuid
-        from django.conf import settings
-        from django.core.files.storage import default_storage
-        
         motorcycle = self.get_object()
         files = request.FILES.getlist('images')
         
         if not files:
             return Response({'error': 'Aucun fichier fourni'}, status=status.HTTP_400_BAD_REQUEST)
         
-        created_images = []
-        for file in files:
-            # Générer un nom de fichier unique
-            file_extension = os.path.splitext(file.name)[1]
-            unique_filename = f"motorcycles/{motorcycle.id}/{uuid.uuid4()}{file_extension}"
-            
-            # Sauvegarder le fichier
-            file_path = default_storage.save(unique_filename, file)
-            
-            # Créer l'URL complète
-            # Utiliser une URL relative pour être servie via Nginx/HTTPS
-            image_url = f"{settings.MEDIA_URL}{file_path}"
-            
-            image = MotorcycleImage.objects.create(
-                motorcycle=motorcycle,
-                image=image_url
-            )
-            created_images.append(MotorcycleImageSerializer(image).data)
-        
-        return Response(created_images, status=status.HTTP_201_CREATED)
+        # Fichiers écrits en parallèle, lignes insérées en une fois (clés de stockage)
+        images, errors = ingest_images(motorcycle, files, MotorcycleImage, 'motorcycle', motorcycle_images_saved)
+        return upload_response(MotorcycleImageSerializer(images, many=True).data, errors)
 
     @action(detail=True, methods=['get'])
     def list_images(self, request, pk=None):
-        """Lister toutes les images présentes dans le dossier media de la moto, qu'elles soient en DB ou non"""
+        """
+        Lister les fichiers média de la moto d'après le manifeste (sans parcourir
+        le disque) : fichiers orphelins signalés, images en base sans fichier
+        listées dans `missing`.
+        """
         moto = self.get_object()
-        folder = os.path.join(settings.MEDIA_ROOT, 'motorcycles', str(moto.id))
-        results = []
-        if os.path.isdir(folder):
-            for name in sorted(os.listdir(folder)):
-                # Ignorer fichiers cachés et non images basiques
-                if name.startswith('.'):
-                    continue
-                rel = f"motorcycles/{moto.id}/{name}"
-                url = f"{settings.MEDIA_URL}{quote(rel)}"
-                results.append({'filename': name, 'url': url})
-        # Inclure aussi les enregistrements DB existants
-        db_images = MotorcycleImage.objects.filter(motorcycle=moto).order_by('-created_at')
+        # Images déjà préchargées par get_object
+        db_images = sorted(moto.images.all(), key=lambda image: image.created_at, reverse=True)
+        files, missing = owner_manifest('motorcycles', moto.id, [image.image for image in db_images])
         db_payload = MotorcycleImageSerializer(db_images, many=True).data
-        return Response({'filesystem': results, 'database': db_payload})
+        return Response({'filesystem': files, 'database': db_payload, 'missing': missing})
     
     @action(detail=True, methods=['post'])
     def set_primary_image(self, request, pk=None):
@@ -101,14 +143,8 @@ class MotorcycleViewSet(viewsets.ModelViewSet):
             return Response({'error': 'image_id requis'}, status=status.HTTP_400_BAD_REQUEST)
         
         try:
-            # Retirer le statut principal de toutes les images
-            MotorcycleImage.objects.filter(motorcycle=motorcycle).update(is_primary=False)
-            
-            # Définir la nouvelle image principale
-            image = MotorcycleImage.objects.get(id=image_id, motorcycle=motorcycle)
-            image.is_primary = True
-            image.save()
-            
+            # Transaction unique : ancienne principale retirée, primary_image mis à jour
+            primary_images.set_primary_image(motorcycle, image_id, MotorcycleImage, 'motorcycle')
             return Response({'success': True}, status=status.HTTP_200_OK)
         except MotorcycleImage.DoesNotExist:
             return Response({'error': 'Image non trouvée'}, status=status.HTTP_404_NOT_FOUND)
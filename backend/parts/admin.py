@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Category, Part, PartImage
+from .models import Category, Compatibility, Part, PartImage
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
@@ -19,3 +19,10 @@ class PartImageAdmin(admin.ModelAdmin):
     list_display = ['part', 'is_primary', 'created_at']
     list_filter = ['is_primary', 'created_at']
     search_fields = ['part__name', 'part__brand']
+
+@admin.register(Compatibility)
+class CompatibilityAdmin(admin.ModelAdmin):
+    list_display = ['brand', 'model', 'year_from', 'year_to']
+    list_filter = ['brand']
+    search_fields = ['brand', 'model']
+    readonly_fields = ['brand_key', 'model_key']
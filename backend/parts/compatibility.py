@@ -0,0 +1,87 @@
+"""Analyse du champ libre `compatible_models` en index de compatibilité"""
+import re
+
+# Marques reconnues en tête d'entrée ("Yamaha MT-07") ; les plus longues d'abord
+KNOWN_BRANDS = sorted([
+    'Aprilia', 'Benelli', 'Beta', 'BMW', 'CFMoto', 'Derbi', 'Ducati', 'Gas Gas',
+    'Harley-Davidson', 'Honda', 'Husqvarna', 'Indian', 'Kawasaki', 'KTM', 'Kymco',
+    'Mash', 'Moto Guzzi', 'MV Agusta', 'Peugeot', 'Piaggio', 'Rieju', 'Royal Enfield',
+    'Sherco', 'Suzuki', 'Sym', 'Triumph', 'Vespa', 'Voge', 'Yamaha', 'Zontes',
+], key=len, reverse=True)
+
+_ENTRY_SPLIT = re.compile(r'[,;\n]+')
+_YEAR_RANGE = re.compile(r'\(?\b((?:19|20)\d{2})\s*(?:-|–|à|/)\s*((?:19|20)\d{2}\b)?\s*\+?\)?')
+_YEAR_FROM = re.compile(r'\(?\b((?:19|20)\d{2})\s*\+\)?')
+_YEAR_SINGLE = re.compile(r'\(?\b((?:19|20)\d{2})\b\)?')
+_NON_ALNUM = re.compile(r'[^0-9a-z]+')
+
+
+def normalize_key(value):
+    """Clé de comparaison : minuscules, sans ponctuation ("MT-07" -> "mt07")"""
+    return _NON_ALNUM.sub('', (value or '').lower())
+
+
+def _extract_years(entry):
+    match = _YEAR_RANGE.search(entry)
+    if match:
+        year_from = int(match.group(1))
+        year_to = int(match.group(2)) if match.group(2) else None
+        return entry[:match.start()] + entry[match.end():], year_from, year_to
+    match = _YEAR_FROM.search(entry)
+    if match:
+        return entry[:match.start()] + entry[match.end():], int(match.group(1)), None
+    match = _YEAR_SINGLE.search(entry)
+    if match:
+        year = int(match.group(1))
+        return entry[:match.start()] + entry[match.end():], year, year
+    return entry, None, None
+
+
+def _split_brand(label):
+    lowered = label.lower()
+    for brand in KNOWN_BRANDS:
+        if lowered == brand.lower() or lowered.startswith(brand.lower() + ' '):
+            return brand, label[len(brand):].strip()
+    return '', label
+
+
+def parse_compatible_models(text):
+    """
+    Découpe "Yamaha MT-07 2014-2020, Honda CB500F (2016+), Z650" en entrées
+    `{brand, model, year_from, year_to}`. Une marque non reconnue ou un
+    modèle absent restent vides et valent "toutes" ; une année absente
+    signifie "sans borne".
+    """
+    entries = []
+    seen = set()
+    for raw in _ENTRY_SPLIT.split(text or ''):
+        label, year_from, year_to = _extract_years(raw.strip())
+        label = ' '.join(label.split())
+        if not label:
+            continue
+        # Marque seule : clé de modèle vide, compatible avec tous ses modèles
+        brand, model = _split_brand(label)
+        key = (normalize_key(brand), normalize_key(model), year_from, year_to)
+        if not (key[0] or key[1]) or key in seen:
+            continue
+        seen.add(key)
+        entries.append({'brand': brand, 'model': model, 'year_from': year_from, 'year_to': year_to})
+    return entries
+
+
+def sync_part_compatibilities(part, compatibility_model=None):
+    """Reconstruit les liens de compatibilité d'une pièce depuis son texte libre"""
+    if compatibility_model is None:
+        from .models import Compatibility as compatibility_model
+    rows = []
+    for entry in parse_compatible_models(part.compatible_models):
+        row, _ = compatibility_model.objects.get_or_create(
+            brand_key=normalize_key(entry['brand']),
+            model_key=normalize_key(entry['model']),
+            year_from=entry['year_from'],
+            year_to=entry['year_to'],
+            defaults={'brand': entry['brand'], 'model': entry['model']},
+        )
+        rows.append(row)
+    part.compatibilities.set(rows)
+    return rows
@@ -0,0 +1,23 @@
+from django_filters import rest_framework as django_filters
+from motorcycles.models import Motorcycle
+from .models import Part
+
+
+class PartFilter(django_filters.FilterSet):
+    """Filtres des pièces, dont la compatibilité avec une moto du catalogue"""
+    compatible_with = django_filters.NumberFilter(method='filter_compatible_with')
+
+    class Meta:
+        model = Part
+        fields = {
+            'category': ['exact'],
+            'brand': ['exact'],
+            'condition': ['exact'],
+            'price': ['gte', 'lt'],  # tranches de prix des facettes
+        }
+
+    def filter_compatible_with(self, queryset, name, value):
+        motorcycle = Motorcycle.objects.filter(pk=value).only('brand', 'model', 'year').first()
+        if motorcycle is None:
+            return queryset.none()
+        return queryset.compatible_with(motorcycle)
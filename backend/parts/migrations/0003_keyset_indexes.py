@@ -0,0 +1,25 @@
+# Generated by Django 5.0.3 on 2026-10-18 16:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parts', '0002_alter_category_options_alter_partimage_image'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='part',
+            index=models.Index(fields=['created_at', 'id'], name='part_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='part',
+            index=models.Index(fields=['price', 'id'], name='part_price_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='part',
+            index=models.Index(fields=['stock', 'id'], name='part_stock_id_idx'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.0.3 on 2026-10-18 16:50
+
+from django.db import migrations, models
+
+
+def build_compatibility_index(apps, schema_editor):
+    """Analyse les chaînes compatible_models existantes"""
+    from parts.compatibility import sync_part_compatibilities
+
+    Part = apps.get_model('parts', 'Part')
+    Compatibility = apps.get_model('parts', 'Compatibility')
+    parts = Part.objects.exclude(compatible_models='').only('id', 'compatible_models')
+    for part in parts.iterator(chunk_size=500):
+        sync_part_compatibilities(part, compatibility_model=Compatibility)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parts', '0005_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Compatibility',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('brand', models.CharField(blank=True, max_length=100)),
+                ('model', models.CharField(blank=True, max_length=100)),
+                ('brand_key', models.CharField(blank=True, max_length=100)),
+                ('model_key', models.CharField(blank=True, max_length=100)),
+                ('year_from', models.PositiveIntegerField(blank=True, null=True)),
+                ('year_to', models.PositiveIntegerField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Compatibilities',
+                'indexes': [models.Index(fields=['model_key', 'brand_key'], name='compat_model_brand_idx')],
+            },
+        ),
+        migrations.AddField(
+            model_name='part',
+            name='compatibilities',
+            field=models.ManyToManyField(blank=True, editable=False, related_name='parts', to='parts.compatibility'),
+        ),
+        migrations.RunPython(build_compatibility_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.3 on 2026-10-18 16:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parts', '0006_compatibility'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='partimage',
+            name='variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.0.3 on 2026-10-18 17:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Min, OuterRef, Subquery
+
+
+def dedupe_primary_images(apps, schema_editor):
+    """Une seule image principale par pièce : la plus ancienne est gardée"""
+    PartImage = apps.get_model('parts', 'PartImage')
+    duplicates = (
+        PartImage.objects.filter(is_primary=True).values('part')
+        .annotate(count=Count('id'), keep=Min('id')).filter(count__gt=1)
+    )
+    for row in duplicates.iterator():
+        PartImage.objects.filter(part=row['part'], is_primary=True).exclude(pk=row['keep']).update(is_primary=False)
+
+
+def fill_primary_image(apps, schema_editor):
+    """Image des cartes : la principale, sinon la plus ancienne"""
+    Part = apps.get_model('parts', 'Part')
+    PartImage = apps.get_model('parts', 'PartImage')
+    first = PartImage.objects.filter(part=OuterRef('pk')).order_by('-is_primary', 'id').values('pk')[:1]
+    Part.objects.update(primary_image=Subquery(first))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parts', '0008_image_metadata'),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe_primary_images, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='partimage',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_primary', True)), fields=('part',), name='part_single_primary_image'),
+        ),
+        migrations.AddField(
+            model_name='part',
+            name='primary_image',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='parts.partimage'),
+        ),
+        migrations.RunPython(fill_primary_image, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,8 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models import Exists, OuterRef, Q
+
+from media_library.keys import MediaKeyField
 
 class Category(models.Model):
     name = models.CharField(max_length=100)
@@ -13,6 +17,43 @@ class Category(models.Model):
     def __str__(self):
         return self.name
 
+class Compatibility(models.Model):
+    """Modèle de moto (marque, modèle, plage d'années) auquel une pièce s'adapte"""
+    brand = models.CharField(max_length=100, blank=True)
+    model = models.CharField(max_length=100, blank=True)
+    # Clés normalisées (minuscules, sans ponctuation) ; vide = toutes
+    brand_key = models.CharField(max_length=100, blank=True)
+    model_key = models.CharField(max_length=100, blank=True)
+    year_from = models.PositiveIntegerField(null=True, blank=True)
+    year_to = models.PositiveIntegerField(null=True, blank=True)
+
+    class Meta:
+        verbose_name_plural = "Compatibilities"
+        indexes = [
+            models.Index(fields=['model_key', 'brand_key'], name='compat_model_brand_idx'),
+        ]
+
+    def __str__(self):
+        years = ''
+        if self.year_from or self.year_to:
+            years = f" ({self.year_from or ''}-{self.year_to or ''})"
+        return f"{self.brand} {self.model}{years}".strip()
+
+class PartQuerySet(models.QuerySet):
+    def compatible_with(self, motorcycle):
+        """Pièces compatibles avec une moto, par jointure sur l'index de compatibilité"""
+        from .compatibility import normalize_key
+        matches = Compatibility.objects.filter(
+            Q(brand_key='') | Q(brand_key=normalize_key(motorcycle.brand)),
+            Q(model_key='') | Q(model_key=normalize_key(motorcycle.model)),
+            Q(year_from__isnull=True) | Q(year_from__lte=motorcycle.year),
+            Q(year_to__isnull=True) | Q(year_to__gte=motorcycle.year),
+        ).exclude(brand_key='', model_key='')
+        links = Part.compatibilities.through.objects.filter(
+            part_id=OuterRef('pk'), compatibility__in=matches
+        )
+        return self.filter(Exists(links))
+
 class Part(models.Model):
     CONDITION_CHOICES = [
         ('new', 'Neuf'),
@@ -26,6 +67,8 @@ class Part(models.Model):
     category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='parts')
     brand = models.CharField(max_length=100)
     compatible_models = models.TextField(help_text="Modèles compatibles séparés par des virgules")
+    # Index normalisé, reconstruit depuis compatible_models à chaque sauvegarde
+    compatibilities = models.ManyToManyField(Compatibility, related_name='parts', blank=True, editable=False)
     price = models.DecimalField(max_digits=10, decimal_places=2)
     stock = models.PositiveIntegerField(default=0)
     condition = models.CharField(max_length=20, choices=CONDITION_CHOICES, default='new')
@@ -34,18 +77,54 @@ class Part(models.Model):
     is_featured = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # tsvector pondéré (index GIN créé par migration, PostgreSQL uniquement)
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Image des cartes (la principale, sinon la plus ancienne), tenue à jour par les signaux
+    primary_image = models.ForeignKey(
+        'PartImage', null=True, blank=True, on_delete=models.SET_NULL, related_name='+', editable=False,
+    )
+
+    search_vector_weights = (
+        ('name', 'A'), ('brand', 'A'), ('compatible_models', 'B'), ('description', 'C'),
+    )
+
+    objects = PartQuerySet.as_manager()
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Index composites pour la pagination par curseur (champ de tri, id)
+            models.Index(fields=['created_at', 'id'], name='part_created_id_idx'),
+            models.Index(fields=['price', 'id'], name='part_price_id_idx'),
+            models.Index(fields=['stock', 'id'], name='part_stock_id_idx'),
+        ]
     
     def __str__(self):
         return f"{self.name} - {self.brand}"
 
 class PartImage(models.Model):
     part = models.ForeignKey(Part, on_delete=models.CASCADE, related_name='images')
-    image = models.URLField(max_length=500)
+    # Clé de stockage (`parts/<id>/<uuid>.jpg`) ou URL externe
+    image = MediaKeyField(max_length=500)
     is_primary = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Variantes redimensionnées générées après l'upload (agde_moto.image_variants)
+    variants = models.JSONField(default=dict, blank=True, editable=False)
+    # Relevés à l'upload (agde_moto.image_variants.describe_image)
+    width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    file_size = models.PositiveBigIntegerField(null=True, blank=True, editable=False)
+    mime_type = models.CharField(max_length=50, blank=True, editable=False)
+    # Aperçu flou (data URI WebP de quelques centaines d'octets)
+    placeholder = models.TextField(blank=True, editable=False)
+
+    class Meta:
+        constraints = [
+            # Une seule image principale par pièce
+            models.UniqueConstraint(
+                fields=['part'], condition=models.Q(is_primary=True), name='part_single_primary_image',
+            ),
+        ]
     
     def __str__(self):
         return f"Image for {self.part.name}"
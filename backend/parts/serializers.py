@@ -1,5 +1,7 @@
 from rest_framework import serializers
-from django.conf import settings
+from agde_moto.fieldsets import SparseFieldsetMixin
+from agde_moto.image_variants import SrcsetField
+from media_library.keys import MediaUrlField
 from .models import Category, Part, PartImage
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -11,27 +13,25 @@ class CategorySerializer(serializers.ModelSerializer):
 
 class PartImageSerializer(serializers.ModelSerializer):
     """Serializer pour les images de pièces"""
-    image = serializers.SerializerMethodField()
+    image = MediaUrlField()
+    srcset = SrcsetField()
 
     class Meta:
         model = PartImage
-        fields = ['id', 'image', 'is_primary', 'created_at']
-
-    def get_image(self, obj):
-        val = (obj.image or '').strip()
-        if val.startswith('http://') or val.startswith('https://'):
-            idx = val.find('/media/')
-            if idx != -1:
-                return val[idx:]
-            return val
-        return val if val.startswith('/media/') else f"{settings.MEDIA_URL}{val}"
+        fields = [
+            'id', 'image', 'is_primary', 'created_at', 'srcset',
+            'width', 'height', 'file_size', 'mime_type', 'placeholder',
+        ]
 
-class PartSerializer(serializers.ModelSerializer):
-    """Serializer pour les pièces détachées"""
+class PartSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    """Serializer pour les pièces détachées (champs à la demande, vue carte)"""
     category = CategorySerializer(read_only=True)
     category_id = serializers.IntegerField(write_only=True, required=False)
     category_name = serializers.CharField(write_only=True, required=False)
     images = PartImageSerializer(many=True, read_only=True)
+    # Clé étrangère dénormalisée : une jointure, sans charger `images`
+    primary_image = PartImageSerializer(read_only=True)
+    optional_fields = ('primary_image',)
     
     class Meta:
         model = Part
@@ -39,7 +39,11 @@ class PartSerializer(serializers.ModelSerializer):
             'id', 'name', 'category', 'category_id', 'category_name', 'brand',
             'compatible_models', 'price', 'stock', 'condition', 'description',
             'is_available', 'is_featured',
-            'created_at', 'updated_at', 'images'
+            'created_at', 'updated_at', 'images', 'primary_image',
+        ]
+        card_fields = [
+            'id', 'name', 'category', 'brand', 'price', 'condition',
+            'is_available', 'primary_image',
         ]
         read_only_fields = ['created_at', 'updated_at']
     
@@ -1,7 +1,14 @@
-from django.db.models.signals import post_delete
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
 from django.dispatch import receiver
-from .models import Part, PartImage
+from django.utils import timezone
+from .models import Category, Compatibility, Part, PartImage
 from utils.file_cleanup import delete_file_from_url, delete_directory
+from agde_moto.image_variants import schedule_variants, variant_keys
+from agde_moto.primary_images import demote_other_primaries, refresh_primary_image
+from agde_moto.response_cache import bump_generation
+from agde_moto.search import refresh_search_vector
+from media_library.manifest import forget_media, forget_owner, record_media
+from .compatibility import sync_part_compatibilities
 
 @receiver(post_delete, sender=PartImage)
 def delete_part_image_file(sender, instance, **kwargs):
@@ -10,6 +17,9 @@ def delete_part_image_file(sender, instance, **kwargs):
     """
     if instance.image:
         delete_file_from_url(instance.image)
+    for key in variant_keys(instance.variants):
+        delete_file_from_url(key)
+    forget_media('parts', instance.part_id, [instance.image, *variant_keys(instance.variants)])
 
 @receiver(post_delete, sender=Part)
 def delete_part_directory(sender, instance, **kwargs):
@@ -19,3 +29,104 @@ def delete_part_directory(sender, instance, **kwargs):
     """
     directory = f"parts/{instance.id}"
     delete_directory(directory)
+    forget_owner('parts', instance.id)
+
+@receiver(post_save, sender=Part)
+def update_part_search_vector(sender, instance, update_fields=None, **kwargs):
+    """
+    Keeps the weighted full-text vector in sync with the indexed fields.
+    """
+    indexed = {name for name, _ in Part.search_vector_weights}
+    if update_fields is None or indexed & set(update_fields):
+        refresh_search_vector(instance)
+
+@receiver(post_save, sender=Part)
+def update_part_compatibilities(sender, instance, update_fields=None, raw=False, **kwargs):
+    """
+    Rebuilds the normalized compatibility links from compatible_models.
+    """
+    if raw:
+        return
+    if update_fields is None or 'compatible_models' in update_fields:
+        sync_part_compatibilities(instance)
+
+@receiver([post_save, post_delete], sender=Part)
+@receiver(post_delete, sender=PartImage)
+@receiver([post_save, post_delete], sender=Category)
+@receiver([post_save, post_delete], sender=Compatibility)
+def bump_part_cache_generation(sender, **kwargs):
+    """
+    Invalidates cached public responses that depend on this model.
+    """
+    bump_generation(sender)
+
+@receiver(m2m_changed, sender=Part.compatibilities.through)
+def bump_compatibility_cache_generation(sender, action, **kwargs):
+    """
+    Rebuilt compatibility links change ?compatible_with= results.
+    """
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_generation(Compatibility)
+
+@receiver(post_delete, sender=PartImage)
+def touch_part_on_image_delete(sender, instance, **kwargs):
+    """
+    Bumps the part's updated_at so its ETag / Last-Modified change.
+    """
+    Part.objects.filter(pk=instance.part_id).update(updated_at=timezone.now())
+
+@receiver(post_save, sender=Category)
+def touch_parts_on_category_change(sender, instance, raw=False, created=False, **kwargs):
+    """
+    A renamed category changes every part representation that embeds it.
+    """
+    if raw or created:
+        return
+    Part.objects.filter(category=instance).update(updated_at=timezone.now())
+
+def part_images_saved(images, created=True, update_fields=None):
+    """
+    Side effects of saving images of one part, shared by the post_save
+    receiver and bulk inserts (media_library.ingest), so both stay in sync:
+    the part's updated_at is bumped (ETag / Last-Modified), cached
+    responses are invalidated, the card image is refreshed, the files are
+    recorded in the media manifest and resized variants are queued.
+    Add new post_save side effects here, not in a separate receiver.
+    """
+    part_id = images[0].part_id
+    Part.objects.filter(pk=part_id).update(updated_at=timezone.now())
+    bump_generation(PartImage)
+    if created or update_fields is None or 'is_primary' in update_fields:
+        refresh_primary_image(images[0], 'part')
+    if update_fields is None or {'image', 'variants'} & set(update_fields):
+        record_media('parts', part_id, [
+            key for image in images for key in (image.image, *variant_keys(image.variants))
+        ])
+    for image in images:
+        schedule_variants(image)
+
+@receiver(post_save, sender=PartImage)
+def part_image_saved(sender, instance, raw=False, created=False, update_fields=None, **kwargs):
+    """
+    Applies part_images_saved to a single saved image.
+    """
+    if raw:
+        bump_generation(sender)
+        return
+    part_images_saved([instance], created=created, update_fields=update_fields)
+
+@receiver(pre_save, sender=PartImage)
+def demote_other_part_primary_images(sender, instance, raw=False, **kwargs):
+    """
+    Keeps a single primary image per part (enforced by a partial unique constraint).
+    """
+    if raw:
+        return
+    demote_other_primaries(instance, 'part')
+
+@receiver(post_delete, sender=PartImage)
+def refresh_part_primary_image(sender, instance, **kwargs):
+    """
+    Keeps the denormalized Part.primary_image pointing at the card image.
+    """
+    refresh_primary_image(instance, 'part')
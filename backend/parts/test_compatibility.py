@@ -0,0 +1,81 @@
+import pytest
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+from motorcycles.models import Motorcycle
+from .compatibility import parse_compatible_models
+from .models import Category, Part
+
+
+@pytest.fixture(autouse=True)
+def clear_cache_between_tests():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def test_parse_compatible_models():
+    assert parse_compatible_models('Yamaha MT-07 2014-2020, Honda CB500F (2016+); Z650\nKawasaki') == [
+        {'brand': 'Yamaha', 'model': 'MT-07', 'year_from': 2014, 'year_to': 2020},
+        {'brand': 'Honda', 'model': 'CB500F', 'year_from': 2016, 'year_to': None},
+        {'brand': '', 'model': 'Z650', 'year_from': None, 'year_to': None},
+        {'brand': 'Kawasaki', 'model': '', 'year_from': None, 'year_to': None},
+    ]
+    assert parse_compatible_models('') == []
+
+
+def _part(name, compatible_models):
+    category, _ = Category.objects.get_or_create(slug='divers', defaults={'name': 'Divers'})
+    return Part.objects.create(
+        name=name, category=category, brand='Générique', compatible_models=compatible_models,
+        price='19.90', description='Test',
+    )
+
+
+def _moto(brand, model, year):
+    return Motorcycle.objects.create(
+        brand=brand, model=model, year=year, price='5000.00', mileage=0, engine='650cc',
+        power=70, license='A2', color='Noir', description='Test',
+    )
+
+
+@pytest.mark.django_db
+def test_parts_compatible_with_motorcycle(django_capture_on_commit_callbacks):
+    client = APIClient()
+    mt07 = _moto('Yamaha', 'MT-07', 2018)
+    lever = _part('Levier', 'Yamaha MT07 2014-2020')
+    chain = _part('Chaîne', 'Yamaha')
+    _part('Rétroviseur', 'Yamaha MT-07 2021+')
+    _part('Filtre', 'Honda CB500F')
+
+    expected = {lever.id, chain.id}
+    ids = {row['id'] for row in client.get(f'/api/motorcycles/{mt07.id}/compatible_parts/').json()}
+    assert ids == expected
+    ids = {row['id'] for row in client.get('/api/parts/', {'compatible_with': mt07.id}).json()}
+    assert ids == expected
+
+    # Modifier le texte libre reconstruit l'index
+    lever.compatible_models = 'Honda CB500F'
+    with django_capture_on_commit_callbacks(execute=True):
+        lever.save()
+    ids = {row['id'] for row in client.get('/api/parts/', {'compatible_with': mt07.id}).json()}
+    assert ids == {chain.id}
+
+
+@pytest.mark.django_db
+def test_cached_compatible_parts_follow_motorcycle_edits(django_capture_on_commit_callbacks):
+    client = APIClient()
+    moto = _moto('Yamaha', 'MT-07', 2018)
+    lever = _part('Levier', 'Yamaha MT-07')
+    _part('Filtre', 'Honda CB500F')
+
+    ids = {row['id'] for row in client.get('/api/parts/', {'compatible_with': moto.id}).json()}
+    assert ids == {lever.id}
+    assert client.get('/api/parts/facets/', {'compatible_with': moto.id}).json()['count'] == 1
+
+    # La moto change de modèle : listes et facettes en cache ne sont plus valables
+    moto.brand, moto.model = 'Kawasaki', 'Z900'
+    with django_capture_on_commit_callbacks(execute=True):
+        moto.save()
+    assert client.get('/api/parts/', {'compatible_with': moto.id}).json() == []
+    assert client.get('/api/parts/facets/', {'compatible_with': moto.id}).json()['count'] == 0
@@ -0,0 +1,45 @@
+import pytest
+from rest_framework.test import APIClient
+
+from agde_moto.testing import assert_constant_queries, assert_max_queries
+from .models import Category, Part, PartImage
+
+
+def _create_parts(count, images_per_part=2):
+    for i in range(count):
+        category, _ = Category.objects.get_or_create(slug=f'cat-{i % 3}', defaults={'name': f'Catégorie {i % 3}'})
+        part = Part.objects.create(
+            name=f'Levier {i}', category=category, brand='Brembo',
+            compatible_models='Yamaha MT-07', price='39.90', stock=5,
+            description='Pièce de test',
+        )
+        for j in range(images_per_part):
+            PartImage.objects.create(part=part, image=f'/media/parts/{part.id}/{j}.jpg')
+
+
+# Budget : validateurs ETag (1 agrégat), lignes, images préchargées
+@pytest.mark.django_db
+def test_part_list_query_count_is_constant(django_capture_on_commit_callbacks):
+    client = APIClient()
+    _create_parts(2)
+
+    def fetch():
+        response = client.get('/api/parts/')
+        assert response.status_code == 200
+
+    def grow():
+        # Données validées : les générations du cache sont incrémentées au commit
+        with django_capture_on_commit_callbacks(execute=True):
+            _create_parts(20)
+
+    assert_constant_queries(fetch, grow=grow, budget=3)
+
+
+@pytest.mark.django_db
+def test_part_retrieve_budget():
+    client = APIClient()
+    _create_parts(3)
+    part = Part.objects.first()
+
+    with assert_max_queries(3):
+        assert client.get(f'/api/parts/{part.id}/').status_code == 200
@@ -1,11 +1,25 @@
-from rest_framework import viewsets, filters, status
+from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import Category, Part, PartImage
+from agde_moto.conditional import conditional_detail, conditional_list
+from agde_moto.facets import Facet, RangeFacet, cached_facets
+from agde_moto.fastlist import FastListMixin
+from agde_moto.fieldsets import SparseQuerysetMixin
+from agde_moto.pagination import KeysetPagination
+from agde_moto import primary_images
+from agde_moto.response_cache import cache_response
+from agde_moto.search import FullTextSearchFilter, RankedOrderingFilter, TrigramSearchFilter
+from media_library.ingest import ingest_images, upload_response
+from .filters import PartFilter
+from motorcycles.models import Motorcycle
+from .models import Category, Compatibility, Part, PartImage
 from .serializers import CategorySerializer, PartSerializer, PartImageSerializer
+from .signals import part_images_saved
+
+PRICE_BANDS = [(None, 50), (50, 100), (100, 250), (250, 500), (500, None)]
 
 class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
     """ViewSet pour les catégories de pièces"""
@@ -14,63 +28,68 @@ class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
     lookup_field = 'slug'
     permission_classes = [AllowAny]  # Lecture publique pour les catégories
     pagination_class = None
+    cache_dependencies = [Category]
+
+    @cache_response
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
 
-class PartViewSet(viewsets.ModelViewSet):
+class PartViewSet(SparseQuerysetMixin, FastListMixin, viewsets.ModelViewSet):
     """ViewSet pour les pièces détachées"""
-    queryset = Part.objects.all()
+    queryset = Part.objects.select_related('category').prefetch_related('images')
     serializer_class = PartSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['category', 'brand']
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter, TrigramSearchFilter, RankedOrderingFilter]
+    filterset_class = PartFilter
+    # ?compatible_with= lit la marque, le modèle et l'année de la moto
+    cache_dependencies = [Part, PartImage, Category, Compatibility, Motorcycle]
     search_fields = ['name', 'brand', 'compatible_models', 'description']
+    fuzzy_fields = ['name', 'brand']
     ordering_fields = ['price', 'stock', 'created_at']
     ordering = ['-created_at']
+    pagination_class = KeysetPagination
+    facet_definitions = [
+        Facet('brand', 'brand'),
+        Facet('category', 'category', label_field='category__name'),
+        Facet('condition', 'condition', labels=dict(Part.CONDITION_CHOICES)),
+        RangeFacet('price', 'price', PRICE_BANDS),
+    ]
     
     def get_permissions(self):
         """Permissions personnalisées selon l'action"""
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'retrieve', 'facets']:
             # Lecture publique autorisée
             permission_classes = [AllowAny]
         else:
             # Écriture nécessite une authentification
             permission_classes = [IsAuthenticated]
         return [permission() for permission in permission_classes]
+
+    @cache_response
+    @conditional_list
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @conditional_detail
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    @action(detail=False, methods=['get'])
+    def facets(self, request):
+        """Comptages par facette pour les filtres et la recherche courants"""
+        return Response(cached_facets(self, request))
     
     @action(detail=True, methods=['post'], parser_classes=[MultiPartParser, FormParser])
     def upload_images(self, request, pk=None):
         """Upload d'images pour une pièce"""
-        import os
-        import uuid
-        from django.conf import settings
-        from django.core.files.storage import default_storage
-        
         part = self.get_object()
         files = request.FILES.getlist('images')
         
         if not files:
             return Response({'error': 'Aucun fichier fourni'}, status=status.HTTP_400_BAD_REQUEST)
         
-        created_images = []
-        for file in files:
-            # Générer un nom de fichier unique
-            file_extension = os.path.splitext(file.name)[1]
-            unique_filename = f"parts/{part.id}/{uuid.uuid4()}{file_extension}"
-            
-            # Sauvegarder le fichier
-            file_path = default_storage.save(unique_filename, file)
-            
-            # Créer l'URL complète
-        if settings.DEBUG:
-            image_url = f"http://178.16.130.95:8000/media/{file_path}"
-            else:
-                image_url = f"{settings.MEDIA_URL}{file_path}"
-            
-            image = PartImage.objects.create(
-                part=part,
-                image=image_url
-            )
-            created_images.append(PartImageSerializer(image).data)
-        
-        return Response(created_images, status=status.HTTP_201_CREATED)
+        # Fichiers écrits en parallèle, lignes insérées en une fois (clés de stockage)
+        images, errors = ingest_images(part, files, PartImage, 'part', part_images_saved)
+        return upload_response(PartImageSerializer(images, many=True).data, errors)
     
     @action(detail=True, methods=['post'])
     def set_primary_image(self, request, pk=None):
@@ -82,14 +101,8 @@ class PartViewSet(viewsets.ModelViewSet):
             return Response({'error': 'image_id requis'}, status=status.HTTP_400_BAD_REQUEST)
         
         try:
-            # Retirer le statut principal de toutes les images
-            PartImage.objects.filter(part=part).update(is_primary=False)
-            
-            # Définir la nouvelle image principale
-            image = PartImage.objects.get(id=image_id, part=part)
-            image.is_primary = True
-            image.save()
-            
+            # Transaction unique : ancienne principale retirée, primary_image mis à jour
+            primary_images.set_primary_image(part, image_id, PartImage, 'part')
             return Response({'success': True}, status=status.HTTP_200_OK)
         except PartImage.DoesNotExist:
             return Response({'error': 'Image non trouvée'}, status=status.HTTP_404_NOT_FOUND)
@@ -1,51 +1,162 @@
-import os
-import shutil
+import logging
+import queue
+import threading
+import time
+from collections import Counter, namedtuple
 from django.conf import settings
-from urllib.parse import unquote
+from django.core.files.storage import default_storage
+from django.db import transaction
+
+from media_library.keys import is_external, to_key
+
+logger = logging.getLogger('agde_moto')
+
+# False in development/tests: the batch runs in the committing thread
+CLEANUP_ASYNC = getattr(settings, 'MEDIA_CLEANUP_ASYNC', True)
+CLEANUP_BATCH_SIZE = getattr(settings, 'MEDIA_CLEANUP_BATCH_SIZE', 200)
+# Seconds the worker waits for more deletions before running a batch
+CLEANUP_BATCH_WAIT = getattr(settings, 'MEDIA_CLEANUP_BATCH_WAIT', 0.5)
+CLEANUP_MAX_ATTEMPTS = getattr(settings, 'MEDIA_CLEANUP_MAX_ATTEMPTS', 3)
+CLEANUP_RETRY_DELAY = getattr(settings, 'MEDIA_CLEANUP_RETRY_DELAY', 2.0)
+
+# kind: 'file', 'directory' or 'blob' (a content-addressed file and its variants)
+CleanupTask = namedtuple('CleanupTask', ['kind', 'path', 'attempts'], defaults=[0])
+
+
+def media_relative_path(url):
+    """
+    Returns the storage key (path relative to MEDIA_ROOT) for a stored
+    image value, whether it is already a key or a legacy media URL.
+    """
+    return to_key(url)
+
+
+def run_task(task):
+    """
+    Performs one deletion through the media storage (local or object storage).
+    Returns 'deleted', 'missing' or 'kept' (a released blob that was
+    reused before the worker ran); raises when the deletion should be retried.
+    """
+    if task.kind == 'blob':
+        from media_library.blobs import purge_blob
+        return 'deleted' if purge_blob(task.path) else 'kept'
+    if task.kind == 'directory':
+        from media_library.storage import delete_tree
+        return 'deleted' if delete_tree(task.path) else 'missing'
+    if not default_storage.exists(task.path):
+        return 'missing'
+    default_storage.delete(task.path)
+    return 'deleted'
+
+
+class CleanupWorker:
+    """
+    Background thread that unlinks media files after the deleting
+    transaction has committed. Deletions are grouped in batches and
+    failed ones are retried with a growing delay.
+    """
+
+    def __init__(self):
+        self.queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, tasks):
+        for task in tasks:
+            self.queue.put(task)
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='media-cleanup', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            self.process(self._next_batch())
+
+    def _next_batch(self):
+        batch = [self.queue.get()]
+        deadline = time.monotonic() + CLEANUP_BATCH_WAIT
+        while len(batch) < CLEANUP_BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def process(self, batch, retry=True):
+        """Runs a batch and logs its outcome; returns the counters"""
+        results = Counter()
+        for task in batch:
+            try:
+                results[run_task(task)] += 1
+            except Exception as exc:
+                attempts = task.attempts + 1
+                if retry and attempts < CLEANUP_MAX_ATTEMPTS:
+                    results['retried'] += 1
+                    timer = threading.Timer(
+                        CLEANUP_RETRY_DELAY * attempts, self.submit, args=([task._replace(attempts=attempts)],),
+                    )
+                    timer.daemon = True
+                    timer.start()
+                else:
+                    results['failed'] += 1
+                    logger.error(
+                        f"Media cleanup gave up on {task.kind} {task.path}: {exc}",
+                        extra={'media_cleanup': {'kind': task.kind, 'path': task.path, 'attempts': attempts}},
+                    )
+        summary = {key: results[key] for key in ('deleted', 'missing', 'kept', 'retried', 'failed')}
+        logger.info(
+            "Media cleanup batch: {deleted} deleted, {missing} missing, {kept} kept, {retried} retried, {failed} failed".format(**summary),
+            extra={'media_cleanup': {**summary, 'batch_size': len(batch)}},
+        )
+        return summary
+
+
+cleanup_worker = CleanupWorker()
+
+
+def schedule_cleanup(tasks):
+    """
+    Queues deletions once the current transaction commits; nothing is
+    deleted if it rolls back.
+    """
+    tasks = list(tasks)
+    if not tasks:
+        return
+    if CLEANUP_ASYNC:
+        transaction.on_commit(lambda: cleanup_worker.submit(tasks))
+    else:
+        transaction.on_commit(lambda: cleanup_worker.process(tasks, retry=False))
+
 
 def delete_file_from_url(url):
     """
-    Deletes a file from the filesystem based on its media URL.
+    Deletes a file from the media storage based on its storage key (or
+    legacy media URL), after commit.
     """
     if not url:
         return
 
-    # Remove MEDIA_URL prefix to get relative path
-    # MEDIA_URL is usually '/media/'
-    media_url = settings.MEDIA_URL
-    if url.startswith(media_url):
-        relative_path = url[len(media_url):]
-    elif '/media/' in url:
-        # Handle cases where full URL is stored (e.g. http://localhost:8000/media/...)
-        relative_path = url.split('/media/')[-1]
-    else:
-        # Fallback: assume it's already a relative path or something we can't handle easily
-        # But based on the code, it seems we store '/media/...'
-        relative_path = url
-
-    # Decode URL (e.g. spaces -> %20)
-    relative_path = unquote(relative_path)
-    
-    # Construct full path
-    file_path = os.path.join(settings.MEDIA_ROOT, relative_path)
-    
-    if os.path.isfile(file_path):
-        try:
-            os.remove(file_path)
-            print(f"Deleted file: {file_path}")
-        except OSError as e:
-            print(f"Error deleting file {file_path}: {e}")
-    else:
-        print(f"File not found for deletion: {file_path}")
+    relative_path = media_relative_path(url)
+    if is_external(relative_path):
+        return
+    # Content-addressed blobs are shared: only the last reference deletes them.
+    # The reference count is updated now, inside the transaction; the row
+    # stays at zero until the worker removes it together with the files.
+    from media_library.blobs import is_blob_path, release_blob
+    if is_blob_path(relative_path):
+        if release_blob(relative_path, delete_files=False):
+            schedule_cleanup([CleanupTask('blob', relative_path)])
+        return
+
+    schedule_cleanup([CleanupTask('file', relative_path)])
+
 
 def delete_directory(directory_path):
     """
-    Deletes a directory and all its contents.
+    Deletes a directory and all its contents, after commit.
     """
-    full_path = os.path.join(settings.MEDIA_ROOT, directory_path)
-    if os.path.isdir(full_path):
-        try:
-            shutil.rmtree(full_path)
-            print(f"Deleted directory: {full_path}")
-        except OSError as e:
-            print(f"Error deleting directory {full_path}: {e}")
+    schedule_cleanup([CleanupTask('directory', directory_path)])